@@ -0,0 +1,192 @@
+"""Columnar snapshot of a project for analytics (Parquet or Arrow IPC).
+
+Every data table plus the community aggregates is written to its own file
+in one directory, with column types taken from the schema instead of being
+guessed from the values: integers stay integers even with NULLs, REAL
+columns are always float64, ``active`` is boolean and the ISO date texts
+(``date``, ``start_date``…) and day numbers (``day``…) become ``date32``.
+Rows are streamed from SQLite ``ROW_GROUP`` at a time and written as one
+row group (Parquet) or record batch (Arrow), so memory does not grow with
+the project::
+
+    export_snapshot(db, "analisis", "arrow")
+    tabla = read_snapshot("analisis/avances.arrow")   # mapeado en memoria
+
+Parquet files are zstd-compressed. Arrow IPC files are written without
+compression so that :func:`read_snapshot` (or ``pyarrow.memory_map`` on the
+analytics side) reads them without copying.
+"""
+
+import os
+import tempfile
+from contextlib import closing
+
+from database import Database, DAY_SQL
+from tracing import traced
+
+ROW_GROUP = 65_536
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+COMPRESSION = {"parquet": "zstd", "arrow": None}
+
+# Tablas de datos del trabajo (las internas de sincronización no se exportan)
+TABLES = ("items", "atajados", "avances", "avance_history", "item_dependencies", "cronograma")
+DATE_COLUMNS = ("date", "start_date", "end_date", "last_date")
+DAY_COLUMNS = ("day", "start_day", "end_day")
+BOOL_COLUMNS = ("active",)
+
+# Agregados derivados: nombre -> (consulta, columnas con su tipo)
+AGGREGATES = {
+    "comunidad_items": (
+        """
+        SELECT r.comunidad, r.item_id, r.avances, r.pct_sum / c.n, r.done, r.started
+        FROM rollup_comunidad_item r
+        JOIN (SELECT comunidad, COUNT(*) AS n FROM atajado_comunidad GROUP BY comunidad) c
+          USING (comunidad)
+        ORDER BY r.comunidad, r.item_id
+        """,
+        (("comunidad", "string"), ("item_id", "int64"), ("avances", "int64"),
+         ("progress", "float64"), ("ejecutados", "int64"), ("iniciados", "int64")),
+    ),
+}
+COMUNIDAD_COLUMNS = (("comunidad", "string"), ("atajados", "int64"), ("budget", "float64"),
+                     ("executed", "float64"), ("progress", "float64"), ("ejecutados", "int64"),
+                     ("en_ejecucion", "int64"), ("pendientes", "int64"))
+
+
+def _arrow_type(pa, name: str, declared: str):
+    """Arrow type of a column from its name and declared SQLite type."""
+    declared = (declared or "").upper()
+    if name in DATE_COLUMNS or name in DAY_COLUMNS:
+        return pa.date32()
+    if name in BOOL_COLUMNS:
+        return pa.bool_()
+    if "INT" in declared:
+        return pa.int64()
+    if any(t in declared for t in ("REAL", "FLOA", "DOUB")):
+        return pa.float64()
+    return pa.string()
+
+
+def table_query(db: Database, table: str, pa) -> tuple:
+    """``(SELECT, schema)`` reading *table* with its typed columns."""
+    exprs, fields = [], []
+    for _, name, declared, *_ in db.fetchall(f"PRAGMA table_info({table})"):
+        exprs.append(DAY_SQL.format(name) if name in DATE_COLUMNS else name)
+        fields.append(pa.field(name, _arrow_type(pa, name, declared)))
+    return f"SELECT {', '.join(exprs)} FROM {table}", pa.schema(fields)
+
+
+def _column(pa, values, typ):
+    # date32 y bool se construyen desde enteros (días, 0/1) y se convierten
+    if typ == pa.date32():
+        return pa.array(values, pa.int32()).cast(typ)
+    if typ == pa.bool_():
+        return pa.array(values, pa.int8()).cast(typ)
+    return pa.array(values, typ)
+
+
+def batches(cursor, schema, pa, size: int = ROW_GROUP):
+    """Yield the rows of an executed *cursor* as record batches of *size*."""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        cols = list(zip(*rows))
+        yield pa.RecordBatch.from_arrays(
+            [_column(pa, col, f.type) for col, f in zip(cols, schema)], schema=schema)
+
+
+class _Writer:
+    """Same interface over a Parquet writer and an Arrow IPC file writer."""
+
+    def __init__(self, path: str, schema, fmt: str, row_group: int):
+        self.fmt, self.row_group = fmt, row_group
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(path, schema, compression=COMPRESSION[fmt])
+        else:
+            import pyarrow as pa
+            self.writer = pa.ipc.new_file(
+                path, schema, options=pa.ipc.IpcWriteOptions(compression=COMPRESSION[fmt]))
+
+    def write(self, batch) -> None:
+        if self.fmt == "parquet":
+            self.writer.write_batch(batch, row_group_size=self.row_group)
+        else:
+            self.writer.write_batch(batch)
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def _write(path: str, schema, fmt: str, row_group: int, source) -> int:
+    """Write the batches of *source* to *path* atomically; return the rows."""
+    tmp = path + ".tmp"
+    writer = _Writer(tmp, schema, fmt, row_group)
+    rows = 0
+    try:
+        for batch in source:
+            writer.write(batch)
+            rows += batch.num_rows
+    finally:
+        writer.close()
+    os.replace(tmp, path)
+    return rows
+
+
+@traced(cat="io", args=lambda db, out_dir, *a, **k: {"path": out_dir})
+def export_snapshot(db: Database, out_dir: str, fmt: str = "parquet",
+                    row_group: int = ROW_GROUP) -> dict:
+    """Write every table and aggregate to ``out_dir/<nombre>.<fmt>``.
+
+    All files come from the same consistent read of the database: a copy
+    taken with the online backup API, so other users are locked out of
+    writing only while the file is copied, not while the files are written.
+    Returns ``{name: rows}``.
+    """
+    import pyarrow as pa
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato desconocido: {fmt}")
+    os.makedirs(out_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, "snapshot.db")
+        db.save_as(copy)
+        snap = Database(copy, readonly=True)
+        try:
+            return _export(snap, out_dir, fmt, row_group, pa)
+        finally:
+            snap.close()  # Windows no borra un archivo abierto
+
+
+def _export(db: Database, out_dir: str, fmt: str, row_group: int, pa) -> dict:
+    meta = {b"schema_version": str(db.schema_version()).encode()}
+    path = lambda name: os.path.join(out_dir, name + FORMATS[fmt])
+    counts = {}
+    with closing(db.conn.cursor()) as cur:
+        for table in TABLES:
+            sql, schema = table_query(db, table, pa)
+            schema = schema.with_metadata(meta)
+            cur.execute(sql)
+            counts[table] = _write(path(table), schema, fmt, row_group,
+                                   batches(cur, schema, pa, row_group))
+        for name, (sql, cols) in AGGREGATES.items():
+            schema = pa.schema([(c, t) for c, t in cols], metadata=meta)
+            cur.execute(sql)
+            counts[name] = _write(path(name), schema, fmt, row_group,
+                                  batches(cur, schema, pa, row_group))
+    schema = pa.schema([(c, t) for c, t in COMUNIDAD_COLUMNS], metadata=meta)
+    rows = db.rollup_comunidades()
+    source = [pa.RecordBatch.from_pylist(
+        [dict(zip(schema.names, r)) for r in rows], schema=schema)] if rows else []
+    counts["comunidades"] = _write(path("comunidades"), schema, fmt, row_group, source)
+    return counts
+
+
+def read_snapshot(path: str):
+    """Load one exported file as a ``pyarrow.Table`` through a memory map."""
+    import pyarrow as pa
+    if path.endswith(FORMATS["arrow"]):
+        # Las columnas apuntan al archivo mapeado: no se copian a memoria
+        return pa.ipc.open_file(pa.memory_map(path)).read_all()
+    import pyarrow.parquet as pq
+    return pq.read_table(path, memory_map=True)
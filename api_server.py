@@ -0,0 +1,144 @@
+"""Read-only HTTP API with the dashboard and summary figures.
+
+Endpoints (all JSON)::
+
+    GET /api/dashboard   status counts and project progress
+    GET /api/progress    project progress only
+    GET /api/summary     progress per atajado (Resumen tab rows)
+
+Responses are cached per endpoint and keyed by the database's data
+version: a dedicated probe connection reads ``PRAGMA data_version``, which
+changes whenever another connection commits. Clients get an ``ETag`` and
+receive ``304 Not Modified`` while the data is unchanged. Queries run on a
+small pool of read-only connections.
+"""
+
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from database import Database
+
+
+def _dashboard(db: Database) -> dict:
+    return {"status": db.status_counts(), "project_progress": db.get_project_progress()}
+
+
+def _progress(db: Database) -> dict:
+    return {"project_progress": db.get_project_progress()}
+
+
+def _summary(db: Database) -> dict:
+    return {
+        "rows": [
+            {"atajado": num, "beneficiario": ben, "fecha": dt, "avance": pct}
+            for num, ben, dt, pct in db.summary_rows()
+        ]
+    }
+
+
+ENDPOINTS = {
+    "/api/dashboard": _dashboard,
+    "/api/progress": _progress,
+    "/api/summary": _summary,
+}
+
+
+class ApiServer(ThreadingHTTPServer):
+    """HTTP server owning the read connection pool and the response cache."""
+
+    daemon_threads = True
+
+    def __init__(self, address, db_file: str, pool_size: int = 4):
+        super().__init__(address, ApiHandler)
+        self.db_file = db_file
+        self.boot = format(int(time.time()), "x")
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(Database(db_file, readonly=True, check_same_thread=False))
+        self._probe = Database(db_file, readonly=True, check_same_thread=False)
+        self._probe_lock = threading.Lock()
+        self._last_version = None
+        self.generation = 0
+        self._cache = {}  # ruta -> (generación, cuerpo)
+        self._cache_lock = threading.Lock()
+
+    def data_generation(self) -> int:
+        """Return a counter that increases whenever the database changes."""
+        with self._probe_lock:
+            version = self._probe.fetchall("PRAGMA data_version")[0][0]
+            if version != self._last_version:
+                self._last_version = version
+                self.generation += 1
+            return self.generation
+
+    def response(self, path: str, generation: int) -> bytes:
+        """Return the JSON body for *path*, computing it only on a cache miss."""
+        with self._cache_lock:
+            cached = self._cache.get(path)
+        if cached and cached[0] == generation:
+            return cached[1]
+        db = self._pool.get()
+        try:
+            data = ENDPOINTS[path](db)
+        finally:
+            self._pool.put(db)
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        with self._cache_lock:
+            self._cache[path] = (generation, body)
+        return body
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._probe.close()
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "SeguimientoAPI/1.0"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/") or "/"
+        if path == "/":
+            return self._send(200, json.dumps({"endpoints": sorted(ENDPOINTS)}).encode("utf-8"))
+        if path not in ENDPOINTS:
+            return self._send(404, b'{"error": "not found"}')
+        generation = self.server.data_generation()
+        etag = f'"{self.server.boot}-{generation}"'
+        if etag in self.headers.get("If-None-Match", ""):
+            return self._send(304, b"", etag)
+        try:
+            body = self.server.response(path, generation)
+        except Exception as exc:
+            return self._send(500, json.dumps({"error": str(exc)}).encode("utf-8"))
+        self._send(200, body, etag)
+
+    def _send(self, code: int, body: bytes, etag: str = None):
+        self.send_response(code)
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if code != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        if code != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(db_file: str, host: str = "127.0.0.1", port: int = 8765, pool_size: int = 4) -> None:
+    """Serve the API until interrupted."""
+    server = ApiServer((host, port), db_file, pool_size)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -2,17 +2,15 @@
 """Aplicación principal Qt con modo claro/oscuro y barra de menús completa."""
 
 import logging
+import multiprocessing
+import os
 import sys
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QMessageBox, QFileDialog,
-    QToolBar, QWidget, QCheckBox, QSizePolicy
+    QToolBar, QWidget, QCheckBox, QSizePolicy, QInputDialog
 )
 from PyQt6.QtGui import QAction, QIcon
-from PyQt6.QtCore import Qt
-
-import pandas as pd
-from fpdf import FPDF
-from docx import Document
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 
 from database       import Database
 from dashboard_tab  import DashboardTab
@@ -21,28 +19,22 @@ from atajados_tab   import AtajadosTab
 from avance_tab     import AvanceTab
 from cronograma_tab import CronogramaTab
 from summary_tab    import SummaryTab
+from comunidades_tab import ComunidadesTab
+from scenario_tab   import ScenarioTab
+from portfolio_dialog import PortfolioDialog
+from workspace      import Workspace, project_name
+from sync           import export_delta, import_delta, PACKAGE_EXT
+from backup         import SnapshotManager
+from charts         import FORMATS, chart_jobs, start_export
+from change_watcher import ChangeWatcher
+import reports
+import analytics
+import photo_pack
+from theme import ThemeManager
+from tracing import traced
 
-
-# -------------------  Hojas de estilo  -------------------
-LIGHT_QSS = """
-    QWidget         { background: #ffffff; color: #202020; font-family: Segoe UI; font-size: 12pt; }
-    QGroupBox       { border: 1px solid #ccc; border-radius: 10px; padding: 10px; }
-    QPushButton     { background: #1976D2; color: #fff; border-radius: 6px; padding: 6px 14px; }
-    QPushButton:hover { background: #1259a4; }
-    QLineEdit       { background: #fafafa; border: 1px solid #aaa; border-radius: 6px; padding: 5px; }
-    QTableWidget    { background: #f9f9f9; alternate-background-color: #e8f0fe; border: 1px solid #ccc; }
-    QHeaderView::section { background: #d0e8ff; padding: 4px; font-weight: bold; border: 1px solid #ccc; }
-"""
-
-DARK_QSS = """
-    QWidget         { background: #1e1e1e; color: #e0e0e0; font-family: Segoe UI; font-size: 12pt; }
-    QGroupBox       { background: #252525; border: 1px solid #444; border-radius: 10px; padding: 10px; }
-    QPushButton     { background: #0d6efd; color: #fff; border-radius: 6px; padding: 6px 14px; }
-    QPushButton:hover { background: #1a75ff; }
-    QLineEdit       { background: #2a2a2a; border: 1px solid #555; border-radius: 6px; padding: 5px; color: #e0e0e0; }
-    QTableWidget    { background: #272727; alternate-background-color: #1f1f1f; color: #e0e0e0; border: 1px solid #444; }
-    QHeaderView::section { background: #353535; padding: 4px; font-weight: bold; border: 1px solid #444; color:#e0e0e0; }
-"""
+# Minutos entre copias de seguridad automáticas
+SNAPSHOT_INTERVAL_MIN = 30
 
 
 # -------------------  Toggle de tema  --------------------
@@ -80,10 +72,16 @@ class ThemeToggle(QCheckBox):
 
 # -------------------  Ventana principal  -----------------
 class MainWindow(QMainWindow):
-    def __init__(self):
+    snapshot_done = pyqtSignal(object)
+    charts_done = pyqtSignal(object)
+
+    def __init__(self, db_file=None):
         super().__init__()
-        self.db = Database()
-        self.setWindowTitle("Supervisión de Atajados")
+        self.workspace = Workspace()
+        self.db_file = self.workspace.open(db_file or self.workspace.current_or_default())
+        self.db = Database(self.db_file)
+        self.snapshots = SnapshotManager(self.db_file)
+        self.update_title()
         self.setWindowIcon(QIcon("resources/icono.png"))  # verifica la ruta
         self.resize(1200, 800)
 
@@ -95,6 +93,8 @@ class MainWindow(QMainWindow):
         self.avance_tab     = AvanceTab(self.db, save_callback=self.refresh_all)
         self.cronograma_tab = CronogramaTab(self.db)
         self.summary_tab    = SummaryTab(self.db)
+        self.comunidades_tab = ComunidadesTab(self.db)
+        self.scenario_tab   = ScenarioTab(self.db)
 
         self.tabs.addTab(self.dashboard_tab,  "Inicio")
         self.tabs.addTab(self.items_tab,      "Ítems")
@@ -102,6 +102,8 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(self.avance_tab,     "Seguimiento")
         self.tabs.addTab(self.cronograma_tab, "Cronograma")
         self.tabs.addTab(self.summary_tab,    "Resumen")
+        self.tabs.addTab(self.comunidades_tab, "Comunidades")
+        self.tabs.addTab(self.scenario_tab,   "Escenarios")
         self.setCentralWidget(self.tabs)
 
         # ---------- Menú ----------
@@ -112,17 +114,31 @@ class MainWindow(QMainWindow):
         reportes = menubar.addMenu("Reportes")
         exportar = menubar.addMenu("Exportar")
 
-        archivo.addAction("Nuevo trabajo")
-        archivo.addAction("Añadir trabajo")
-        archivo.addAction("Guardar trabajo")
-        datos.addAction("Ítems").triggered.connect(lambda: self.tabs.setCurrentIndex(1))
-        datos.addAction("Atajados").triggered.connect(lambda: self.tabs.setCurrentIndex(2))
-        estado.addAction("Cronograma").triggered.connect(lambda: self.tabs.setCurrentIndex(4))
-        estado.addAction("Seguimiento").triggered.connect(lambda: self.tabs.setCurrentIndex(3))
-        reportes.addAction("Generar reporte").triggered.connect(lambda: self.tabs.setCurrentIndex(5))
+        archivo.addAction("Nuevo trabajo").triggered.connect(self.new_project)
+        archivo.addAction("Añadir trabajo").triggered.connect(self.add_project)
+        archivo.addAction("Guardar trabajo").triggered.connect(self.save_project)
+        self.recent_menu = archivo.addMenu("Trabajos recientes")
+        self.recent_menu.aboutToShow.connect(self.fill_recent_menu)
+        archivo.addAction("Cartera de trabajos…").triggered.connect(self.show_portfolio)
+        archivo.addSeparator()
+        archivo.addAction("Exportar sincronización…").triggered.connect(self.export_sync)
+        archivo.addAction("Importar sincronización…").triggered.connect(self.import_sync)
+        archivo.addSeparator()
+        archivo.addAction("Crear copia de seguridad").triggered.connect(self.create_snapshot)
+        archivo.addAction("Restaurar copia de seguridad…").triggered.connect(self.restore_snapshot)
+        archivo.addAction("Empaquetar fotos").triggered.connect(self.pack_photos)
+        datos.addAction("Ítems").triggered.connect(lambda: self.tabs.setCurrentWidget(self.items_tab))
+        datos.addAction("Atajados").triggered.connect(lambda: self.tabs.setCurrentWidget(self.atajados_tab))
+        estado.addAction("Cronograma").triggered.connect(lambda: self.tabs.setCurrentWidget(self.cronograma_tab))
+        estado.addAction("Seguimiento").triggered.connect(lambda: self.tabs.setCurrentWidget(self.avance_tab))
+        reportes.addAction("Generar reporte").triggered.connect(lambda: self.tabs.setCurrentWidget(self.summary_tab))
+        reportes.addAction("Escenarios").triggered.connect(lambda: self.tabs.setCurrentWidget(self.scenario_tab))
         exportar.addAction("A Excel").triggered.connect(self.to_excel)
         exportar.addAction("A PDF").triggered.connect(self.to_pdf)
         exportar.addAction("A Word").triggered.connect(self.to_word)
+        exportar.addSeparator()
+        exportar.addAction("Gráficos en alta resolución…").triggered.connect(self.export_charts)
+        exportar.addAction("Datos para análisis (Parquet/Arrow)…").triggered.connect(self.export_analytics)
 
         # ---------- Toolbar + toggle ----------
         toolbar = QToolBar(); toolbar.setMovable(False)
@@ -130,77 +146,319 @@ class MainWindow(QMainWindow):
         spacer = QWidget()
         spacer.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
         toolbar.addWidget(spacer)
+        self.theme = ThemeManager(QApplication.instance())  # inicia claro
+        for view in (self.dashboard_tab, self.cronograma_tab):
+            self.theme.changed.connect(view.set_theme)
         self.theme_toggle = ThemeToggle()
-        self.theme_toggle.toggled.connect(self.apply_theme)  # ← señal correcta
+        self.theme_toggle.toggled.connect(self.apply_theme)
         toolbar.addWidget(self.theme_toggle)
-        self.apply_theme(False)  # inicia claro
+
+        # ---------- Copias automáticas ----------
+        self.snapshot_done.connect(self.on_snapshot_done)
+        self.charts_done.connect(self.on_charts_done)
+        self._chart_thread = None
+        self.snapshot_timer = QTimer(self)
+        self.snapshot_timer.timeout.connect(lambda: self.create_snapshot(quiet=True))
+        self.snapshot_timer.start(SNAPSHOT_INTERVAL_MIN * 60 * 1000)
+
+        # ---------- Cambios de otras instancias ----------
+        # Pestañas que muestran datos de cada tabla
+        self.views_by_table = {
+            "items":      (self.dashboard_tab, self.items_tab, self.cronograma_tab,
+                           self.summary_tab, self.scenario_tab, self.comunidades_tab),
+            "atajados":   (self.dashboard_tab, self.atajados_tab, self.summary_tab,
+                           self.scenario_tab, self.avance_tab, self.comunidades_tab),
+            "avances":    (self.dashboard_tab, self.cronograma_tab, self.summary_tab,
+                           self.scenario_tab, self.comunidades_tab),
+            "cronograma": (self.cronograma_tab,),
+        }
+        self.watcher = ChangeWatcher(self.db, parent=self)
+        self.watcher.tablesChanged.connect(self.on_external_changes)
+        self.watcher.start()
 
     # -------------------  Tema -------------------
+    @traced(cat="ui")
     def apply_theme(self, checked: bool):
-        """Aplicar QSS global; primero limpia para refrescar widgets."""
-        app = QApplication.instance()
-        app.setStyleSheet("")                                  # limpiar
-        app.setStyleSheet(DARK_QSS if checked else LIGHT_QSS)  # nuevo
+        """Cambia la paleta (sin hojas de estilo) y avisa a los gráficos."""
+        self.theme.apply(checked)
 
     # -------------------  Refresh -------------------
+    @traced(cat="ui")
     def refresh_all(self):
         self.dashboard_tab.refresh()
         self.items_tab.refresh()
         self.atajados_tab.refresh()
         self.cronograma_tab.refresh()
         self.summary_tab.refresh()
+        self.comunidades_tab.refresh()
+        self.scenario_tab.refresh()
+
+    def on_external_changes(self, tables):
+        """Refresca solo las pestañas afectadas por cambios de otra instancia."""
+        views = []
+        for tbl in sorted(tables):
+            views += [v for v in self.views_by_table.get(tbl, ()) if v not in views]
+        for view in views:
+            buffer = getattr(view, "buffer", None)
+            if buffer is not None and buffer.dirty:
+                continue  # no pisar ediciones sin guardar
+            if view is self.avance_tab:
+                view.reload_atajados()
+            else:
+                view.refresh()
+        self.statusBar().showMessage("Datos actualizados por otro usuario", 3000)
+
+    # -------------------  Trabajos -------------------
+    def update_title(self):
+        self.setWindowTitle(f"Supervisión de Atajados — {project_name(self.db_file)}")
+
+    @traced(cat="ui")
+    def switch_project(self, path):
+        """Cambia la base de datos activa sin reiniciar la aplicación."""
+        self.items_tab.flush_edits()
+        self.atajados_tab.flush_edits()
+        try:
+            db = Database(path)
+        except Exception as exc:
+            logging.exception("Error abriendo trabajo")
+            QMessageBox.critical(self, "Error", f"No se pudo abrir el trabajo:\n{exc}")
+            return
+        old, self.db = self.db, db
+        for tab in (self.dashboard_tab, self.items_tab, self.atajados_tab,
+                    self.cronograma_tab, self.summary_tab, self.comunidades_tab,
+                    self.scenario_tab):
+            tab.db = db
+        self.items_tab.buffer.db = db
+        self.atajados_tab.buffer.db = db
+        old.close()
+        self.db_file = self.workspace.open(path)
+        self.snapshots = SnapshotManager(self.db_file)
+        self.update_title()
+        self.avance_tab.set_database(db)
+        self.watcher.set_database(db)
+        self.watcher.start()
+        self.refresh_all()
+
+    def new_project(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Nuevo trabajo", "", "Trabajo (*.db)")
+        if not path: return
+        if os.path.exists(path):
+            QMessageBox.warning(self, "Nuevo trabajo", "El archivo ya existe; use «Añadir trabajo».")
+            return
+        self.switch_project(path)
+
+    def add_project(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Añadir trabajo", "", "Trabajo (*.db)")
+        if path: self.switch_project(path)
+
+    def save_project(self):
+        """Guarda una copia del trabajo actual y la añade al espacio de trabajo."""
+        path, _ = QFileDialog.getSaveFileName(self, "Guardar trabajo", "", "Trabajo (*.db)")
+        if not path: return
+        self.items_tab.flush_edits()
+        self.atajados_tab.flush_edits()
+        try:
+            self.db.save_as(path)
+            self.workspace.open(path)
+            self.workspace.open(self.db_file)  # sigue activo el trabajo actual
+            QMessageBox.information(self, "✔", "Trabajo guardado")
+        except Exception as exc:
+            logging.exception("Error guardando trabajo"); QMessageBox.critical(self, "Error", str(exc))
+
+    def fill_recent_menu(self):
+        self.recent_menu.clear()
+        for path in self.workspace.projects:
+            act = self.recent_menu.addAction(project_name(path))
+            act.setToolTip(path)
+            act.setCheckable(True); act.setChecked(path == self.db_file)
+            act.setEnabled(os.path.exists(path))
+            act.triggered.connect(lambda _=False, p=path: self.switch_project(p))
+
+    def show_portfolio(self):
+        try:
+            PortfolioDialog(self.workspace.projects, self).exec()
+        except Exception as exc:
+            logging.exception("Error cartera"); QMessageBox.critical(self, "Error", str(exc))
+
+    # -------------------  Sincronización -------------------
+    def export_sync(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Exportar sincronización", "",
+                                              f"Paquete (*{PACKAGE_EXT})")
+        if not path: return
+        incremental = QMessageBox.question(
+            self, "Exportar sincronización",
+            "¿Exportar solo los cambios desde la última exportación?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        ) == QMessageBox.StandardButton.Yes
+        self.items_tab.flush_edits()
+        self.atajados_tab.flush_edits()
+        try:
+            info = export_delta(self.db, path, since=None if incremental else 0)
+            QMessageBox.information(
+                self, "✔", f"Paquete generado: {info['upserts']} cambios, "
+                           f"{info['deletes']} eliminaciones ({info['bytes']} bytes)")
+        except Exception as exc:
+            logging.exception("Error exportando sincronización"); QMessageBox.critical(self, "Error", str(exc))
+
+    def import_sync(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Importar sincronización", "",
+                                              f"Paquete (*{PACKAGE_EXT})")
+        if not path: return
+        self.items_tab.flush_edits()
+        self.atajados_tab.flush_edits()
+        try:
+            info = import_delta(self.db, path)
+        except Exception as exc:
+            logging.exception("Error importando sincronización"); QMessageBox.critical(self, "Error", str(exc))
+            return
+        self.avance_tab.reload_atajados()
+        self.refresh_all()
+        QMessageBox.information(
+            self, "✔", f"Cambios aplicados: {info['applied']} (omitidos por ser más antiguos: {info['skipped']})")
+
+    # -------------------  Copias de seguridad -------------------
+    def create_snapshot(self, quiet=False):
+        """Inicia una copia en segundo plano; la interfaz sigue respondiendo."""
+        self.items_tab.flush_edits()
+        self.atajados_tab.flush_edits()
+        self._snapshot_quiet = quiet
+        if self.snapshots.start(self.snapshot_done.emit):
+            self.statusBar().showMessage("Creando copia de seguridad…")
+        elif not quiet:
+            QMessageBox.information(self, "Copia de seguridad", "Ya hay una copia en curso.")
+
+    def on_snapshot_done(self, result):
+        if isinstance(result, Exception):
+            logging.error("Error creando copia de seguridad: %s", result)
+            self.statusBar().showMessage("Error en la copia de seguridad", 5000)
+            if not self._snapshot_quiet:
+                QMessageBox.critical(self, "Error", str(result))
+            return
+        self.statusBar().showMessage(
+            f"Copia {result['created']} creada ({result['copied_images']} fotos nuevas)", 5000)
+
+    def restore_snapshot(self):
+        snaps = self.snapshots.snapshots()
+        if not snaps:
+            QMessageBox.information(self, "Restaurar", "No hay copias de seguridad de este trabajo.")
+            return
+        labels = [f"{s['created']}  ({len(s['images'])} fotos)" for s in snaps]
+        label, ok = QInputDialog.getItem(self, "Restaurar copia", "Copia:", labels, 0, False)
+        if not ok: return
+        if QMessageBox.question(
+            self, "Restaurar copia",
+            "Se reemplazarán los datos actuales del trabajo. ¿Continuar?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        ) != QMessageBox.StandardButton.Yes:
+            return
+        self.items_tab.flush_edits()
+        self.atajados_tab.flush_edits()
+        self.snapshots.wait()
+        # Sin vigilante: el diálogo de error abre un bucle de eventos y poll()
+        # consultaría la conexión cerrada; switch_project lo vuelve a iniciar
+        self.watcher.stop()
+        self.db.close()
+        try:
+            self.snapshots.restore(snaps[labels.index(label)]["id"])
+        except Exception as exc:
+            logging.exception("Error restaurando copia"); QMessageBox.critical(self, "Error", str(exc))
+        self.switch_project(self.db_file)  # reabre la base y recarga las pestañas
+
+    def pack_photos(self):
+        """Une las fotos sueltas de cada atajado en su paquete (copias más rápidas)."""
+        self.snapshots.wait()  # la copia en curso lee las fotos sueltas
+        try:
+            packed = photo_pack.pack_all()
+        except Exception as exc:
+            logging.exception("Error empaquetando fotos"); QMessageBox.critical(self, "Error", str(exc))
+            return
+        if self.avance_tab.current_atajado is not None:
+            self.avance_tab.load_thumbnails(self.avance_tab.current_atajado)
+        QMessageBox.information(
+            self, "Empaquetar fotos",
+            f"{sum(packed.values())} fotos empaquetadas en {len(packed)} atajados.")
 
     # -------------------  Cerrar -------------------
     def closeEvent(self, event):
+        self.items_tab.flush_edits()
+        self.atajados_tab.flush_edits()
+        self.snapshot_timer.stop()
+        self.watcher.stop()
+        self.snapshots.wait()
         self.db.close()
         super().closeEvent(event)
 
     # -------------------  Exportar ------------------
     def to_excel(self):
-        path, _ = QFileDialog.getSaveFileName(self, "Guardar", "", "*.xlsx")
+        self._export("xlsx", "Excel")
+
+    def to_pdf(self):
+        self._export("pdf", "PDF")
+
+    def to_word(self):
+        self._export("docx", "Word")
+
+    def _export(self, fmt, label):
+        path, _ = QFileDialog.getSaveFileName(self, "Guardar", "", f"*.{fmt}")
         if not path: return
+        self.items_tab.flush_edits()
+        self.atajados_tab.flush_edits()
         try:
-            df_items = pd.read_sql("SELECT * FROM items", self.db.conn)
-            df_ataj  = pd.read_sql("SELECT * FROM atajados", self.db.conn)
-            with pd.ExcelWriter(path) as w:
-                df_items.to_excel(w, "Ítems",  index=False)
-                df_ataj.to_excel(w,  "Atajados", index=False)
-            QMessageBox.information(self, "✔", "Excel generado")
+            reports.EXPORTERS[fmt](self.db, path)
+            QMessageBox.information(self, "✔", f"{label} generado")
         except Exception as exc:
-            logging.exception("Error Excel"); QMessageBox.critical(self, "Error", str(exc))
+            logging.exception(f"Error {label}"); QMessageBox.critical(self, "Error", str(exc))
 
-    def to_pdf(self):
-        path, _ = QFileDialog.getSaveFileName(self, "Guardar", "", "*.pdf")
-        if not path: return
+
+    def export_analytics(self):
+        """Exporta tablas y agregados en formato columnar para pandas/Arrow."""
+        out_dir = QFileDialog.getExistingDirectory(self, "Carpeta para los datos")
+        if not out_dir: return
+        fmt, ok = QInputDialog.getItem(self, "Datos para análisis", "Formato:",
+                                       ["Parquet", "Arrow"], 0, False)
+        if not ok: return
+        self.items_tab.flush_edits()
+        self.atajados_tab.flush_edits()
         try:
-            pdf = FPDF(); pdf.add_page(); pdf.set_font("Arial", size=12)
-            pdf.cell(0, 10, "Reporte Ítems", ln=1)
-            for n, t in self.db.fetchall("SELECT name,total FROM items"):
-                pdf.cell(0, 8, f"{n}: {t}", ln=1)
-            pdf.add_page(); pdf.cell(0, 10, "Reporte Atajados", ln=1)
-            for num, com in self.db.fetchall("SELECT number,comunidad FROM atajados"):
-                pdf.cell(0, 8, f"{num} - {com}", ln=1)
-            pdf.output(path); QMessageBox.information(self, "✔", "PDF generado")
+            counts = analytics.export_snapshot(self.db, out_dir, fmt.lower())
+            QMessageBox.information(self, "✔", f"{len(counts)} tablas exportadas")
         except Exception as exc:
-            logging.exception("Error PDF"); QMessageBox.critical(self, "Error", str(exc))
+            logging.exception("Error exportando datos"); QMessageBox.critical(self, "Error", str(exc))
 
-    def to_word(self):
-        path, _ = QFileDialog.getSaveFileName(self, "Guardar", "", "*.docx")
-        if not path: return
+    def export_charts(self):
+        """Exporta Gantt (total y por comunidad) y estados sin bloquear la interfaz."""
+        if self._chart_thread is not None and self._chart_thread.is_alive():
+            QMessageBox.information(self, "Gráficos", "Ya hay una exportación en curso.")
+            return
+        out_dir = QFileDialog.getExistingDirectory(self, "Carpeta para los gráficos")
+        if not out_dir: return
+        fmt, ok = QInputDialog.getItem(self, "Exportar gráficos", "Formato:",
+                                       ["PNG", "PDF", "SVG", "Todos"], 0, False)
+        if not ok: return
+        self.items_tab.flush_edits()
+        self.atajados_tab.flush_edits()
         try:
-            doc = Document(); doc.add_heading("Reporte Ítems", level=1)
-            for n, t in self.db.fetchall("SELECT name,total FROM items"):
-                doc.add_paragraph(f"{n}: {t}")
-            doc.add_page_break(); doc.add_heading("Reporte Atajados", level=1)
-            for num, com in self.db.fetchall("SELECT number,comunidad FROM atajados"):
-                doc.add_paragraph(f"{num} - {com}")
-            doc.save(path); QMessageBox.information(self, "✔", "Word generado")
+            jobs = chart_jobs(self.db, out_dir, FORMATS if fmt == "Todos" else (fmt.lower(),))
         except Exception as exc:
-            logging.exception("Error Word"); QMessageBox.critical(self, "Error", str(exc))
+            logging.exception("Error leyendo datos de gráficos"); QMessageBox.critical(self, "Error", str(exc))
+            return
+        self._chart_thread = start_export(jobs, self.charts_done.emit)
+        self.statusBar().showMessage(f"Exportando {len(jobs)} gráficos…")
+
+    def on_charts_done(self, result):
+        if isinstance(result, Exception):
+            logging.error("Error exportando gráficos: %s", result)
+            self.statusBar().clearMessage()
+            QMessageBox.critical(self, "Error", str(result))
+            return
+        self.statusBar().showMessage(f"{len(result)} archivos de gráficos generados", 5000)
 
 
 # -------------------  Lanzador -------------------
 if __name__ == "__main__":
+    # En el ejecutable congelado, los procesos de exportación de gráficos
+    # (spawn) deben ejecutar su tarea en lugar de abrir otra ventana
+    multiprocessing.freeze_support()
     logging.basicConfig(level=logging.INFO, filename="app.log",
                         format="%(asctime)s %(levelname)s %(message)s")
     app = QApplication(sys.argv)
@@ -0,0 +1,129 @@
+# atajado_completer.py
+"""Completer for the atajado selector backed by indexed SQL prefix searches.
+
+Instead of loading every ``number – beneficiario`` pair up front, the model
+asks :meth:`database.Database.search_atajados` for the first matches of
+whatever has been typed, and re-runs the query when the database changes.
+Each row carries the atajado number in ``Qt.ItemDataRole.UserRole`` and
+the row id in ``ID_ROLE``.
+"""
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt6.QtWidgets import QCompleter, QLineEdit
+
+from database import Database, SEARCH_LIMIT
+
+ID_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+def atajado_label(number, beneficiario) -> str:
+    return f"{number} – {beneficiario or ''}"
+
+
+class AtajadoSearchModel(QAbstractListModel):
+    """Top matches of the current search text."""
+
+    def __init__(self, db: Database, limit: int = SEARCH_LIMIT, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.limit = limit
+        self.text = ""
+        self.rows = []
+        self._stamp = None
+
+    def search(self, text: str) -> None:
+        """Run the query for *text* unless it and the data are unchanged."""
+        stamp = self.db.data_stamp()
+        if text == self.text and stamp == self._stamp:
+            return
+        self.beginResetModel()
+        self.text, self._stamp = text, stamp
+        self.rows = self.db.search_atajados(text, self.limit)
+        self.endResetModel()
+
+    def refresh(self) -> None:
+        """Re-run the current search if the database changed."""
+        self.search(self.text)
+
+    def set_database(self, db: Database) -> None:
+        self.db = db
+        self._stamp = None
+        self.refresh()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        rid, number, ben, com = self.rows[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return atajado_label(number, ben)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return com
+        if role == Qt.ItemDataRole.UserRole:
+            return number
+        if role == ID_ROLE:
+            return rid
+        return None
+
+
+class AtajadoSelector(QLineEdit):
+    """Line edit that searches atajados as the user types.
+
+    ``atajadoSelected`` is emitted with the atajado number when a match is
+    chosen from the popup or Enter is pressed on a non-empty search.
+    """
+
+    atajadoSelected = pyqtSignal(int)
+
+    def __init__(self, db: Database, parent=None):
+        super().__init__(parent)
+        self.setPlaceholderText("Número, beneficiario o comunidad…")
+        self.model = AtajadoSearchModel(db, parent=self)
+        self.completer_ = QCompleter(self.model, self)
+        # El modelo ya viene filtrado por SQL; el completer solo lo muestra
+        self.completer_.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.completer_.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.setCompleter(self.completer_)
+        self._shown = None  # (texto mostrado, número) de la última selección
+        self.completer_.activated[QModelIndex].connect(self._on_activated)
+        self.textEdited.connect(self._on_edited)
+        self.returnPressed.connect(self.select_current)
+
+    def _on_edited(self, text: str) -> None:
+        self.model.search(text)
+        if self.model.rows:
+            self.completer_.complete()
+
+    def _on_activated(self, index: QModelIndex) -> None:
+        number = index.data(Qt.ItemDataRole.UserRole)
+        if number is not None:
+            self._shown = (index.data(Qt.ItemDataRole.DisplayRole), number)
+            self.atajadoSelected.emit(number)
+
+    def first_match(self):
+        """Return the number of the best match for the current text, or None.
+
+        The text of the last selection maps back to its number directly; it
+        is never parsed.
+        """
+        if self._shown is not None and self._shown[0] == self.text():
+            return self._shown[1]
+        self.model.search(self.text().strip())
+        if not self.model.rows:
+            return None
+        return self.model.index(0).data(Qt.ItemDataRole.UserRole)
+
+    def select_current(self) -> None:
+        number = self.first_match()
+        if number is not None:
+            self.show_atajado(number)
+            self.atajadoSelected.emit(number)
+
+    def show_atajado(self, number) -> None:
+        """Display *number* without triggering a new search popup."""
+        row = self.model.db.fetchall(
+            "SELECT beneficiario FROM atajados WHERE number=? LIMIT 1", (number,))
+        self.setText(atajado_label(number, row[0][0] if row else ""))
+        self._shown = (self.text(), number)
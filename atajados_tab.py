@@ -1,18 +1,38 @@
 # atajados_tab.py
-import os
-import pandas as pd
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QPushButton,
     QDialog, QFormLayout, QLineEdit, QTableWidgetItem, QFileDialog,
-    QMessageBox, QAbstractItemView, QHeaderView
+    QMessageBox, QAbstractItemView, QHeaderView, QApplication
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QKeySequence, QShortcut
 from database import Database
+from tracing import traced
+import importers
+from edit_buffer import EditBuffer
+from conflict_dialog import resolve_buffer_conflicts
+
+# Retardo (ms) antes de escribir las ediciones acumuladas
+FLUSH_DELAY_MS = 400
+
+# Columnas editables de la tabla -> campos de 'atajados'
+ATAJADO_FIELDS = {
+    1: "comunidad",
+    2: "number",
+    3: "beneficiario",
+    4: "ci",
+    5: "coord_e",
+    6: "coord_n",
+}
+NUMERIC_FIELDS = ("number", "coord_e", "coord_n")
+ATAJADO_LABELS = {"comunidad": "Comunidad", "number": "Atajado", "beneficiario": "Nombre",
+                  "ci": "CI", "coord_e": "Este", "coord_n": "Norte"}
 
 class AtajadosTab(QWidget):
     def __init__(self, db: Database):
         super().__init__()
         self.db = db
+        self.buffer = EditBuffer(db, "atajados", ATAJADO_FIELDS.values())
         self.layout = QVBoxLayout(self)
 
         # Toolbar con Importar, Añadir y Eliminar
@@ -41,25 +61,42 @@ class AtajadosTab(QWidget):
         self.del_btn.clicked.connect(self.delete_atajado)
         self.table.cellChanged.connect(self.on_cell_changed)
 
+        # Escritura diferida + deshacer/rehacer
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FLUSH_DELAY_MS)
+        self._flush_timer.timeout.connect(self.flush_edits)
+        app = QApplication.instance()
+        if app is not None:
+            app.focusChanged.connect(self._on_focus_changed)
+        ctx = Qt.ShortcutContext.WidgetWithChildrenShortcut
+        QShortcut(QKeySequence.StandardKey.Undo, self.table, self.undo_edit, context=ctx)
+        QShortcut(QKeySequence.StandardKey.Redo, self.table, self.redo_edit, context=ctx)
+
         self._loading = False
         self.refresh()
 
+    @traced(cat="ui")
     def refresh(self):
         """Carga todos los atajados (sin fechas ni estado)."""
+        self.flush_edits(reload=False)
         self._loading = True
         rows = self.db.fetchall(
-            "SELECT id, comunidad, number, beneficiario, ci, coord_e, coord_n FROM atajados"
+            "SELECT id, comunidad, number, beneficiario, ci, coord_e, coord_n, row_version "
+            "FROM atajados"
         )
+        self.buffer.set_versions({r[0]: r[-1] for r in rows})
         self.table.clearContents()
         self.table.setRowCount(len(rows))
         self.table.setColumnCount(7)
         self.table.setHorizontalHeaderLabels([
             "ID", "Comunidad", "Atajado", "Nombre", "CI", "Este", "Norte"
         ])
-        for r, (iid, com, num, ben, ci, e, n) in enumerate(rows):
+        for r, (iid, com, num, ben, ci, e, n, _) in enumerate(rows):
             vals = [iid, com, num, ben, ci, e, n]
             for c, val in enumerate(vals):
                 item = QTableWidgetItem(str(val))
+                item.setData(Qt.ItemDataRole.UserRole, val)
                 # ID no editable
                 if c == 0:
                     item.setFlags(item.flags() ^ Qt.ItemFlag.ItemIsEditable)
@@ -73,19 +110,7 @@ class AtajadosTab(QWidget):
         if not path:
             return
         try:
-            df = pd.read_excel(path) if path.lower().endswith(("xls", "xlsx")) else pd.read_csv(path)
-            # Columnas: 'COMUNIDAD','ATAJADO','NOMBRE','CI','ESTE','NORTE'
-            for _, row in df.iterrows():
-                com = str(row.get("COMUNIDAD","")).strip()
-                num = str(row.get("ATAJADO","")).replace("Atajado #","").strip()
-                ben = str(row.get("NOMBRE","")).strip()
-                ci  = str(row.get("CI","")).strip()
-                e   = float(row.get("ESTE",0))
-                n   = float(row.get("NORTE",0))
-                self.db.execute(
-                    "INSERT INTO atajados(comunidad, number, beneficiario, ci, coord_e, coord_n) VALUES(?,?,?,?,?,?)",
-                    (com, int(num), ben, ci, e, n)
-                )
+            importers.import_atajados(self.db, path)
             self.refresh()
             QMessageBox.information(self, "Importación", "Atajados importados correctamente.")
         except Exception as ex:
@@ -138,29 +163,76 @@ class AtajadosTab(QWidget):
             self, "Confirmar", f"¿Eliminar atajado ID {iid}?",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         ) == QMessageBox.StandardButton.Yes:
+            self.flush_edits()
+            self.buffer.discard(iid)
             self.db.execute("DELETE FROM atajados WHERE id=?", (iid,))
             self.refresh()
 
     def on_cell_changed(self, row, col):
-        if self._loading:
-            return
-        # Mapear columnas editables a campos
-        field_map = {
-            1: "comunidad",
-            2: "number",
-            3: "beneficiario",
-            4: "ci",
-            5: "coord_e",
-            6: "coord_n"
-        }
-        if col not in field_map:
+        if self._loading or col not in ATAJADO_FIELDS:
             return
         iid = int(self.table.item(row, 0).text())
-        val = self.table.item(row, col).text()
-        field = field_map[col]
+        cell = self.table.item(row, col)
+        field = ATAJADO_FIELDS[col]
+        old = cell.data(Qt.ItemDataRole.UserRole)
+        val = cell.text()
         try:
-            if field in ("number", "coord_e", "coord_n"):
+            if field in NUMERIC_FIELDS:
                 val = float(val)
-            self.db.execute(f"UPDATE atajados SET {field}=? WHERE id=?", (val, iid))
         except ValueError:
             QMessageBox.warning(self, "Error", "Valor inválido.")
+            self._set_cell(row, col, old)
+            return
+        self._loading = True
+        cell.setData(Qt.ItemDataRole.UserRole, val)
+        self._loading = False
+        self.buffer.record(iid, field, old, val)
+        self._flush_timer.start()
+
+    # ---------- Escritura diferida y deshacer/rehacer ----------
+    def flush_edits(self, reload=True):
+        """Escribe en una sola transacción las ediciones pendientes.
+
+        Si otro usuario guardó las mismas filas, pregunta qué valores quedan
+        y (con *reload*) recarga la tabla.
+        """
+        self._flush_timer.stop()
+        self.buffer.flush()
+        if self.buffer.conflicts:
+            resolve_buffer_conflicts(self, self.buffer, ATAJADO_LABELS,
+                                     lambda iid: f"El atajado ID {iid}")
+            if reload:
+                self.refresh()
+
+    def undo_edit(self):
+        self._apply_journal(self.buffer.undo(), undo=True)
+
+    def redo_edit(self):
+        self._apply_journal(self.buffer.redo(), undo=False)
+
+    def _apply_journal(self, edit, undo):
+        if edit is None:
+            return
+        col = {v: k for k, v in ATAJADO_FIELDS.items()}[edit.column]
+        for r in range(self.table.rowCount()):
+            if self.table.item(r, 0).text() == str(edit.row_id):
+                self._set_cell(r, col, edit.old if undo else edit.new)
+                break
+        self._flush_timer.start()
+
+    def _set_cell(self, row, col, val):
+        self._loading = True
+        cell = self.table.item(row, col)
+        cell.setText(str(val))
+        cell.setData(Qt.ItemDataRole.UserRole, val)
+        self._loading = False
+
+    def _on_focus_changed(self, old, new):
+        if self.buffer.dirty and (
+            new is None or not (new is self.table or self.table.isAncestorOf(new))
+        ):
+            self.flush_edits()
+
+    def hideEvent(self, event):
+        self.flush_edits()
+        super().hideEvent(event)
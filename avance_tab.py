@@ -1,8 +1,9 @@
+import logging
 import os
 import shutil
 from datetime import datetime
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QCompleter,
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
     QTableWidget, QTableWidgetItem, QPushButton,
     QFileDialog, QMessageBox, QListWidget, QListWidgetItem, QDialog,
     QScrollArea, QDateEdit, QLineEdit, QHeaderView
@@ -10,11 +11,24 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QSize, QDate
 from PyQt6.QtGui import QPixmap, QIcon
 from database import Database
+from atajado_completer import AtajadoSelector
+from conflict_dialog import ConflictDialog
+from bulk_dialog import BulkEntryDialog
+import photo_pack
+from tracing import traced
+
+
+def photo_pixmap(data: bytes) -> QPixmap:
+    """Pixmap de una foto leída de su archivo o de un paquete."""
+    pix = QPixmap()
+    pix.loadFromData(data)
+    return pix
+
 
 class ImagePreviewDialog(QDialog):
-    def __init__(self, image_paths, index=0):
+    def __init__(self, photos, index=0):
         super().__init__()
-        self.image_paths = image_paths
+        self.photos = photos
         self.index = index
         self.setWindowTitle("Vista Previa")
         self.setWindowFlags(
@@ -46,16 +60,16 @@ class ImagePreviewDialog(QDialog):
         self._load_pixmap()
 
     def _load_pixmap(self):
-        pix = QPixmap(self.image_paths[self.index])
+        pix = photo_pixmap(photo_pack.read_photo(self.photos[self.index]))
         self._original = pix
         self._update_pixmap()
 
     def show_prev(self):
-        self.index = (self.index - 1) % len(self.image_paths)
+        self.index = (self.index - 1) % len(self.photos)
         self._load_pixmap()
 
     def show_next(self):
-        self.index = (self.index + 1) % len(self.image_paths)
+        self.index = (self.index + 1) % len(self.photos)
         self._load_pixmap()
 
     def resizeEvent(self, event):
@@ -77,24 +91,18 @@ class AvanceTab(QWidget):
         super().__init__()
         self.db = db
         self.current_atajado = None
+        self._saved = {}  # item_id -> (row_version, avance, inicio, fin) al cargar
         self._save_callback = save_callback
 
         layout = QVBoxLayout(self)
         # Selector
         sel = QHBoxLayout()
         sel.addWidget(QLabel("Atajado / Beneficiario:"))
-        self.at_combo = QComboBox()
-        ats = self.db.fetchall("SELECT number, beneficiario FROM atajados")
-        opts = [f"{num} – {ben}" for num, ben in ats]
-        self.at_combo.addItems(opts)
-        self.at_combo.setEditable(True)
-        comp = QCompleter(opts)
-        comp.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
-        self.at_combo.setCompleter(comp)
-        self.at_combo.currentIndexChanged.connect(self.load_items)
-        sel.addWidget(self.at_combo)
+        self.at_select = AtajadoSelector(self.db)
+        self.at_select.atajadoSelected.connect(self.load_items)
+        sel.addWidget(self.at_select)
         btn = QPushButton("Cargar Ítems")
-        btn.clicked.connect(self.load_items)
+        btn.clicked.connect(lambda: self.load_items())
         sel.addWidget(btn)
         layout.addLayout(sel)
 
@@ -113,6 +121,9 @@ class AvanceTab(QWidget):
         self.save_btn = QPushButton("💾 Guardar Avance")
         self.save_btn.clicked.connect(self.save_progress)
         actions.addWidget(self.save_btn)
+        self.bulk_btn = QPushButton("📋 Carga masiva…")
+        self.bulk_btn.clicked.connect(self.bulk_entry)
+        actions.addWidget(self.bulk_btn)
         actions.addStretch()
         layout.addLayout(actions)
 
@@ -124,15 +135,41 @@ class AvanceTab(QWidget):
         self.img_list.itemDoubleClicked.connect(self.preview_image)
         layout.addWidget(self.img_list)
 
-        self.load_items()
+        self.show_first_atajado()
 
-    def load_items(self):
-        text = self.at_combo.currentText()
-        try:
-            num = int(text.split("–")[0].strip())
-        except:
+    def reload_atajados(self):
+        """Vuelve a consultar el selector si los atajados cambiaron."""
+        self.at_select.model.refresh()
+
+    def set_database(self, db: Database):
+        """Cambia la base de datos (al abrir otro trabajo) y recarga el selector."""
+        self.db = db
+        self.at_select.model.set_database(db)
+        self.show_first_atajado()
+
+    def show_first_atajado(self):
+        first = self.db.search_atajados("", 1)
+        if first:
+            self.at_select.show_atajado(first[0][1])
+            self.load_items(first[0][1])
+        else:
+            self.at_select.clear()
+            self.current_atajado = None
+            self.table.setRowCount(0)
+            self.img_list.clear()
+
+    def showEvent(self, event):
+        self.reload_atajados()
+        super().showEvent(event)
+
+    @traced(cat="ui")
+    def load_items(self, num=None):
+        if num is None:
+            num = self.at_select.first_match()
+        if num is None:
             QMessageBox.warning(self, "Selección inválida", "Selecciona un atajado válido.")
             return
+        self.at_select.show_atajado(num)
         self.current_atajado = num
 
         # Prorratear cantidad total de items entre todos los atajados
@@ -148,6 +185,7 @@ class AvanceTab(QWidget):
         self.table.setRowCount(len(rows))
         self.table.setColumnCount(len(headers))
         self.table.setHorizontalHeaderLabels(headers)
+        self._saved = self._saved_avances(num)
 
         for r, (iid, name, total_qty, unit_price) in enumerate(rows):
             qty = total_qty / atajados
@@ -181,12 +219,8 @@ class AvanceTab(QWidget):
             self.table.setCellWidget(r, 9, combo)
 
             # Cargar avance previo
-            rec = self.db.fetchall(
-                "SELECT quantity, start_date, end_date FROM avances WHERE atajado_id=? AND item_id=?",
-                (num, iid)
-            )
-            if rec:
-                pct_saved, sd, ed = rec[0]
+            if iid in self._saved:
+                _, pct_saved, sd, ed = self._saved[iid]
                 combo.setCurrentText(f"{int(pct_saved)}%")
                 if sd and ed:
                     chk.setCheckState(Qt.CheckState.Checked)
@@ -198,18 +232,35 @@ class AvanceTab(QWidget):
         self.table.cellChanged.connect(self.on_cell_changed)
         self.table.blockSignals(False)
 
-        # Cargar miniaturas
+        self.load_thumbnails(num)
+
+    def _saved_avances(self, num) -> dict:
+        """Avances guardados del atajado con su row_version, por ítem."""
+        return {iid: tuple(rest) for iid, *rest in self.db.fetchall(
+            "SELECT item_id, row_version, quantity, start_date, end_date "
+            "FROM avances WHERE atajado_id=?", (num,)
+        )}
+
+    @traced(cat="ui")
+    def load_thumbnails(self, num):
+        """Carga las miniaturas de las fotos del atajado."""
         self.img_list.clear()
-        img_dir = os.path.join("images", str(num))
-        if os.path.isdir(img_dir):
-            for fpath in sorted(os.listdir(img_dir)):
-                full = os.path.join(img_dir, fpath)
-                pix = QPixmap(full)
-                if not pix.isNull():
-                    item = QListWidgetItem()
-                    item.setIcon(QIcon(pix))
-                    item.setData(Qt.ItemDataRole.UserRole, full)
-                    self.img_list.addItem(item)
+        # Fotos empaquetadas (images/<n>.pack) y sueltas (images/<n>/)
+        try:
+            listed = photo_pack.photos(num)
+        except ValueError:
+            # Paquete dañado: se muestran al menos las fotos sueltas
+            logging.exception("Paquete de fotos dañado del atajado %s", num)
+            listed = photo_pack.loose_photos(num)
+        for photo, data in photo_pack.read_photos(listed):
+            self._add_thumbnail(photo, photo_pixmap(data))
+
+    def _add_thumbnail(self, photo, pix):
+        if not pix.isNull():
+            item = QListWidgetItem()
+            item.setIcon(QIcon(pix))
+            item.setData(Qt.ItemDataRole.UserRole, photo)
+            self.img_list.addItem(item)
 
     def on_cell_changed(self, row, col):
         if col == 5:
@@ -226,66 +277,59 @@ class AvanceTab(QWidget):
         paths, _ = QFileDialog.getOpenFileNames(
             self, "Seleccionar imágenes", "", "Images (*.png *.jpg *.jpeg)"
         )
-        img_dir = os.path.join("images", str(self.current_atajado))
+        # Las fotos nuevas quedan sueltas hasta el próximo empaquetado
+        img_dir = os.path.join(photo_pack.IMAGE_DIR, str(self.current_atajado))
         os.makedirs(img_dir, exist_ok=True)
         for p in paths:
-            dst = os.path.join(img_dir, f"{datetime.now().timestamp()}_{os.path.basename(p)}")
+            name = f"{datetime.now().timestamp()}_{os.path.basename(p)}"
+            dst = os.path.join(img_dir, name)
             shutil.copy(p, dst)
-            pix = QPixmap(dst)
-            if not pix.isNull():
-                item = QListWidgetItem()
-                item.setIcon(QIcon(pix))
-                item.setData(Qt.ItemDataRole.UserRole, dst)
-                self.img_list.addItem(item)
+            self._add_thumbnail(photo_pack.Photo(name, dst), QPixmap(dst))
 
+    @traced(cat="ui")
     def save_progress(self):
         if self.current_atajado is None:
             QMessageBox.warning(self, "Error", "Carga primero un atajado.")
             return
         today = QDate.currentDate().toString("yyyy-MM-dd")
-        for r in range(self.table.rowCount()):
-            iid = int(self.table.item(r,0).text())
-            combo = self.table.cellWidget(r,9)
-            pct = int(combo.currentText().replace("%",""))
-
-            chk = self.table.item(r,5)
-            inicio = self.table.cellWidget(r,6)
-            fin = self.table.cellWidget(r,7)
-            sd = inicio.date().toString("yyyy-MM-dd") if chk.checkState() == Qt.CheckState.Checked else None
-            ed = fin.date().toString("yyyy-MM-dd") if chk.checkState() == Qt.CheckState.Checked else None
-
-            rec = self.db.fetchall(
-                "SELECT id FROM avances WHERE atajado_id=? AND item_id=?",
-                (self.current_atajado, iid)
-            )
-            if rec:
-                aid = rec[0][0]
-                self.db.execute(
-                    "UPDATE avances SET quantity=?, date=?, start_date=?, end_date=? WHERE id=?",
-                    (pct, today, sd, ed, aid)
-                )
-            else:
-                self.db.execute(
-                    "INSERT INTO avances(atajado_id,item_id,date,quantity,start_date,end_date) VALUES(?,?,?,?,?,?)",
-                    (self.current_atajado, iid, today, pct, sd, ed)
-                )
-        # actualizar estado del atajado segun avance ponderado por costo
-        avg_row = self.db.fetchall(
-            """
-            SELECT SUM(i.total*i.incidence*a.quantity/100.0) / SUM(i.total*i.incidence)
-            FROM avances a JOIN items i ON a.item_id=i.id
-            WHERE a.atajado_id=? AND i.active=1
-            """,
-            (self.current_atajado,)
-        )
-        avg = (avg_row[0][0] or 0) * 100
-
-        status = "Ejecutado" if avg == 100 else "En ejecución"
-        self.db.execute(
-            "UPDATE atajados SET status=? WHERE number=?",
-            (status, self.current_atajado)
-        )                
+        num = self.current_atajado
+        conflicts = []
+        with self.db.transaction():
+            for r in range(self.table.rowCount()):
+                iid = int(self.table.item(r,0).text())
+                combo = self.table.cellWidget(r,9)
+                pct = int(combo.currentText().replace("%",""))
+
+                chk = self.table.item(r,5)
+                inicio = self.table.cellWidget(r,6)
+                fin = self.table.cellWidget(r,7)
+                sd = inicio.date().toString("yyyy-MM-dd") if chk.checkState() == Qt.CheckState.Checked else None
+                ed = fin.date().toString("yyyy-MM-dd") if chk.checkState() == Qt.CheckState.Checked else None
+
+                # Sin cambios respecto a lo cargado: no se reescribe
+                version, *loaded = self._saved.get(iid, (None, None, None, None))
+                if version is not None and loaded == [pct, sd, ed]:
+                    continue
+                # Solo se escribe si nadie más lo guardó desde que se cargó
+                if not self.db.record_progress(num, iid, pct, today, sd, ed, version=version):
+                    conflicts.append((iid, self.table.item(r,1).text(), pct, sd, ed))
+        if conflicts:
+            self._merge_conflicts(num, conflicts, today)
+        self._saved = self._saved_avances(num)
+        # el avance ponderado y el estado del atajado los actualizan los triggers
         QMessageBox.information(self, "Guardado", "Avances registrados correctamente.")
+        self._after_save()
+
+    def bulk_entry(self):
+        """Carga masiva de avances de muchos atajados; refresca una sola vez."""
+        dlg = BulkEntryDialog(self.db, self)
+        dlg.exec()
+        if dlg.saved_count:
+            if self.current_atajado is not None:
+                self.load_items(self.current_atajado)
+            self._after_save()
+
+    def _after_save(self):
         if self._save_callback:
             self._save_callback()
         else:
@@ -293,9 +337,31 @@ class AvanceTab(QWidget):
             if hasattr(window, 'refresh_all'):
                 window.refresh_all()
 
+    def _merge_conflicts(self, num, conflicts, today):
+        """Pregunta qué avance queda en los ítems que otro usuario guardó antes."""
+        current = self._saved_avances(num)
+
+        def text(pct, sd, ed):
+            if pct is None:
+                return "(eliminado)"
+            return f"{pct:.0f}%" + (f"  {sd} – {ed}" if sd and ed else "")
+
+        dlg = ConflictDialog(
+            f"Otro usuario guardó avances del atajado {num} mientras los editabas.",
+            [(name, text(pct, sd, ed), text(*current.get(iid, (None, None, None, None))[1:]))
+             for iid, name, pct, sd, ed in conflicts],
+            self,
+        )
+        dlg.exec()
+        with self.db.transaction():
+            for (iid, _, pct, sd, ed), keep in zip(conflicts, dlg.keep_mine()):
+                if keep:
+                    self.db.record_progress(num, iid, pct, today, sd, ed,
+                                            version=current.get(iid, (None,))[0])
+        self.load_items(num)
+
     def preview_image(self, item: QListWidgetItem):
-        path = item.data(Qt.ItemDataRole.UserRole)
-        paths = [self.img_list.item(i).data(Qt.ItemDataRole.UserRole) for i in range(self.img_list.count())]
-        idx = paths.index(path)
-        dlg = ImagePreviewDialog(paths, idx)
+        photo = item.data(Qt.ItemDataRole.UserRole)
+        photos = [self.img_list.item(i).data(Qt.ItemDataRole.UserRole) for i in range(self.img_list.count())]
+        dlg = ImagePreviewDialog(photos, photos.index(photo))
         dlg.exec()
\ No newline at end of file
@@ -0,0 +1,289 @@
+"""Online snapshots of a project database and its photo store.
+
+:class:`SnapshotManager` copies the database with SQLite's online backup
+API in page-sized steps, so the application can keep writing while a
+snapshot is taken, and keeps only the newest ``keep`` snapshots. Photos
+under ``images/`` are stored once per content hash in a shared object
+store; each snapshot's manifest maps relative paths to hashes, so repeated
+snapshots only copy new or modified files. The folder of a project is keyed
+by its absolute path, so two projects with the same file name in different
+folders never see (or rotate away) each other's snapshots. Photo packs
+(``images/<número>.pack``) are rewritten whole on every repack, so they are
+stored photo by photo and rebuilt on restore. Layout::
+
+    snapshots/<trabajo>-<ruta>/      <ruta>: 8 hex del SHA-1 de la ruta absoluta
+        objects/ab/abcdef...        photo contents by SHA-256
+        20261019-101500-000123/
+            atajados.db
+            manifest.json
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+from tracing import traced
+
+SNAPSHOT_DIR = "snapshots"
+IMAGE_DIR = "images"
+MANIFEST = "manifest.json"
+# Páginas copiadas por paso; entre pasos otras conexiones pueden escribir
+BACKUP_PAGES = 256
+
+
+def file_hash(path: str) -> str:
+    """Return the SHA-256 of a file, read in chunks."""
+    h = hashlib.sha256()
+    for chunk in _file_chunks(path):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def project_key(db_file: str) -> str:
+    """Snapshot folder name of a project: file stem plus a hash of its path."""
+    path = os.path.normcase(os.path.abspath(db_file))
+    return f"{Path(db_file).stem}-{hashlib.sha1(path.encode('utf-8')).hexdigest()[:8]}"
+
+
+def pack_hashes(pack) -> dict:
+    """``{name: SHA-256}`` of the photos of an open :class:`photo_pack.PhotoPack`."""
+    hashes = {}
+    for name in pack.names():
+        h = hashlib.sha256()
+        for chunk in pack.chunks(name):
+            h.update(chunk)
+        hashes[name] = h.hexdigest()
+    return hashes
+
+
+def _file_chunks(path):
+    with open(path, "rb") as fh:
+        yield from iter(lambda: fh.read(1 << 20), b"")
+
+
+class SnapshotManager:
+    """Create, list, rotate and restore snapshots of one project."""
+
+    def __init__(self, db_file: str, root: str = SNAPSHOT_DIR,
+                 image_dir: str = IMAGE_DIR, keep: int = 10):
+        self.db_file = os.path.abspath(db_file)
+        self.root = Path(root) / project_key(db_file)
+        self.objects = self.root / "objects"
+        self.image_dir = Path(image_dir)
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # ---------------------------------------------------------------- consulta
+    def snapshots(self) -> list:
+        """Return snapshot manifests, newest first."""
+        result = []
+        if not self.root.is_dir():
+            return result
+        for entry in sorted(self.root.iterdir(), reverse=True):
+            manifest = entry / MANIFEST
+            if entry.name != "objects" and manifest.is_file():
+                with open(manifest, encoding="utf-8") as fh:
+                    data = json.load(fh)
+                data["id"] = entry.name
+                result.append(data)
+        return result
+
+    # ---------------------------------------------------------------- creación
+    @traced("backup.create", "backup")
+    def create(self, pages: int = BACKUP_PAGES, progress=None) -> dict:
+        """Take a snapshot now and rotate old ones; return its manifest.
+
+        *progress* is passed to :meth:`sqlite3.Connection.backup` and is
+        called as ``progress(status, remaining, total)`` after each step.
+        """
+        with self._lock:
+            created = datetime.now()
+            snap = self.root / created.strftime("%Y%m%d-%H%M%S-%f")
+            snap.mkdir(parents=True)
+            target = snap / Path(self.db_file).name
+            # Conexión propia: el respaldo puede correr en otro hilo
+            with closing(sqlite3.connect(self.db_file)) as src, \
+                    closing(sqlite3.connect(str(target) + ".part")) as dst:
+                src.backup(dst, pages=pages, progress=progress)
+            os.replace(str(target) + ".part", target)
+
+            images, packs, copied = self._store_images()
+            manifest = {
+                "created": created.isoformat(timespec="seconds"),
+                "database": target.name,
+                "db_bytes": target.stat().st_size,
+                "images": images,
+                "packs": packs,
+                "copied_images": copied,
+            }
+            with open(snap / MANIFEST, "w", encoding="utf-8") as fh:
+                json.dump(manifest, fh, indent=1)
+            self.rotate()
+            manifest["id"] = snap.name
+            return manifest
+
+    def start(self, done=None, pages: int = BACKUP_PAGES) -> bool:
+        """Run :meth:`create` on a background thread.
+
+        *done* is called from that thread with the manifest, or with the
+        exception if the snapshot failed. Returns False if a snapshot is
+        already running.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return False
+
+        def run():
+            try:
+                result = self.create(pages)
+            except Exception as exc:  # se informa al llamador
+                result = exc
+            if done:
+                done(result)
+
+        self._thread = threading.Thread(target=run, name="snapshot", daemon=True)
+        self._thread.start()
+        return True
+
+    def wait(self, timeout: float = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _object(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def _store_object(self, digest: str, chunks) -> int:
+        """Copy *chunks* into the object store unless *digest* is there; 1 if copied."""
+        obj = self._object(digest)
+        if obj.exists():
+            return 0
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        with open(str(obj) + ".part", "wb") as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+        os.replace(str(obj) + ".part", obj)
+        return 1
+
+    def _store_pack(self, path: Path, previous) -> tuple:
+        """Store the members of a photo pack one by one; return (members, copied).
+
+        Repacking rewrites the whole ``.pack``, so hashing the file would
+        store it again on every repack; its photos, hashed one by one, are
+        stored only once.
+        """
+        from photo_pack import PhotoPack
+        st = path.stat()
+        if previous and previous["size"] == st.st_size and previous["mtime_ns"] == st.st_mtime_ns \
+                and all(self._object(d).exists() for d in previous["members"].values()):
+            return previous["members"], 0
+        copied = 0
+        with PhotoPack(path) as pack:
+            members = pack_hashes(pack)
+            for name, digest in members.items():
+                copied += self._store_object(digest, pack.chunks(name))
+        return members, copied
+
+    def _store_images(self) -> tuple:
+        """Copy new photos into the object store; return (images, packs, copied)."""
+        from photo_pack import PACK_SUFFIX
+        # Reutilizar hashes del último respaldo si tamaño y fecha no cambiaron
+        previous, previous_packs = {}, {}
+        latest = self.snapshots()
+        if latest:
+            previous = latest[0].get("images", {})
+            previous_packs = latest[0].get("packs", {})
+        images, packs, copied = {}, {}, 0
+        if not self.image_dir.is_dir():
+            return images, packs, copied
+        for path in sorted(self.image_dir.rglob("*")):
+            if not path.is_file():
+                continue
+            rel = path.relative_to(self.image_dir).as_posix()
+            st = path.stat()
+            if path.suffix == PACK_SUFFIX and path.parent == self.image_dir:
+                try:
+                    members, n = self._store_pack(path, previous_packs.get(rel))
+                except ValueError:
+                    pass  # paquete dañado: se respalda como archivo común
+                else:
+                    packs[rel] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                                  "members": members}
+                    copied += n
+                    continue
+            old = previous.get(rel)
+            if old and old[1] == st.st_size and old[2] == st.st_mtime_ns:
+                digest = old[0]
+            else:
+                digest = file_hash(path)
+            copied += self._store_object(digest, _file_chunks(path))
+            images[rel] = [digest, st.st_size, st.st_mtime_ns]
+        return images, packs, copied
+
+    def rotate(self) -> int:
+        """Delete snapshots beyond ``keep`` and unreferenced photos."""
+        snaps = self.snapshots()
+        for old in snaps[self.keep:]:
+            shutil.rmtree(self.root / old["id"])
+        used = set()
+        for snap in snaps[:self.keep]:
+            used.update(v[0] for v in snap.get("images", {}).values())
+            for pack in snap.get("packs", {}).values():
+                used.update(pack["members"].values())
+        if self.objects.is_dir():
+            for obj in self.objects.glob("*/*"):
+                if obj.name not in used:
+                    obj.unlink()
+        return max(len(snaps) - self.keep, 0)
+
+    # ------------------------------------------------------------ restauración
+    @traced("backup.restore", "backup")
+    def restore(self, snapshot_id: str, db_file: str = None) -> dict:
+        """Copy a snapshot back over *db_file* and restore its photos.
+
+        The caller must close its own connections to *db_file* first.
+        Photos listed in the snapshot are rewritten when they differ;
+        photos added later are left in place.
+        """
+        snap = self.root / snapshot_id
+        with open(snap / MANIFEST, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+        target = db_file or self.db_file
+        with self._lock:
+            with closing(sqlite3.connect(snap / manifest["database"])) as src, \
+                    closing(sqlite3.connect(target)) as dst:
+                src.backup(dst)
+            restored = 0
+            for rel, (digest, size, _) in manifest["images"].items():
+                path = self.image_dir / rel
+                if path.is_file() and path.stat().st_size == size and file_hash(path) == digest:
+                    continue
+                path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(self._object(digest), path)
+                restored += 1
+            for rel, pack in manifest.get("packs", {}).items():
+                restored += self._restore_pack(self.image_dir / rel, pack["members"])
+        manifest["id"] = snapshot_id
+        manifest["restored_images"] = restored
+        return manifest
+
+    def _restore_pack(self, path: Path, members: dict) -> int:
+        """Rebuild the pack at *path* from its stored members unless it already
+        holds them; return how many photos were written."""
+        from photo_pack import PhotoPack, write_pack
+        if path.is_file():
+            try:
+                with PhotoPack(path) as pack:
+                    if pack_hashes(pack) == members:
+                        return 0
+            except ValueError:
+                pass  # paquete dañado: se reescribe
+        tmp = Path(str(path) + ".tmp")
+        write_pack(tmp, [(name, _file_chunks(self._object(d))) for name, d in members.items()])
+        os.replace(tmp, path)
+        return len(members)
@@ -0,0 +1,166 @@
+# bulk_dialog.py
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QDateEdit, QPushButton,
+    QTableWidget, QTableWidgetItem, QMessageBox, QApplication
+)
+from PyQt6.QtGui import QBrush, QColor, QFont, QKeySequence, QShortcut
+from PyQt6.QtCore import QDate
+from database import Database
+from bulk_entry import BulkEntry, parse_percent, parse_sheet
+from tracing import traced
+
+ALL = "Todas las comunidades"
+EDITED = QBrush(QColor(255, 243, 176))
+INVALID = QBrush(QColor(255, 170, 170))
+
+
+class BulkEntryDialog(QDialog):
+    """Carga masiva de avances: atajados × ítems activos, guardados de una vez."""
+
+    def __init__(self, db: Database, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.entry = None
+        self.loaded = ALL
+        self.saved_count = 0
+        self.setWindowTitle("Carga masiva de avances")
+        self.resize(1000, 600)
+        layout = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        top.addWidget(QLabel("Comunidad:"))
+        self.comunidad = QComboBox()
+        self.comunidad.addItem(ALL)
+        self.comunidad.addItems([r[0] for r in db.fetchall(
+            "SELECT DISTINCT comunidad FROM atajados WHERE comunidad IS NOT NULL ORDER BY 1")])
+        self.comunidad.currentTextChanged.connect(self.change_comunidad)
+        top.addWidget(self.comunidad)
+        top.addWidget(QLabel("Fecha del reporte:"))
+        self.date = QDateEdit(QDate.currentDate())
+        self.date.setCalendarPopup(True)
+        top.addWidget(self.date)
+        top.addStretch()
+        self.status = QLabel()
+        top.addWidget(self.status)
+        layout.addLayout(top)
+
+        self.table = QTableWidget()
+        self.table.itemChanged.connect(self.on_item_changed)
+        QShortcut(QKeySequence.StandardKey.Paste, self.table, activated=self.paste)
+        layout.addWidget(self.table)
+        layout.addWidget(QLabel(
+            "<i>Escribe porcentajes (0–100) o pega una planilla con Ctrl+V: un bloque de "
+            "celdas, o una tabla con los ítems en la primera fila y los atajados en la "
+            "primera columna.</i>"))
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        save = QPushButton("💾 Guardar todo")
+        save.clicked.connect(self.save)
+        buttons.addWidget(save)
+        cancel = QPushButton("Cancelar")
+        cancel.clicked.connect(self.reject)
+        buttons.addWidget(cancel)
+        layout.addLayout(buttons)
+
+        self.load()
+
+    # ---------------------------------------------------------------- carga
+    @traced(cat="ui")
+    def load(self):
+        self.loaded = com = self.comunidad.currentText()
+        self.entry = BulkEntry.load(self.db, None if com == ALL else com)
+        e = self.entry
+        self.table.blockSignals(True)
+        self.table.clear()
+        self.table.setRowCount(len(e.numbers))
+        self.table.setColumnCount(len(e.items))
+        self.table.setHorizontalHeaderLabels([name for _, name in e.items])
+        self.table.setVerticalHeaderLabels([str(n) for n in e.numbers])
+        for c, (iid, _) in enumerate(e.items):
+            self.table.horizontalHeaderItem(c).setToolTip(f"Ítem {iid}")
+        for r, num in enumerate(e.numbers):
+            for c, (iid, _) in enumerate(e.items):
+                self.table.setItem(r, c, QTableWidgetItem(e.value(num, iid)))
+        self.table.blockSignals(False)
+        self.update_status()
+
+    def change_comunidad(self):
+        if self.entry and self.entry.edits and QMessageBox.question(
+                self, "Carga masiva", "¿Descartar los avances no guardados?"
+        ) != QMessageBox.StandardButton.Yes:
+            self.comunidad.blockSignals(True)
+            self.comunidad.setCurrentText(self.loaded)
+            self.comunidad.blockSignals(False)
+            return
+        self.load()
+
+    # -------------------------------------------------------------- edición
+    def on_item_changed(self, item):
+        e = self.entry
+        num, iid = e.numbers[item.row()], e.items[item.column()][0]
+        e.set(num, iid, item.text())
+        self._mark(item)
+        self.update_status()
+
+    def _mark(self, item):
+        text = item.text().strip()
+        try:
+            if text:
+                parse_percent(text)
+            brush = EDITED
+        except ValueError:
+            brush = INVALID
+        item.setBackground(brush)
+        font = QFont(item.font())
+        font.setBold(True)
+        item.setFont(font)
+
+    def paste(self):
+        rows = parse_sheet(QApplication.clipboard().text())
+        if not rows:
+            return
+        e = self.entry
+        changed = e.paste(rows, max(self.table.currentRow(), 0), max(self.table.currentColumn(), 0))
+        self.table.blockSignals(True)
+        for num, iid in changed:
+            item = self.table.item(e.row_of[num], e.col_of[iid])
+            item.setText(e.value(num, iid))
+            self._mark(item)
+        self.table.blockSignals(False)
+        self.update_status()
+
+    def update_status(self):
+        e = self.entry
+        self.status.setText(f"{len(e.numbers)} atajados × {len(e.items)} ítems · "
+                            f"{len(e.edits)} celdas editadas")
+
+    # ------------------------------------------------------------- guardado
+    @traced(cat="ui")
+    def save(self):
+        e = self.entry
+        entries, errors = e.validate()
+        if errors:
+            num, iid, _ = errors[0]
+            self.table.setCurrentCell(e.row_of[num], e.col_of[iid])
+            lines = [f"Atajado {num}, ítem {iid}: {msg}" for num, iid, msg in errors[:10]]
+            if len(errors) > 10:
+                lines.append(f"… y {len(errors) - 10} más")
+            QMessageBox.warning(self, "Valores inválidos", "\n".join(lines))
+            return
+        if not entries:
+            self.accept()
+            return
+        conflicts = self.db.record_progress_bulk(entries, self.date.date().toString("yyyy-MM-dd"))
+        written = len(entries) - len(conflicts)
+        self.saved_count += written
+        if conflicts:
+            QMessageBox.warning(
+                self, "Carga masiva",
+                f"Se guardaron {written} avances. {len(conflicts)} fueron modificados por otro "
+                "usuario mientras editabas y no se sobrescribieron; se recargó la tabla con "
+                "sus valores actuales.")
+            self.load()
+            return
+        QMessageBox.information(self, "Guardado", f"{self.saved_count} avances registrados.")
+        self.accept()
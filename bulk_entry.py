@@ -0,0 +1,140 @@
+"""Bulk progress entry: a grid of atajados × active items edited at once.
+
+:class:`BulkEntry` keeps the percentages loaded from the database (with
+their ``row_version``) and the texts typed or pasted over them. Nothing is
+checked while typing; :meth:`BulkEntry.validate` parses every edited cell
+in one pass and returns the changed avances ready for
+:meth:`database.Database.record_progress_bulk`::
+
+    entry = BulkEntry.load(db, comunidad="Norte")
+    entry.paste(parse_sheet(clipboard_text))   # planilla con encabezados
+    entries, errors = entry.validate()
+    if not errors:
+        db.record_progress_bulk(entries, "2024-05-10")
+"""
+
+from database import Database
+
+
+def parse_percent(text: str) -> float:
+    """Percentage typed in a cell: ``50``, ``50%`` or ``50,5``; 0 to 100."""
+    clean = str(text).strip().rstrip("%").strip().replace(",", ".")
+    try:
+        pct = float(clean)
+    except ValueError:
+        raise ValueError(f"'{text}' no es un porcentaje") from None
+    if not 0 <= pct <= 100:
+        raise ValueError(f"{pct:g}% fuera de 0–100")
+    return pct
+
+
+def parse_sheet(text: str) -> list:
+    """Rows of tab-separated cells, as copied from a spreadsheet."""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    while lines and not lines[-1].strip():
+        lines.pop()
+    return [line.split("\t") for line in lines]
+
+
+class BulkEntry:
+    """Saved and edited percentages of a block of atajados × items."""
+
+    def __init__(self, numbers: list, items: list, saved: dict):
+        self.numbers = list(numbers)
+        self.items = list(items)  # (id, nombre)
+        self.saved = saved        # (número, ítem) -> (row_version, %)
+        self.edits = {}           # (número, ítem) -> texto ingresado
+        self.row_of = {n: r for r, n in enumerate(self.numbers)}
+        self.col_of = {iid: c for c, (iid, _) in enumerate(self.items)}
+
+    @classmethod
+    def load(cls, db: Database, comunidad: str = None) -> "BulkEntry":
+        """Atajados (of one community, if given) × active items, with their avances."""
+        where, params = ("WHERE comunidad=?", (comunidad,)) if comunidad is not None else ("", ())
+        numbers = [r[0] for r in db.fetchall(
+            f"SELECT DISTINCT number FROM atajados {where} ORDER BY number", params)
+            if r[0] is not None]
+        items = db.fetchall("SELECT id, name FROM items WHERE active=1 ORDER BY id")
+        saved = {}
+        for num, iid, ver, pct in db.fetchall(
+                f"SELECT a.atajado_id, a.item_id, a.row_version, a.quantity FROM avances a "
+                f"JOIN items i ON i.id = a.item_id AND i.active = 1 "
+                f"WHERE a.atajado_id IN (SELECT number FROM atajados {where})", params):
+            saved[num, iid] = (ver, pct)
+        return cls(numbers, items, saved)
+
+    # ---------------------------------------------------------------- edición
+    def value(self, num, iid) -> str:
+        """Text shown in a cell: the edit, or the saved percentage."""
+        if (num, iid) in self.edits:
+            return self.edits[num, iid]
+        pct = self.saved.get((num, iid), (None, None))[1]
+        return "" if pct is None else f"{pct:g}"
+
+    def set(self, num, iid, text: str) -> None:
+        self.edits[num, iid] = str(text).strip()
+
+    def paste(self, rows: list, row: int = 0, col: int = 0) -> list:
+        """Paste a block of cells; return the ``(number, item_id)`` changed.
+
+        If the first row names items (by id or name) the block is read as a
+        sheet: the header picks the columns and the first column the atajado
+        number, wherever they are in the grid. Otherwise it is pasted
+        positionally from (*row*, *col*). Cells outside the grid are ignored.
+        """
+        header = self._sheet_columns(rows[0]) if rows else None
+        changed = []
+        if header:
+            for cells in rows[1:]:
+                try:
+                    num = int(float(cells[0]))
+                except (ValueError, IndexError):
+                    continue
+                if num not in self.row_of:
+                    continue
+                for c, iid in header.items():
+                    if c < len(cells):
+                        self.set(num, iid, cells[c])
+                        changed.append((num, iid))
+            return changed
+        for r, cells in enumerate(rows, start=row):
+            for c, text in enumerate(cells, start=col):
+                if r < len(self.numbers) and c < len(self.items):
+                    key = (self.numbers[r], self.items[c][0])
+                    self.set(*key, text)
+                    changed.append(key)
+        return changed
+
+    def _sheet_columns(self, header: list) -> dict:
+        """``{column: item_id}`` if *header* is a sheet header, else ``{}``."""
+        by_name = {str(name).strip().lower(): iid for iid, name in self.items}
+        by_id = {str(iid): iid for iid, _ in self.items}
+        cols = {}
+        for c, text in enumerate(header[1:], start=1):
+            key = text.strip()
+            iid = by_id.get(key, by_name.get(key.lower()))
+            if iid is not None:
+                cols[c] = iid
+        return cols
+
+    # ------------------------------------------------------------- validación
+    def validate(self) -> tuple:
+        """``(entries, errors)`` for every edited cell, in one pass.
+
+        *entries* are ``(number, item_id, pct, row_version)`` of the cells
+        whose value changed; *errors* are ``(number, item_id, message)``.
+        Empty cells leave the avance as it is.
+        """
+        entries, errors = [], []
+        for (num, iid), text in self.edits.items():
+            if not text:
+                continue
+            try:
+                pct = parse_percent(text)
+            except ValueError as exc:
+                errors.append((num, iid, str(exc)))
+                continue
+            version, saved = self.saved.get((num, iid), (None, None))
+            if saved is None or float(saved) != pct:
+                entries.append((num, iid, pct, version))
+        return entries, errors
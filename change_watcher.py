@@ -0,0 +1,71 @@
+# change_watcher.py
+"""Detect changes made by other instances sharing the same database file.
+
+The watcher polls ``PRAGMA data_version``, which only changes when another
+connection commits, so an idle poll costs one pragma and no table reads.
+When it changes, the per-table counters in ``table_versions`` (bumped by
+triggers) tell which tables were modified. Changes are accumulated and
+reported once through ``tablesChanged`` after a short debounce. A polling
+timer is used instead of file notifications because those are unreliable
+on network shares.
+"""
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from database import Database
+
+POLL_MS = 1500
+DEBOUNCE_MS = 400
+
+
+class ChangeWatcher(QObject):
+    """Emit the set of tables changed by other connections."""
+
+    tablesChanged = pyqtSignal(set)
+
+    def __init__(self, db: Database, interval: int = POLL_MS,
+                 debounce: int = DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.pending = set()
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(interval)
+        self._poll_timer.timeout.connect(self.poll)
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce)
+        self._debounce.timeout.connect(self._emit)
+        self.set_database(db)
+
+    def set_database(self, db: Database) -> None:
+        """Watch *db* from now on, ignoring its earlier changes."""
+        self.db = db
+        self.pending.clear()
+        self._debounce.stop()
+        self._data_version = self.db.fetchall("PRAGMA data_version")[0][0]
+        self._versions = self.db.table_versions()
+
+    def start(self) -> None:
+        self._poll_timer.start()
+
+    def stop(self) -> None:
+        self._poll_timer.stop()
+        self._debounce.stop()
+
+    def poll(self) -> set:
+        """Check for external commits; return the tables that changed."""
+        version = self.db.fetchall("PRAGMA data_version")[0][0]
+        if version == self._data_version:
+            return set()
+        self._data_version = version
+        versions = self.db.table_versions()
+        changed = {t for t, v in versions.items() if self._versions.get(t) != v}
+        self._versions = versions
+        if changed:
+            self.pending |= changed
+            self._debounce.start()
+        return changed
+
+    def _emit(self) -> None:
+        changed, self.pending = self.pending, set()
+        if changed:
+            self.tablesChanged.emit(changed)
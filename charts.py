@@ -0,0 +1,228 @@
+"""Chart data, drawing and background export (no Qt required).
+
+The Gantt of :class:`cronograma_tab.CronogramaTab` and the status chart of
+the dashboard are drawn here on plain matplotlib axes, so the same code
+serves the screen and the exports. :func:`export_charts` reads the data in
+the calling thread and renders one job per chart in separate processes
+with the Agg backend, in parallel across communities::
+
+    paths = export_charts(db, "graficos", formats=("png", "pdf"), dpi=300)
+
+:func:`start_export` does the rendering on a background thread so the UI
+keeps responding.
+"""
+
+import datetime
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from database import Database
+from cpm import schedule_tasks
+from forecast import HORIZON_DAYS, CompletionForecast
+from tracing import traced
+
+FORMATS = ("png", "pdf", "svg")
+EXPORT_DPI = 300
+# Ancho de la figura exportada (pulgadas) y alto por actividad
+GANTT_WIDTH = 16
+ROW_HEIGHT = 0.35
+# Plazo máximo (días) con marcas semanales; más largo, sólo meses
+WEEK_TICKS_DAYS = 2 * 365
+STATUS_LABELS = (("total", "Total"), ("ejecutados", "Ejecutado"),
+                 ("en_ejecucion", "En ejec."), ("pendientes", "Pendiente"))
+
+
+# --------------------------------------------------------------------- datos
+def gantt_tasks(db: Database, comunidad: str = None, forecast=None) -> list:
+    """Return one task per item with avances: first and last avance date.
+
+    With *comunidad*, only the avances of that community's atajados count.
+    With a :class:`forecast.CompletionForecast`, each task also gets the
+    projected end of the item (``"forecast"``, a date or None).
+    """
+    tasks = []
+    for item_id, name, start_val, end_val in db.item_spans(comunidad):
+        # Ignorar registros sin fechas
+        if start_val is None or end_val is None:
+            continue
+        start = datetime.datetime.strptime(start_val, "%Y-%m-%d").date()
+        end = datetime.datetime.strptime(end_val, "%Y-%m-%d").date()
+        days = (end - start).days
+        tasks.append({"id": item_id, "activity": name, "hours": days * 8,  # 8 h por día
+                      "start": start, "end": end, "c": 0, "p": 0, "days": days})
+    if forecast is not None:
+        ends = forecast.by_item(comunidad)
+        for t in tasks:
+            t["forecast"] = ends.get(t["id"])
+    return tasks
+
+
+def comunidades(db: Database) -> list:
+    """Return the communities that have atajados, sorted."""
+    return [r[0] for r in db.fetchall(
+        "SELECT DISTINCT COALESCE(comunidad, '') FROM atajados ORDER BY 1")]
+
+
+# ------------------------------------------------------------------- dibujo
+def plot_gantt(ax, tasks: list, title: str = None, today: datetime.date = None) -> None:
+    """Draw *tasks* as a Gantt chart on a matplotlib axes."""
+    import matplotlib.dates as mdates
+    if title:
+        ax.set_title(title)
+    if not tasks:
+        return
+
+    # Configurar límites de fecha (incluye los fines estimados, hasta el horizonte)
+    today = today or datetime.date.today()
+    horizon = today + datetime.timedelta(days=HORIZON_DAYS)
+    min_date = min(t["start"] for t in tasks) - datetime.timedelta(days=1)
+    max_date = max(max(t["end"], min(t.get("forecast") or t["end"], horizon)) for t in tasks) \
+        + datetime.timedelta(days=1)
+    ax.set_xlim(mdates.date2num(min_date), mdates.date2num(max_date))
+
+    # Formato eje X: meses y semanas
+    ax.xaxis.set_major_locator(mdates.MonthLocator())
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%b/%Y'))
+    if (max_date - min_date).days <= WEEK_TICKS_DAYS:
+        ax.xaxis.set_minor_locator(mdates.WeekdayLocator(byweekday=mdates.MO))
+        ax.grid(True, which='minor', axis='x', linestyle='--', color='red')
+    ax.grid(True, which='major', axis='x', linestyle='-', color='black', linewidth=1)
+
+    # Dibujar barras y etiquetas
+    yticks, ylabels = [], []
+    for idx, t in enumerate(tasks):
+        start_num = mdates.date2num(t["start"])
+        duration = t["days"]
+        # Con ruta crítica calculada, las actividades con holgura van en tono claro
+        critical = t.get("float", 0) == 0
+        ax.broken_barh([(start_num, duration)], (idx*10, 9),
+                       facecolors='tab:red' if critical else 'lightsalmon',
+                       edgecolors='black' if critical and "float" in t else 'none')
+        yticks.append(idx*10 + 4.5)
+        ylabels.append(f"{t['id']}. {t['activity']}")
+        ax.text(start_num + duration/2, idx*10 + 4.5,
+                f"{duration} d.", ha='center', va='center', fontsize=8)
+        # Tramo pronosticado hasta el fin estimado
+        projected = t.get("forecast") and min(t["forecast"], horizon)
+        if projected and projected > t["end"]:
+            end_num = mdates.date2num(t["end"])
+            ax.broken_barh([(end_num, mdates.date2num(projected) - end_num)], (idx*10, 9),
+                           facecolors='none', edgecolors='tab:red', hatch='//')
+
+    ax.set_yticks(yticks)
+    ax.set_yticklabels(ylabels)
+    ax.set_ylabel('Actividades')
+    ax.set_xlabel('Fecha')
+
+    # Línea de hoy
+    ax.axvline(mdates.date2num(today), color='blue', linestyle='--')
+
+
+def plot_status(ax, counts: dict, progress: float = None) -> None:
+    """Draw the dashboard's status bar chart on a matplotlib axes."""
+    ax.bar(range(len(STATUS_LABELS)), [counts[k] for k, _ in STATUS_LABELS],
+           width=0.6, color="skyblue", edgecolor="#202020")
+    ax.set_xticks(range(len(STATUS_LABELS)))
+    ax.set_xticklabels([label for _, label in STATUS_LABELS])
+    ax.set_ylabel("Atajados")
+    if progress is not None:
+        ax.set_title(f"Avance del Proyecto: {progress:.0f}%")
+
+
+# --------------------------------------------------------------- exportación
+def slug(text: str) -> str:
+    """File-name friendly version of *text*."""
+    return re.sub(r"[^\w-]+", "_", text.strip(), flags=re.UNICODE).strip("_") or "sin_comunidad"
+
+
+def chart_jobs(db: Database, out_dir: str, formats=("png",), dpi: int = EXPORT_DPI,
+               per_comunidad: bool = True) -> list:
+    """Read the data for every chart and return picklable render jobs."""
+    base = {"formats": [f for f in formats if f in FORMATS], "dpi": dpi}
+    forecast = CompletionForecast.load(db)
+    tasks = gantt_tasks(db, forecast=forecast)
+    schedule_tasks(db, tasks)
+    jobs = [
+        dict(base, kind="status", path=os.path.join(out_dir, "estados"),
+             counts=db.status_counts(), progress=db.get_project_progress()),
+        dict(base, kind="gantt", path=os.path.join(out_dir, "gantt"),
+             title="Cronograma del proyecto", tasks=tasks),
+    ]
+    if per_comunidad:
+        used = set()
+        for com in comunidades(db):
+            # "Norte/1" y "Norte 1" dan el mismo nombre; en Windows tampoco importan mayúsculas
+            name, n = f"gantt_{slug(com)}", 1
+            while name.lower() in used:
+                n += 1
+                name = f"gantt_{slug(com)}_{n}"
+            used.add(name.lower())
+            com_tasks = gantt_tasks(db, com, forecast)
+            schedule_tasks(db, com_tasks)
+            jobs.append(dict(base, kind="gantt", path=os.path.join(out_dir, name),
+                             title=f"Cronograma — {com or 'sin comunidad'}", tasks=com_tasks))
+    return jobs
+
+
+def render_job(job: dict) -> list:
+    """Render one job with the Agg backend; return the files written."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    if job["kind"] == "gantt":
+        fig = Figure(figsize=(GANTT_WIDTH, max(4, 1.5 + ROW_HEIGHT * len(job["tasks"]))))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        plot_gantt(ax, job["tasks"], job.get("title"))
+        fig.autofmt_xdate(rotation=30)
+    else:
+        fig = Figure(figsize=(8, 5))
+        FigureCanvasAgg(fig)
+        plot_status(fig.add_subplot(111), job["counts"], job.get("progress"))
+    fig.tight_layout()
+    written = []
+    for fmt in job["formats"]:
+        path = f"{job['path']}.{fmt}"
+        fig.savefig(path, dpi=job["dpi"], format=fmt)
+        written.append(path)
+    return written
+
+
+@traced("charts.run_jobs", "io")
+def run_jobs(jobs: list, max_workers: int = None) -> list:
+    """Render *jobs* in parallel processes; return all files written."""
+    if not jobs:
+        return []
+    for job in jobs:
+        os.makedirs(os.path.dirname(job["path"]) or ".", exist_ok=True)
+    # 'spawn': los procesos hijos no heredan el estado de Qt de la aplicación
+    with ProcessPoolExecutor(max_workers=max_workers or min(len(jobs), os.cpu_count() or 1),
+                             mp_context=get_context("spawn")) as pool:
+        return [path for paths in pool.map(render_job, jobs) for path in paths]
+
+
+def export_charts(db: Database, out_dir: str, formats=("png",), dpi: int = EXPORT_DPI,
+                  per_comunidad: bool = True, max_workers: int = None) -> list:
+    """Export the status chart and the Gantt charts; return the files written."""
+    return run_jobs(chart_jobs(db, out_dir, formats, dpi, per_comunidad), max_workers)
+
+
+def start_export(jobs: list, done, max_workers: int = None) -> threading.Thread:
+    """Run :func:`run_jobs` on a background thread.
+
+    *done* is called from that thread with the list of files, or with the
+    exception if rendering failed.
+    """
+    def run():
+        try:
+            result = run_jobs(jobs, max_workers)
+        except Exception as exc:  # se informa al llamador
+            result = exc
+        done(result)
+
+    thread = threading.Thread(target=run, name="chart-export", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,175 @@
+"""Command-line interface for batch jobs (no Qt required).
+
+Every command prints a JSON document on stdout; errors are printed as JSON
+on stderr with exit status 1. Examples::
+
+    python cli.py --db atajados.db import-items items.xlsx
+    python cli.py recompute
+    python cli.py progress
+    python cli.py export pdf reporte.pdf
+    python cli.py export-charts graficos --format png pdf
+    python cli.py export-analytics analisis --format arrow
+    python cli.py serve --port 8765
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from database import Database
+from workspace import Workspace
+
+
+def cmd_import_items(db, args):
+    import importers
+    return {"imported": importers.import_items(db, args.file)}
+
+
+def cmd_import_atajados(db, args):
+    import importers
+    return {"imported": importers.import_atajados(db, args.file)}
+
+
+def cmd_recompute(db, args):
+    return {"atajados": db.recompute_statuses(),
+            "project_progress": db.get_project_progress()}
+
+
+def cmd_progress(db, args):
+    counts = dict(db.fetchall(
+        "SELECT COALESCE(status, 'Pendiente'), COUNT(*) FROM atajados GROUP BY 1"
+    ))
+    return {"project_progress": db.get_project_progress(), "status": counts}
+
+
+def cmd_export(db, args):
+    import reports
+    reports.EXPORTERS[args.format](db, args.path)
+    return {"format": args.format, "path": args.path}
+
+
+def cmd_export_analytics(db, args):
+    import analytics
+    return {"format": args.format, "rows": analytics.export_snapshot(
+        db, args.out_dir, args.format, row_group=args.row_group)}
+
+
+def cmd_export_charts(db, args):
+    import charts
+    paths = charts.export_charts(db, args.out_dir, args.format, args.dpi,
+                                 per_comunidad=not args.no_comunidades, max_workers=args.workers)
+    return {"files": paths}
+
+
+def cmd_pack_photos(db, args):
+    import photo_pack
+    return {"packed": photo_pack.pack_all(args.image_dir)}
+
+
+def cmd_sync_export(db, args):
+    import sync
+    return sync.export_delta(db, args.path, peer=args.peer, since=0 if args.full else None)
+
+
+def cmd_sync_import(db, args):
+    import sync
+    return sync.import_delta(db, args.path)
+
+
+def cmd_serve(db, args):
+    import api_server
+    sys.stderr.write(f"Sirviendo {args.db_file} en http://{args.host}:{args.port}/api/\n")
+    api_server.serve(args.db_file, args.host, args.port, args.pool)
+    return {"stopped": True}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description="Seguimiento de atajados sin interfaz gráfica."
+    )
+    parser.add_argument("--db", help="archivo de base de datos (por defecto, el trabajo actual)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import-items", help="importar ítems desde Excel/CSV")
+    p.add_argument("file")
+    p.set_defaults(func=cmd_import_items)
+
+    p = sub.add_parser("import-atajados", help="importar atajados desde Excel/CSV")
+    p.add_argument("file")
+    p.set_defaults(func=cmd_import_atajados)
+
+    p = sub.add_parser("recompute", help="recalcular el estado de todos los atajados")
+    p.set_defaults(func=cmd_recompute)
+
+    p = sub.add_parser("progress", help="mostrar avance del proyecto y conteo por estado")
+    p.set_defaults(func=cmd_progress)
+
+    p = sub.add_parser("export", help="exportar reporte")
+    p.add_argument("format", choices=["xlsx", "pdf", "docx"])
+    p.add_argument("path")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("export-analytics", help="exportar tablas y agregados en Parquet o Arrow")
+    p.add_argument("out_dir")
+    p.add_argument("--format", default="parquet", choices=["parquet", "arrow"])
+    p.add_argument("--row-group", type=int, default=65_536, help="filas por grupo")
+    p.set_defaults(func=cmd_export_analytics)
+
+    p = sub.add_parser("export-charts", help="exportar Gantt y gráfico de estados en alta resolución")
+    p.add_argument("out_dir")
+    p.add_argument("--format", nargs="+", default=["png"], choices=["png", "pdf", "svg"])
+    p.add_argument("--dpi", type=int, default=300)
+    p.add_argument("--workers", type=int, help="procesos de dibujo (por defecto, uno por CPU)")
+    p.add_argument("--no-comunidades", action="store_true", help="solo el Gantt general")
+    p.set_defaults(func=cmd_export_charts)
+
+    p = sub.add_parser("pack-photos", help="empaquetar las fotos sueltas de cada atajado")
+    p.add_argument("--image-dir", default="images", help="carpeta de fotos")
+    p.set_defaults(func=cmd_pack_photos)
+
+    p = sub.add_parser("sync-export", help="generar paquete de sincronización")
+    p.add_argument("path")
+    p.add_argument("--peer", default="", help="copia destino (cursor propio por destino)")
+    p.add_argument("--full", action="store_true", help="incluir todos los cambios")
+    p.set_defaults(func=cmd_sync_export)
+
+    p = sub.add_parser("sync-import", help="aplicar paquete de sincronización")
+    p.add_argument("path")
+    p.set_defaults(func=cmd_sync_import)
+
+    p = sub.add_parser("serve", help="servir el API HTTP de solo lectura")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--pool", type=int, default=4, help="conexiones de lectura")
+    p.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    db_file = args.db_file = args.db or Workspace().current_or_default()
+    start = time.perf_counter()
+    db = None
+    try:
+        # Abrir dentro del try: carpeta inexistente, archivo bloqueado o
+        # migración fallida también se informan como error JSON
+        db = Database(db_file)
+        result = args.func(db, args)
+    except Exception as exc:
+        json.dump({"ok": False, "command": args.command, "error": str(exc)},
+                  sys.stderr, ensure_ascii=False)
+        sys.stderr.write("\n")
+        return 1
+    finally:
+        if db is not None:
+            db.close()
+    json.dump({"ok": True, "command": args.command, "db": db_file,
+               "elapsed": round(time.perf_counter() - start, 4), "result": result},
+              sys.stdout, ensure_ascii=False)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
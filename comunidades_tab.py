@@ -0,0 +1,116 @@
+# comunidades_tab.py
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QSplitter,
+    QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView
+)
+from PyQt6.QtCore import Qt
+from database import Database
+from tracing import traced
+
+COMUNIDAD_HEADERS = ["Comunidad", "Atajados", "Presupuesto", "Ejecutado", "Avance (%)",
+                     "Ejecutados", "En ejecución", "Pendientes"]
+ITEM_HEADERS = ["ID", "Ítem", "Presupuesto", "Ejecutado", "Avance (%)",
+                "Ejecutados", "En ejecución", "Pendientes"]
+
+
+def _cell(val, fmt="{:.2f}"):
+    """Celda ordenable: los números se ordenan por valor, no por texto."""
+    item = QTableWidgetItem()
+    if isinstance(val, float):
+        item.setData(Qt.ItemDataRole.DisplayRole, float(fmt.format(val)))
+    else:
+        item.setData(Qt.ItemDataRole.DisplayRole, val)
+    item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+    return item
+
+
+class ComunidadesTab(QWidget):
+    """Avance por comunidad con detalle por ítem, leído del rollup en caché."""
+    def __init__(self, db: Database):
+        super().__init__()
+        self.db = db
+        layout = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        self.filter = QLineEdit()
+        self.filter.setPlaceholderText("Filtrar comunidades…")
+        self.filter.textChanged.connect(self.filter_rows)
+        top.addWidget(self.filter)
+        top.addStretch()
+        layout.addLayout(top)
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        self.table = self._table(COMUNIDAD_HEADERS)
+        self.table.itemSelectionChanged.connect(self.show_items)
+        splitter.addWidget(self.table)
+
+        detail = QWidget()
+        detail_layout = QVBoxLayout(detail)
+        detail_layout.setContentsMargins(0, 0, 0, 0)
+        self.detail_label = QLabel("<i>Selecciona una comunidad para ver sus ítems</i>")
+        detail_layout.addWidget(self.detail_label)
+        self.items_table = self._table(ITEM_HEADERS)
+        detail_layout.addWidget(self.items_table)
+        splitter.addWidget(detail)
+        layout.addWidget(splitter)
+
+        self.refresh()
+
+    def _table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        table.setAlternatingRowColors(True)
+        table.setSortingEnabled(True)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    @staticmethod
+    def _fill(table, rows):
+        table.setSortingEnabled(False)
+        table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, val in enumerate(row):
+                table.setItem(r, c, _cell(val))
+        table.setSortingEnabled(True)
+
+    @traced(cat="ui")
+    def refresh(self):
+        """Recarga las comunidades conservando la selección."""
+        selected = self.selected_comunidad()
+        rows = [(com or "(sin comunidad)",) + tuple(rest)
+                for com, *rest in self.db.rollup_comunidades()]
+        self.table.blockSignals(True)
+        self._fill(self.table, rows)
+        self.table.blockSignals(False)
+        self.filter_rows(self.filter.text())
+        if selected is not None:
+            for r in range(self.table.rowCount()):
+                if self._comunidad(r) == selected:
+                    self.table.selectRow(r)
+                    break
+        self.show_items()
+
+    def _comunidad(self, row):
+        name = self.table.item(row, 0).text()
+        return "" if name == "(sin comunidad)" else name
+
+    def selected_comunidad(self):
+        rows = self.table.selectionModel().selectedRows() if self.table.selectionModel() else []
+        return self._comunidad(rows[0].row()) if rows else None
+
+    def filter_rows(self, text):
+        t = text.lower()
+        for r in range(self.table.rowCount()):
+            self.table.setRowHidden(r, t not in self.table.item(r, 0).text().lower())
+
+    def show_items(self):
+        """Detalle por ítem de la comunidad seleccionada."""
+        com = self.selected_comunidad()
+        if com is None:
+            self.items_table.setRowCount(0)
+            return
+        self.detail_label.setText(f"<b>Ítems de {com or '(sin comunidad)'}</b>")
+        self._fill(self.items_table, self.db.rollup_items(com))
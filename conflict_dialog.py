@@ -0,0 +1,88 @@
+"""Merge prompt for rows another user saved while they were edited here.
+
+:class:`ConflictDialog` shows, field by field, the value edited here and
+the value now in the database and lets the user pick which one stays.
+:func:`resolve_buffer_conflicts` runs it for every conflict left by
+:meth:`edit_buffer.EditBuffer.flush`.
+"""
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QDialogButtonBox,
+    QAbstractItemView, QHeaderView, QMessageBox
+)
+from PyQt6.QtCore import Qt
+
+TITLE = "Conflicto de edición"
+
+
+def _text(val) -> str:
+    return "" if val is None else str(val)
+
+
+class ConflictDialog(QDialog):
+    """Campo | Mi valor | Valor guardado; marcar 'Mi valor' lo conserva."""
+
+    def __init__(self, message: str, rows: list, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(TITLE)
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(message))
+
+        self.table = QTableWidget(len(rows), 3)
+        self.table.setHorizontalHeaderLabels(["Campo", "Mi valor", "Valor guardado"])
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        for r, (label, mine, theirs) in enumerate(rows):
+            self.table.setItem(r, 0, QTableWidgetItem(label))
+            cell = QTableWidgetItem(_text(mine))
+            cell.setFlags(cell.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            cell.setCheckState(Qt.CheckState.Checked)
+            self.table.setItem(r, 1, cell)
+            self.table.setItem(r, 2, QTableWidgetItem(_text(theirs)))
+        layout.addWidget(self.table)
+        layout.addWidget(QLabel("<i>Desmarca los valores propios que quieras descartar.</i>"))
+
+        buttons = QDialogButtonBox()
+        buttons.addButton("Guardar selección", QDialogButtonBox.ButtonRole.AcceptRole)
+        buttons.addButton("Descartar mis cambios", QDialogButtonBox.ButtonRole.RejectRole)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.resize(560, 120 + 30 * len(rows))
+
+    def keep_mine(self) -> list:
+        """One flag per row: True to keep the value edited here."""
+        if self.result() != QDialog.DialogCode.Accepted:
+            return [False] * self.table.rowCount()
+        return [self.table.item(r, 1).checkState() == Qt.CheckState.Checked
+                for r in range(self.table.rowCount())]
+
+
+def resolve_buffer_conflicts(parent, buffer, labels: dict, row_label) -> int:
+    """Ask how to merge each conflict of *buffer*; return how many there were.
+
+    *labels* maps column names to the headers shown; *row_label(row_id)*
+    names the row in the messages.
+    """
+    conflicts, buffer.conflicts = buffer.conflicts, []
+    for conflict in conflicts:
+        name = row_label(conflict.row_id)
+        if conflict.theirs is None:
+            QMessageBox.information(
+                parent, TITLE, f"{name} fue eliminado por otro usuario; se descartaron tus cambios."
+            )
+            continue
+        cols = [c for c in sorted(conflict.mine) if conflict.mine[c] != conflict.theirs[c]]
+        dlg = ConflictDialog(
+            f"{name} fue modificado por otro usuario mientras lo editabas.",
+            [(labels.get(c, c), conflict.mine[c], conflict.theirs[c]) for c in cols],
+            parent,
+        )
+        dlg.exec()
+        values = {c: conflict.mine[c] for c, keep in zip(cols, dlg.keep_mine()) if keep}
+        if not buffer.resolve(conflict, values):
+            QMessageBox.warning(
+                parent, TITLE, f"{name} volvió a cambiar; revisa los datos recargados."
+            )
+    return len(conflicts)
@@ -0,0 +1,159 @@
+"""Critical path method over the items of the cronograma.
+
+Activities are items; each may depend on others finishing first
+(finish-to-start, stored in ``item_dependencies``). :class:`CriticalPath`
+orders the graph topologically once and computes early/late start, float
+and the critical path with one forward and one backward pass, linear in
+nodes plus edges. :meth:`CriticalPath.set_duration` recalculates only the
+activities downstream (early dates) and upstream (late dates) of the one
+that changed, unless the project end moves::
+
+    cp = CriticalPath({1: 5, 2: 3, 3: 4}, {3: [1, 2]})
+    cp.critical()          # [1, 3]
+    cp.set_duration(2, 8)  # actividades con fechas nuevas; la ruta crítica pasa a 2 → 3
+"""
+
+import heapq
+
+from database import Database
+
+
+class CriticalPath:
+    """Early/late dates (in days from the project start) of a dependency graph."""
+
+    def __init__(self, durations: dict, predecessors: dict = None):
+        self.nodes = list(durations)
+        self.index = {n: i for i, n in enumerate(self.nodes)}
+        self.duration = [max(0, int(durations[n] or 0)) for n in self.nodes]
+        self.preds = [[] for _ in self.nodes]
+        self.succs = [[] for _ in self.nodes]
+        for node, pred_list in (predecessors or {}).items():
+            if node not in self.index:
+                continue
+            for pred in pred_list:
+                # Dependencias hacia actividades fuera del cronograma se ignoran
+                if pred in self.index and pred != node:
+                    self.preds[self.index[node]].append(self.index[pred])
+                    self.succs[self.index[pred]].append(self.index[node])
+        self.order = self._topological_order()
+        self.position = [0] * len(self.nodes)
+        for pos, i in enumerate(self.order):
+            self.position[i] = pos
+        n = len(self.nodes)
+        self.es, self.ef, self.ls, self.lf = [0] * n, [0] * n, [0] * n, [0] * n
+        self.end = 0
+        self._forward_all()
+        self._backward_all()
+
+    def _topological_order(self) -> list:
+        """Kahn's algorithm; raises ValueError on circular dependencies."""
+        indegree = [len(p) for p in self.preds]
+        ready = [i for i, d in enumerate(indegree) if d == 0]
+        order = []
+        while ready:
+            i = ready.pop()
+            order.append(i)
+            for s in self.succs[i]:
+                indegree[s] -= 1
+                if indegree[s] == 0:
+                    ready.append(s)
+        if len(order) != len(self.nodes):
+            cycle = [self.nodes[i] for i, d in enumerate(indegree) if d > 0]
+            raise ValueError(f"Dependencias circulares entre: {', '.join(map(str, cycle))}")
+        return order
+
+    # ----------------------------------------------------------------- pasadas
+    def _forward_all(self) -> None:
+        for i in self.order:
+            self.es[i] = max((self.ef[p] for p in self.preds[i]), default=0)
+            self.ef[i] = self.es[i] + self.duration[i]
+        self.end = max(self.ef, default=0)
+
+    def _backward_all(self) -> None:
+        for i in reversed(self.order):
+            self.lf[i] = min((self.ls[s] for s in self.succs[i]), default=self.end)
+            self.ls[i] = self.lf[i] - self.duration[i]
+
+    def _propagate(self, start: int, step, neighbours, forward: bool) -> set:
+        """Recompute *start* and, while values change, its neighbours."""
+        sign = 1 if forward else -1
+        heap, queued, changed = [(sign * self.position[start], start)], {start}, set()
+        while heap:
+            _, i = heapq.heappop(heap)
+            if step(i) or i == start:
+                changed.add(i)
+                for j in neighbours[i]:
+                    if j not in queued:
+                        queued.add(j)
+                        heapq.heappush(heap, (sign * self.position[j], j))
+        return changed
+
+    def _step_early(self, i) -> bool:
+        es = max((self.ef[p] for p in self.preds[i]), default=0)
+        old = (self.es[i], self.ef[i])
+        self.es[i], self.ef[i] = es, es + self.duration[i]
+        return old != (self.es[i], self.ef[i])
+
+    def _step_late(self, i) -> bool:
+        lf = min((self.ls[s] for s in self.succs[i]), default=self.end)
+        old = (self.ls[i], self.lf[i])
+        self.lf[i], self.ls[i] = lf, lf - self.duration[i]
+        return old != (self.ls[i], self.lf[i])
+
+    # ------------------------------------------------------------- actualizar
+    def set_duration(self, node, days: int) -> set:
+        """Change one duration and recalculate; return the nodes whose dates changed."""
+        i = self.index[node]
+        self.duration[i] = max(0, int(days or 0))
+        changed = self._propagate(i, self._step_early, self.succs, forward=True)
+        end = max(self.ef, default=0)
+        if end != self.end:
+            # Cambió el fin del proyecto: todas las fechas tardías se mueven
+            self.end = end
+            self._backward_all()
+            return set(self.nodes)
+        changed |= self._propagate(i, self._step_late, self.preds, forward=False)
+        return {self.nodes[j] for j in changed}
+
+    # --------------------------------------------------------------- consultas
+    def slack(self, node) -> int:
+        """Total float: days the activity can slip without delaying the end."""
+        i = self.index[node]
+        return self.ls[i] - self.es[i]
+
+    def is_critical(self, node) -> bool:
+        return self.slack(node) == 0
+
+    def critical(self) -> list:
+        """Critical activities in topological order."""
+        return [self.nodes[i] for i in self.order if self.ls[i] == self.es[i]]
+
+    def dates(self, node) -> tuple:
+        """``(early start, early finish, late start, late finish)`` in days."""
+        i = self.index[node]
+        return self.es[i], self.ef[i], self.ls[i], self.lf[i]
+
+
+def schedule_tasks(db: Database, tasks: list) -> CriticalPath:
+    """Run the critical path over Gantt *tasks* and annotate them in place.
+
+    Durations are the planned ``items.duration`` or, if empty, the days
+    between the first and last avance. Each task gets ``"c"`` (1 if
+    critical), ``"p"`` (its predecessors), ``"duration"`` and ``"float"``.
+    """
+    planned = dict(db.fetchall("SELECT id, duration FROM items WHERE duration IS NOT NULL"))
+    durations = {t["id"]: planned.get(t["id"], t["days"]) for t in tasks}
+    deps = db.item_dependencies()
+    cp = CriticalPath(durations, deps)
+    annotate(cp, tasks, deps)
+    return cp
+
+
+def annotate(cp: CriticalPath, tasks: list, deps: dict = None) -> None:
+    """Copy the results of *cp* (and the predecessors in *deps*) into *tasks*."""
+    for t in tasks:
+        t["duration"] = cp.duration[cp.index[t["id"]]]
+        t["float"] = cp.slack(t["id"])
+        t["c"] = int(t["float"] == 0)
+        if deps is not None:
+            t["p"] = ", ".join(str(p) for p in deps.get(t["id"], ()))
@@ -1,7 +1,7 @@
 # cronograma_tab.py
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
-    QSplitter, QTableWidget, QTableWidgetItem
+    QSplitter, QTableWidget, QTableWidgetItem, QMessageBox
 )
 from PyQt6.QtCore import Qt
 from matplotlib.backends.backend_qtagg import (
@@ -9,14 +9,24 @@ from matplotlib.backends.backend_qtagg import (
     NavigationToolbar2QT as NavigationToolbar,
 )
 import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import datetime
+from charts import gantt_tasks, plot_gantt
+from cpm import annotate, schedule_tasks
+from forecast import CompletionForecast
+from theme import style_axes
+from tracing import traced
+
+# Columnas editables: predecesoras y duración planificada
+COL_PRED, COL_DAYS = 6, 7
 
 class CronogramaTab(QWidget):
     def __init__(self, db, parent=None):
         super().__init__(parent)
         self.db = db
         self.tasks = []
+        self.cpm = None
+        self._loading = False
+        self.dark = False
+        self._restyle_pending = False
         self.init_ui()
 
     def init_ui(self):
@@ -39,11 +49,17 @@ class CronogramaTab(QWidget):
 
         # Tabla de items
         self.table = QTableWidget()
-        self.table.setColumnCount(8)
+        self.table.setColumnCount(10)
         self.table.setHorizontalHeaderLabels([
-            "Nº", "Actividad", "Hrs.", "Inicia", "Finaliza", "C.", "P.", "Días"
+            "Nº", "Actividad", "Hrs.", "Inicia", "Finaliza", "C.", "P.", "Días", "Holgura",
+            "Fin est."
         ])
+        self.table.horizontalHeaderItem(5).setToolTip("Actividad en la ruta crítica")
+        self.table.horizontalHeaderItem(COL_PRED).setToolTip(
+            "Predecesoras: números de ítem separados por comas")
+        self.table.horizontalHeaderItem(COL_DAYS).setToolTip("Duración planificada (días)")
         self.table.setAlternatingRowColors(True)
+        self.table.cellChanged.connect(self.on_cell_changed)
         splitter.addWidget(self.table)
 
         # Contenedor de gráfico
@@ -63,103 +79,112 @@ class CronogramaTab(QWidget):
         # Carga data y pinta
         self.load_data()
 
+    @traced(cat="ui")
     def load_data(self):
         """
         Carga ítems y fechas desde tabla 'avances'.
         """
-        sql = (
-            "SELECT i.id, i.name, "
-            "MIN(a.date) AS start_date, MAX(a.date) AS end_date "
-            "FROM items i "
-            "JOIN avances a ON a.item_id = i.id "
-            "GROUP BY i.id, i.name "
-            "ORDER BY i.id;"
-        )
-        rows = self.db.fetchall(sql)
-        self.tasks = []
-        for item_id, name, start_val, end_val in rows:
-            # Ignorar registros sin fechas
-            if start_val is None or end_val is None:
-                continue
-            # Convertir tipos
-            if isinstance(start_val, str):
-                start = datetime.datetime.strptime(start_val, "%Y-%m-%d").date()
-            else:
-                start = start_val
-            if isinstance(end_val, str):
-                end = datetime.datetime.strptime(end_val, "%Y-%m-%d").date()
-            else:
-                end = end_val
-            days = (end - start).days
-            hours = days * 8  # Estimación: 8h por día
-            self.tasks.append({
-                "id": item_id,
-                "activity": name,
-                "hours": hours,
-                "start": start,
-                "end": end,
-                "c": 0,
-                "p": 0,
-                "days": days
-            })
+        self.tasks = gantt_tasks(self.db, forecast=CompletionForecast.load(self.db))
+        try:
+            self.cpm = schedule_tasks(self.db, self.tasks)
+        except ValueError as ex:
+            self.cpm = None
+            QMessageBox.warning(self, "Ruta crítica", str(ex))
         # Rellena la tabla
+        self._loading = True
         self.table.setRowCount(len(self.tasks))
         for i, t in enumerate(self.tasks):
-            self.table.setItem(i, 0, QTableWidgetItem(str(t["id"])))
-            self.table.setItem(i, 1, QTableWidgetItem(t["activity"]))
-            self.table.setItem(i, 2, QTableWidgetItem(str(t["hours"])))
-            self.table.setItem(i, 3, QTableWidgetItem(t["start"].strftime("%d/%m/%y")))
-            self.table.setItem(i, 4, QTableWidgetItem(t["end"].strftime("%d/%m/%y")))
-            self.table.setItem(i, 5, QTableWidgetItem(str(t["c"])))
-            self.table.setItem(i, 6, QTableWidgetItem(str(t["p"])))
-            self.table.setItem(i, 7, QTableWidgetItem(str(t["days"])))
+            end = t["forecast"]
+            values = [t["id"], t["activity"], t["hours"], t["start"].strftime("%d/%m/%y"),
+                      t["end"].strftime("%d/%m/%y"), "", t["p"], t.get("duration", t["days"]),
+                      "", end.strftime("%d/%m/%y") if end else ""]
+            for c, val in enumerate(values):
+                item = QTableWidgetItem(str(val))
+                if c not in (COL_PRED, COL_DAYS):
+                    item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+                self.table.setItem(i, c, item)
+            self._show_cpm(i)
+        self._loading = False
         # Pinta el Gantt
         self.draw_gantt()
 
+    def _show_cpm(self, row):
+        """Rellena las columnas de ruta crítica (C., Holgura) de una fila."""
+        t = self.tasks[row]
+        self.table.item(row, 5).setText("✔" if t.get("c") else "")
+        self.table.item(row, 8).setText(str(t["float"]) if "float" in t else "")
+
+    def on_cell_changed(self, row, col):
+        if self._loading or col not in (COL_PRED, COL_DAYS) or self.cpm is None:
+            return
+        t = self.tasks[row]
+        text = self.table.item(row, col).text()
+        try:
+            if col == COL_DAYS:
+                days = int(text)
+                if days < 0:
+                    raise ValueError
+            else:
+                preds = [int(p) for p in text.replace(";", ",").split(",") if p.strip()]
+        except ValueError:
+            QMessageBox.warning(self, "Error", "Valor inválido.")
+            self.load_data()
+            return
+
+        if col == COL_DAYS:
+            self.db.execute("UPDATE items SET duration=? WHERE id=?", (days, t["id"]))
+            # Solo se recalculan las actividades afectadas por el cambio
+            changed = self.cpm.set_duration(t["id"], days)
+            rows = [r for r, task in enumerate(self.tasks) if task["id"] in changed]
+            annotate(self.cpm, [self.tasks[r] for r in rows])
+            self._loading = True
+            for r in rows:
+                self._show_cpm(r)
+            self._loading = False
+            self.draw_gantt()
+        else:
+            old = self.db.item_dependencies().get(t["id"], [])
+            self.db.set_item_dependencies(t["id"], preds)
+            try:
+                schedule_tasks(self.db, [dict(task) for task in self.tasks])
+            except ValueError as ex:
+                self.db.set_item_dependencies(t["id"], old)
+                QMessageBox.warning(self, "Ruta crítica", str(ex))
+            self.load_data()
+
+    @traced(cat="ui")
     def draw_gantt(self):
         self.figure.clear()
         ax = self.figure.add_subplot(111)
         if not self.tasks:
             self.canvas.draw()
             return
-
-        # Configurar límites de fecha
-        starts = [t["start"] for t in self.tasks]
-        ends = [t["end"] for t in self.tasks]
-        min_date = min(starts) - datetime.timedelta(days=1)
-        max_date = max(ends) + datetime.timedelta(days=1)
-        ax.set_xlim(mdates.date2num(min_date), mdates.date2num(max_date))
-
-        # Formato eje X: meses y semanas
-        ax.xaxis.set_major_locator(mdates.MonthLocator())
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%b/%Y'))
-        ax.xaxis.set_minor_locator(mdates.WeekdayLocator(byweekday=mdates.MO))
-        ax.grid(True, which='minor', axis='x', linestyle='--', color='red')
-        ax.grid(True, which='major', axis='x', linestyle='-', color='black', linewidth=1)
-
-        # Dibujar barras y etiquetas
-        yticks, ylabels = [], []
-        for idx, t in enumerate(self.tasks):
-            start_num = mdates.date2num(t["start"])
-            duration = t["days"]
-            ax.broken_barh([(start_num, duration)], (idx*10, 9), facecolors='tab:red')
-            yticks.append(idx*10 + 4.5)
-            ylabels.append(f"{t['id']}. {t['activity']}")
-            ax.text(start_num + duration/2, idx*10 + 4.5,
-                    f"{duration} d.", ha='center', va='center', fontsize=8)
-
-        ax.set_yticks(yticks)
-        ax.set_yticklabels(ylabels)
-        ax.set_ylabel('Actividades')
-        ax.set_xlabel('Fecha')
-
-        # Línea de hoy
-        hoy = datetime.date.today()
-        ax.axvline(mdates.date2num(hoy), color='blue', linestyle='--')
-
+        plot_gantt(ax, self.tasks)
         self.figure.autofmt_xdate(rotation=30)
+        style_axes(self.figure, self.dark)
+        self._restyle_pending = False
         self.canvas.draw()
 
+    def set_theme(self, dark: bool):
+        """Recolorea el Gantt dibujado sin volver a calcularlo."""
+        self.dark = dark
+        # Oculto, el Gantt se recolorea recién al mostrar la pestaña
+        if self.isVisible():
+            self._restyle()
+        else:
+            self._restyle_pending = True
+
+    def _restyle(self):
+        self._restyle_pending = False
+        style_axes(self.figure, self.dark)
+        self.canvas.draw_idle()
+
+    def showEvent(self, event):
+        if self._restyle_pending:
+            self._restyle()
+        super().showEvent(event)
+
+    @traced(cat="ui")
     def refresh(self):
         """Recargar datos y redibujar el cronograma."""
         self.load_data()
\ No newline at end of file
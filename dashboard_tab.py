@@ -3,6 +3,8 @@ from PyQt6.QtGui import QPixmap
 from PyQt6.QtCore import Qt
 import pyqtgraph as pg
 from database import Database
+from theme import colors
+from tracing import traced
 
 class DashboardTab(QWidget):
     def __init__(self, db: Database):
@@ -18,13 +20,14 @@ class DashboardTab(QWidget):
         # --------- Métricas -------------------------------------------------
         metrics_layout = QHBoxLayout()
         metrics = [
-            ("Total Atajados", "icons/total.png",       lambda: self.get_count()),
-            ("Ejecutados",     "icons/executed.png",    lambda: self.get_count("Ejecutado")),
-            ("En ejecución",   "icons/running.png",     lambda: self.get_count("En ejecución")),
-            ("Pendientes",     "icons/pending.png",     lambda: self.get_pending()),
+            ("Total Atajados", "icons/total.png",    "total"),
+            ("Ejecutados",     "icons/executed.png", "ejecutados"),
+            ("En ejecución",   "icons/running.png",  "en_ejecucion"),
+            ("Pendientes",     "icons/pending.png",  "pendientes"),
         ]
+        counts = self.db.status_counts()
         self.metric_labels = []
-        for text, icon_path, fn in metrics:
+        for text, icon_path, key in metrics:
             w = QWidget(); v = QVBoxLayout(w)
 
             icon_lbl = QLabel()
@@ -32,7 +35,7 @@ class DashboardTab(QWidget):
                                                          Qt.TransformationMode.SmoothTransformation))
             icon_lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
-            value_lbl = QLabel(f"<b>{fn()}</b>")
+            value_lbl = QLabel(f"<b>{counts[key]}</b>")
             value_lbl.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
             caption = QLabel(text)
@@ -40,7 +43,7 @@ class DashboardTab(QWidget):
 
             v.addWidget(icon_lbl); v.addWidget(value_lbl); v.addWidget(caption)
             metrics_layout.addWidget(w)
-            self.metric_labels.append((value_lbl, fn))
+            self.metric_labels.append((value_lbl, key))
         main_layout.addLayout(metrics_layout)
 
         # --------- Avance global -------------------------------------------
@@ -50,11 +53,8 @@ class DashboardTab(QWidget):
 
         # --------- Gráfica --------------------------------------------------
         self.chart = pg.PlotWidget()
-        counts = [self.get_count(),
-                  self.get_count("Ejecutado"),
-                  self.get_count("En ejecución"),
-                  self.get_pending()]
-        self.bar = pg.BarGraphItem(x=[0,1,2,3], height=counts, width=0.6, brush="skyblue")
+        self.bar = pg.BarGraphItem(x=[0,1,2,3], height=[counts[k] for _, _, k in metrics],
+                                   width=0.6, brush="skyblue")
         self.chart.addItem(self.bar)
         self.chart.getAxis("bottom").setTicks([[(0,"Total"),(1,"Ejecutado"),(2,"En ejec."),(3,"Pendiente")]])
         main_layout.addWidget(self.chart); main_layout.addStretch()
@@ -65,22 +65,22 @@ class DashboardTab(QWidget):
     # ------------------------ Tema -----------------------------------------
     def set_theme(self, dark: bool):
         """Ajusta colores de la gráfica según el tema."""
-        bg   = "#1e1e1e" if dark else "#ffffff"
-        axis = "#dddddd" if dark else "#202020"
-        bars = "skyblue" if not dark else "#5dade2"
+        c = colors(dark)
+        bg, axis, bars = c["chart_bg"], c["chart_fg"], c["chart_bars"]
 
         self.chart.setBackground(bg)
-        ax = self.chart.getAxis("left");  ax.setPen(axis)
-        ax = self.chart.getAxis("bottom"); ax.setPen(axis)
+        for side in ("left", "bottom"):
+            ax = self.chart.getAxis(side)
+            ax.setPen(axis); ax.setTextPen(axis)
         self.bar.setOpts(brush=bars, pen=axis)
 
     # ------------------------ Refresh --------------------------------------
+    @traced(cat="ui")
     def refresh(self):
-        for lbl, fn in self.metric_labels:
-            lbl.setText(f"<b>{fn()}</b>")
-        counts = [self.get_count(), self.get_count("Ejecutado"),
-                  self.get_count("En ejecución"), self.get_pending()]
-        self.bar.setOpts(height=counts)
+        counts = self.db.status_counts()
+        for lbl, key in self.metric_labels:
+            lbl.setText(f"<b>{counts[key]}</b>")
+        self.bar.setOpts(height=[counts[key] for _, key in self.metric_labels])
         self.progress_label.setText(f"Avance del Proyecto: {self.db.get_project_progress():.0f}%")
 
     # ------------------------ Queries --------------------------------------
@@ -1,11 +1,128 @@
 """Simple SQLite wrapper used by the application."""
 
 import os
+import random
+import socket
 import sqlite3
-from contextlib import closing
+import time
+import uuid
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+from query_cache import FORMAT_VERSION, QueryCache, cached_query
+from tracing import span, traced
 
 DB_FILE = "atajados.db"
 PHOTO_DIR = "photos"
+
+# Costo total y costo ejecutado del proyecto en una sola consulta. Los ítems
+# activos toman el promedio de sus avances; los globales, su propio avance.
+# ``{schema}`` permite ejecutarla sobre una base adjunta (``p0.``).
+PROJECT_COST_SQL = """
+    SELECT COALESCE(SUM(i.total*i.incidence), 0) AS cost,
+           COALESCE(SUM(i.total*i.incidence*
+               CASE WHEN i.active THEN COALESCE(
+                   (SELECT AVG(a.quantity) FROM {schema}avances a WHERE a.item_id=i.id), 0)
+               ELSE COALESCE(i.progress, 0) END / 100.0), 0) AS executed
+    FROM {schema}items i
+"""
+
+# Avance (%) y estado en caché de los atajados que cumplen {where}. El avance se
+# pondera por el costo de los ítems activos registrados; sin avances el atajado
+# queda pendiente (estado NULL). Se usan desde triggers y desde Python.
+REFRESH_PROGRESS_SQL = """
+    UPDATE atajados SET progress = COALESCE((
+        SELECT SUM(i.total*i.incidence*a.quantity) / SUM(i.total*i.incidence)
+        FROM avances a JOIN items i ON a.item_id=i.id
+        WHERE a.atajado_id=atajados.number AND i.active=1), 0)
+    WHERE {where}
+"""
+REFRESH_STATUS_SQL = """
+    UPDATE atajados SET status = CASE
+        WHEN NOT EXISTS (SELECT 1 FROM avances a WHERE a.atajado_id=atajados.number) THEN NULL
+        WHEN ROUND(progress, 6) >= 100 THEN 'Ejecutado'
+        ELSE 'En ejecución' END
+    WHERE {where}
+"""
+
+# Número de día (días desde 1970-01-01) de una fecha 'AAAA-MM-DD'; NULL si no es fecha.
+# Las columnas *_day lo guardan junto al TEXT original para búsquedas por rango.
+DAY_SQL = "CAST(julianday({}) - 2440587.5 AS INTEGER)"
+
+# Búsqueda de atajados: máximo de resultados y de dígitos de un número de atajado
+SEARCH_LIMIT = 50
+NUMBER_DIGITS = 9
+
+# Fecha del último avance de los atajados que cumplen {where} (columna en caché)
+LAST_DATE_SQL = """
+    UPDATE atajados SET last_date =
+        (SELECT MAX(a.date) FROM avances a WHERE a.atajado_id = atajados.number)
+    WHERE {where}
+"""
+
+# Resumen paginado: filas por página y orden por columna (todas con índice)
+SUMMARY_PAGE = 200
+SUMMARY_SORT = ("number", "beneficiario COLLATE NOCASE", "last_date", "progress")
+
+# Tablas con contador de cambios (table_versions) para refrescar otras instancias
+WATCHED_TABLES = ("items", "atajados", "avances", "cronograma")
+
+# Espera ante un archivo bloqueado por otra instancia: timeout de SQLite y
+# reintentos con espera exponencial (base * 2**intento, con variación aleatoria)
+BUSY_TIMEOUT_S = 5.0
+LOCK_RETRIES = 4
+RETRY_BASE_S = 0.1
+
+# Filas de rollup_comunidad_item calculadas desde los avances de las comunidades
+# que cumplen {where}; se usa al crear la tabla y desde los triggers
+ROLLUP_FILL_SQL = """
+    INSERT INTO rollup_comunidad_item(comunidad, item_id, avances, pct_sum, done, started)
+    SELECT m.comunidad, a.item_id, COUNT(*), SUM(COALESCE(a.quantity, 0)),
+           SUM(a.quantity >= 100), SUM(a.quantity > 0 AND a.quantity < 100)
+    FROM avances a JOIN atajado_comunidad m ON m.number = a.atajado_id
+    WHERE a.item_id IS NOT NULL AND {where}
+    GROUP BY m.comunidad, a.item_id
+"""
+
+# Columnas replicadas por la sincronización; 'status' es derivado y se recalcula
+SYNC_COLUMNS = {
+    "avances": ("atajado_id", "item_id", "date", "quantity", "start_date", "end_date"),
+    "atajados": ("number", "comunidad", "beneficiario", "ci", "coord_e", "coord_n",
+                 "start_date", "end_date", "observations", "photo"),
+}
+
+# Columnas editadas por el usuario; al cambiarlas sube 'row_version' de la fila.
+# progress/status de atajados son cachés de triggers y no cuentan.
+VERSIONED_COLUMNS = {
+    "items": ("name", "unit", "total", "incidence", "active", "progress"),
+    "atajados": SYNC_COLUMNS["atajados"],
+    "avances": SYNC_COLUMNS["avances"],
+}
+
+# Valor por omisión de 'version' en record_progress: escribir sin comprobar
+ANY_VERSION = object()
+
+# Mientras existe app_state.deferred (dentro de record_progress_bulk) los triggers
+# no recalculan el avance por fila; la carga masiva lo hace una vez al final
+NOT_DEFERRED = "(SELECT value FROM app_state WHERE key='deferred') IS NULL"
+
+
+def is_locked(exc: BaseException) -> bool:
+    """Whether *exc* is SQLite reporting a file locked by another connection."""
+    msg = str(exc).lower()
+    return isinstance(exc, sqlite3.OperationalError) and ("locked" in msg or "busy" in msg)
+
+
+def retry_locked(func, *args, retries: int = LOCK_RETRIES, base: float = RETRY_BASE_S):
+    """Call ``func(*args)``, retrying with exponential backoff while locked."""
+    for attempt in range(retries + 1):
+        try:
+            return func(*args)
+        except sqlite3.OperationalError as exc:
+            if attempt == retries or not is_locked(exc):
+                raise
+            time.sleep(base * 2 ** attempt * (0.5 + random.random()))
+
 # Crear directorio de fotos si no existe
 os.makedirs(PHOTO_DIR, exist_ok=True)
 
@@ -13,119 +130,1013 @@ os.makedirs(PHOTO_DIR, exist_ok=True)
 class Database:
     """SQLite database connection with helper methods."""
 
-    def __init__(self, db_file: str = DB_FILE):
-        self.conn = sqlite3.connect(db_file)
-        self.init_tables()
+    def __init__(self, db_file: str = DB_FILE, readonly: bool = False,
+                 check_same_thread: bool = True):
+        if readonly:
+            # Sólo lectura: no se crean tablas ni se puede escribir
+            self.conn = sqlite3.connect(Path(db_file).absolute().as_uri() + "?mode=ro",
+                                        uri=True, timeout=BUSY_TIMEOUT_S,
+                                        check_same_thread=check_same_thread)
+        else:
+            self.conn = sqlite3.connect(db_file, timeout=BUSY_TIMEOUT_S,
+                                        check_same_thread=check_same_thread)
+        self._tx_depth = 0
+        self._matrix = None
+        self.readonly = readonly
+        self.cache = QueryCache()
+        if not readonly:
+            self.init_tables()
+        self._load_cache()
 
     def close(self) -> None:
-        """Close the database connection."""
+        """Save the query cache and close the database connection."""
         if self.conn:
+            if not self.readonly:
+                self.save_cache()
             self.conn.close()
             self.conn = None
 
     def init_tables(self) -> None:
-        """Create tables if they do not exist."""
+        """Apply pending schema migrations and refresh this copy's node id."""
+        self.migrate()
         with closing(self.conn.cursor()) as c:
-            # Tabla de items
-            c.execute(
-                """
-                CREATE TABLE IF NOT EXISTS items (
-                    id INTEGER PRIMARY KEY,
-                    name TEXT,
-                    unit TEXT,
-                    total REAL,
-                    incidence REAL,
-                    active INTEGER DEFAULT 0,
-                    progress REAL DEFAULT 0
+            self._init_node_id(c)
+        self.conn.commit()
+
+    # ------------------------------------------------------------ migraciones
+    def schema_version(self) -> int:
+        """Return the schema version stored in ``PRAGMA user_version``."""
+        return self.fetchall("PRAGMA user_version")[0][0]
+
+    def migrate(self, target: int = None) -> list:
+        """Apply pending migrations up to *target* (default: the latest).
+
+        Each migration runs in its own transaction together with the
+        ``user_version`` bump, so an interrupted upgrade resumes where it
+        stopped. Returns the versions applied.
+        """
+        target = len(self.MIGRATIONS) if target is None else target
+        current = self.schema_version()
+        if current > len(self.MIGRATIONS):
+            raise RuntimeError(
+                f"La base de datos tiene el esquema {current}, más nuevo que este programa "
+                f"({len(self.MIGRATIONS)})."
+            )
+        applied = []
+        for version in range(current + 1, target + 1):
+            with self.transaction() as c:
+                # BEGIN explícito: sqlite3 no abre transacción antes de sentencias DDL
+                if not self.conn.in_transaction:
+                    c.execute("BEGIN")
+                self.MIGRATIONS[version - 1](self, c)
+                c.execute(f"PRAGMA user_version = {version}")
+            applied.append(version)
+        return applied
+
+    def _migrate_v1(self, c) -> None:
+        """Base schema; also adopts databases created before versioning."""
+        # Tabla de items
+        c.execute(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY,
+                name TEXT,
+                unit TEXT,
+                total REAL,
+                incidence REAL,
+                active INTEGER DEFAULT 0,
+                progress REAL DEFAULT 0
+            )
+            """
+        )
+
+        # Compatibilidad hacia atrás para columna 'progress'
+        cols = [r[1] for r in c.execute("PRAGMA table_info(items)")]
+        if "progress" not in cols:
+            c.execute("ALTER TABLE items ADD COLUMN progress REAL DEFAULT 0")
+
+        # Tabla de atajados
+        c.execute(
+            """
+            CREATE TABLE IF NOT EXISTS atajados (
+                id INTEGER PRIMARY KEY,
+                number INTEGER,
+                comunidad TEXT,
+                beneficiario TEXT,
+                ci TEXT,
+                coord_e REAL,
+                coord_n REAL,
+                start_date TEXT,
+                end_date TEXT,
+                status TEXT,
+                observations TEXT,
+                photo TEXT,
+                progress REAL DEFAULT 0
+            )
+            """
+        )
+
+        # Compatibilidad hacia atrás para la columna en caché 'progress'
+        cols = [r[1] for r in c.execute("PRAGMA table_info(atajados)")]
+        backfill = "progress" not in cols
+        if backfill:
+            c.execute("ALTER TABLE atajados ADD COLUMN progress REAL DEFAULT 0")
+
+        # Tabla de avances
+        c.execute(
+            """
+            CREATE TABLE IF NOT EXISTS avances (
+                id INTEGER PRIMARY KEY,
+                atajado_id INTEGER,
+                item_id INTEGER,
+                date TEXT,
+                quantity REAL,
+                start_date TEXT,
+                end_date TEXT
+            )
+            """
+        )
+
+        # Tabla de cronograma (hitos)
+        c.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cronograma (
+                id INTEGER PRIMARY KEY,
+                hito TEXT NOT NULL,
+                date TEXT NOT NULL,
+                obs TEXT
+            )
+            """
+        )
+
+        self._init_change_tracking(c)
+        self._init_progress_triggers(c)
+        if backfill:
+            for sql in (REFRESH_PROGRESS_SQL, REFRESH_STATUS_SQL):
+                c.execute(sql.format(where="1"))
+
+    def _migrate_v2(self, c) -> None:
+        """Integer day numbers next to the TEXT dates, kept by triggers."""
+        columns = {
+            "avances": {"day": "date", "start_day": "start_date", "end_day": "end_date"},
+            "atajados": {"start_day": "start_date", "end_day": "end_date"},
+            "cronograma": {"day": "date"},
+        }
+        for tbl, days in columns.items():
+            for day in days:
+                c.execute(f"ALTER TABLE {tbl} ADD COLUMN {day} INTEGER")
+            c.execute(f"UPDATE {tbl} SET " + ", ".join(
+                f"{day}={DAY_SQL.format(text)}" for day, text in days.items()))
+            assign = ", ".join(f"{day}={DAY_SQL.format('NEW.' + text)}" for day, text in days.items())
+            for name, event in (("ins", "INSERT"), ("upd", f"UPDATE OF {', '.join(days.values())}")):
+                c.execute(
+                    f"""
+                    CREATE TRIGGER day_{tbl}_{name} AFTER {event} ON {tbl} BEGIN
+                        UPDATE {tbl} SET {assign} WHERE rowid=NEW.rowid;
+                    END
+                    """
                 )
+
+    def _migrate_v3(self, c) -> None:
+        """Indexes for the lookups every screen and trigger performs."""
+        c.execute("CREATE INDEX IF NOT EXISTS idx_avances_atajado_item ON avances(atajado_id, item_id)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_avances_item ON avances(item_id)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_avances_day ON avances(day)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_atajados_number ON atajados(number)")
+
+    def _migrate_v4(self, c) -> None:
+        """Referential integrity between avances and atajados.
+
+        ``avances.atajado_id`` holds the atajado *number*, which is not a
+        unique key, so a declared foreign key would need a table rebuild and
+        would reject existing data. Triggers give the same guarantees: new
+        avances must point to an existing atajado, and deleting or
+        renumbering the last atajado with a number cascades to its avances.
+        """
+        missing = "NOT EXISTS (SELECT 1 FROM atajados WHERE number=NEW.atajado_id)"
+        for event in ("INSERT", "UPDATE OF atajado_id"):
+            name = "fk_avances_" + event.split()[0].lower()
+            c.execute(
+                f"""
+                CREATE TRIGGER {name} BEFORE {event} ON avances WHEN {missing} BEGIN
+                    SELECT RAISE(ABORT, 'El atajado del avance no existe');
+                END
                 """
             )
+        last = "NOT EXISTS (SELECT 1 FROM atajados WHERE number=OLD.number)"
+        c.execute(
+            f"""
+            CREATE TRIGGER fk_atajados_del AFTER DELETE ON atajados WHEN {last} BEGIN
+                DELETE FROM avances WHERE atajado_id=OLD.number;
+            END
+            """
+        )
+        c.execute(
+            f"""
+            CREATE TRIGGER fk_atajados_num AFTER UPDATE OF number ON atajados
+            WHEN OLD.number IS NOT NEW.number AND {last} BEGIN
+                UPDATE avances SET atajado_id=NEW.number WHERE atajado_id=OLD.number;
+            END
+            """
+        )
+
+    def _migrate_v5(self, c) -> None:
+        """Case-insensitive indexes for prefix searches of atajados."""
+        c.execute("CREATE INDEX IF NOT EXISTS idx_atajados_beneficiario "
+                  "ON atajados(beneficiario COLLATE NOCASE)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_atajados_comunidad "
+                  "ON atajados(comunidad COLLATE NOCASE)")
+
+    def _migrate_v6(self, c) -> None:
+        """Per-table change counters, so other instances know what to reload."""
+        c.execute(
+            "CREATE TABLE table_versions (tbl TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)"
+        )
+        for tbl in WATCHED_TABLES:
+            c.execute("INSERT INTO table_versions(tbl) VALUES(?)", (tbl,))
+            bump = f"UPDATE table_versions SET version=version+1 WHERE tbl='{tbl}';"
+            for name, event in (("ins", "INSERT"), ("upd", "UPDATE"), ("del", "DELETE")):
+                c.execute(f"CREATE TRIGGER ver_{tbl}_{name} AFTER {event} ON {tbl} BEGIN {bump} END")
 
-            # Compatibilidad hacia atrás para columna 'progress'
-            cols = [r[1] for r in c.execute("PRAGMA table_info(items)")]
-            if "progress" not in cols:
-                c.execute("ALTER TABLE items ADD COLUMN progress REAL DEFAULT 0")
+    def _migrate_v7(self, c) -> None:
+        """Row versions for optimistic concurrency between instances.
 
-            # Tabla de atajados
+        Writers that know the version they read update with
+        ``... , row_version=row_version+1 WHERE id=? AND row_version=?``; any
+        other change to a user-edited column bumps it through a trigger.
+        """
+        for tbl, cols in VERSIONED_COLUMNS.items():
+            c.execute(f"ALTER TABLE {tbl} ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0")
             c.execute(
-                """
-                CREATE TABLE IF NOT EXISTS atajados (
-                    id INTEGER PRIMARY KEY,
-                    number INTEGER,
-                    comunidad TEXT,
-                    beneficiario TEXT,
-                    ci TEXT,
-                    coord_e REAL,
-                    coord_n REAL,
-                    start_date TEXT,
-                    end_date TEXT,
-                    status TEXT,
-                    observations TEXT,
-                    photo TEXT
-                )
+                f"""
+                CREATE TRIGGER rv_{tbl} AFTER UPDATE OF {', '.join(cols)} ON {tbl}
+                WHEN NEW.row_version = OLD.row_version BEGIN
+                    UPDATE {tbl} SET row_version = OLD.row_version + 1 WHERE rowid = NEW.rowid;
+                END
                 """
             )
 
-            # Tabla de avances
+    def _migrate_v8(self, c) -> None:
+        """Dated progress history of every (atajado, item) pair, for forecasts.
+
+        One row per pair and day with the percentage saved that day. Existing
+        avances seed it with their start date at 0% and their last value.
+        """
+        c.execute(
+            """
+            CREATE TABLE avance_history (
+                atajado_id INTEGER NOT NULL,
+                item_id INTEGER NOT NULL,
+                day INTEGER NOT NULL,
+                quantity REAL,
+                PRIMARY KEY (atajado_id, item_id, day)
+            ) WITHOUT ROWID
+            """
+        )
+        c.execute(
+            """
+            INSERT OR REPLACE INTO avance_history
+            SELECT atajado_id, item_id, start_day, 0 FROM avances
+            WHERE start_day < day AND atajado_id IS NOT NULL AND item_id IS NOT NULL
+            """
+        )
+        c.execute(
+            """
+            INSERT OR REPLACE INTO avance_history
+            SELECT atajado_id, item_id, day, quantity FROM avances
+            WHERE day IS NOT NULL AND atajado_id IS NOT NULL AND item_id IS NOT NULL
+            """
+        )
+        log = f"""
+            INSERT OR REPLACE INTO avance_history
+            SELECT NEW.atajado_id, NEW.item_id, {DAY_SQL.format('NEW.date')}, NEW.quantity
+            WHERE {DAY_SQL.format('NEW.date')} IS NOT NULL;
+        """
+        c.execute(f"CREATE TRIGGER hist_avances_ins AFTER INSERT ON avances BEGIN {log} END")
+        c.execute(
+            f"CREATE TRIGGER hist_avances_upd AFTER UPDATE OF quantity, date ON avances BEGIN {log} END"
+        )
+        c.execute(
+            """
+            CREATE TRIGGER hist_avances_key AFTER UPDATE OF atajado_id, item_id ON avances BEGIN
+                UPDATE OR REPLACE avance_history SET atajado_id=NEW.atajado_id, item_id=NEW.item_id
+                WHERE atajado_id=OLD.atajado_id AND item_id=OLD.item_id;
+            END
+            """
+        )
+        c.execute(
+            """
+            CREATE TRIGGER hist_avances_del AFTER DELETE ON avances BEGIN
+                DELETE FROM avance_history
+                WHERE atajado_id=OLD.atajado_id AND item_id=OLD.item_id;
+            END
+            """
+        )
+
+    def _migrate_v9(self, c) -> None:
+        """Planned durations and finish-to-start dependencies between items."""
+        c.execute("ALTER TABLE items ADD COLUMN duration INTEGER")
+        c.execute(
+            """
+            CREATE TABLE item_dependencies (
+                item_id INTEGER NOT NULL,
+                pred_id INTEGER NOT NULL,
+                PRIMARY KEY (item_id, pred_id)
+            ) WITHOUT ROWID
+            """
+        )
+        c.execute(
+            """
+            CREATE TRIGGER dep_items_del AFTER DELETE ON items BEGIN
+                DELETE FROM item_dependencies WHERE item_id=OLD.id OR pred_id=OLD.id;
+            END
+            """
+        )
+
+    def _migrate_v10(self, c) -> None:
+        """Community × item rollup of avances, maintained by triggers.
+
+        Each row keeps additive counters (avances, sum of percentages,
+        finished and started); costs are derived when reading. Saving an
+        avance applies its delta to one row. Changes to an atajado's number or
+        community rebuild only the communities involved. An avance belongs to
+        the community of the first atajado with its number.
+        """
+        c.execute(
+            """
+            CREATE VIEW atajado_comunidad AS
+            SELECT number, COALESCE(comunidad, '') AS comunidad, status FROM atajados t
+            WHERE number IS NOT NULL
+              AND rowid = (SELECT MIN(rowid) FROM atajados WHERE number = t.number)
+            """
+        )
+        c.execute(
+            """
+            CREATE TABLE rollup_comunidad_item (
+                comunidad TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                avances INTEGER NOT NULL DEFAULT 0,
+                pct_sum REAL NOT NULL DEFAULT 0,
+                done INTEGER NOT NULL DEFAULT 0,
+                started INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (comunidad, item_id)
+            ) WITHOUT ROWID
+            """
+        )
+        c.execute(ROLLUP_FILL_SQL.format(where="1"))
+
+        def delta(row, sign):
+            com = f"(SELECT comunidad FROM atajado_comunidad WHERE number = {row}.atajado_id)"
+            q = f"COALESCE({row}.quantity, 0)"
+            return f"""
+                INSERT INTO rollup_comunidad_item(comunidad, item_id, avances, pct_sum, done, started)
+                SELECT {com}, {row}.item_id, {sign}1, {sign}{q}, {sign}({q} >= 100),
+                       {sign}({q} > 0 AND {q} < 100)
+                WHERE {com} IS NOT NULL AND {row}.item_id IS NOT NULL
+                ON CONFLICT(comunidad, item_id) DO UPDATE SET
+                    avances = avances + excluded.avances,
+                    pct_sum = pct_sum + excluded.pct_sum,
+                    done = done + excluded.done,
+                    started = started + excluded.started;
+            """
+        c.execute(f"CREATE TRIGGER rup_avances_ins AFTER INSERT ON avances BEGIN {delta('NEW', '+')} END")
+        c.execute(f"CREATE TRIGGER rup_avances_del AFTER DELETE ON avances BEGIN {delta('OLD', '-')} END")
+        c.execute(
+            f"""
+            CREATE TRIGGER rup_avances_upd AFTER UPDATE OF atajado_id, item_id, quantity ON avances
+            BEGIN {delta('OLD', '-')} {delta('NEW', '+')} END
+            """
+        )
+
+        def rebuild(*rows):
+            # Comunidades de la fila y de los atajados que comparten su número:
+            # el dueño de un número repetido puede cambiar
+            numbers = ", ".join(f"{r}.number" for r in rows)
+            coms = " UNION ".join(f"SELECT COALESCE({r}.comunidad, '')" for r in rows)
+            affected = (f"(SELECT COALESCE(comunidad, '') FROM atajados WHERE number IN ({numbers})"
+                        f" UNION {coms})")
+            return (f"DELETE FROM rollup_comunidad_item WHERE comunidad IN {affected};"
+                    + ROLLUP_FILL_SQL.format(where=f"m.comunidad IN {affected}") + ";")
+        c.execute(
+            f"""
+            CREATE TRIGGER rup_atajados_ins AFTER INSERT ON atajados
+            WHEN EXISTS (SELECT 1 FROM avances WHERE atajado_id = NEW.number) BEGIN
+                {rebuild('NEW')}
+            END
+            """
+        )
+        c.execute(f"CREATE TRIGGER rup_atajados_del AFTER DELETE ON atajados BEGIN {rebuild('OLD')} END")
+        c.execute(
+            f"""
+            CREATE TRIGGER rup_atajados_upd AFTER UPDATE OF number, comunidad ON atajados
+            WHEN OLD.number IS NOT NEW.number OR OLD.comunidad IS NOT NEW.comunidad BEGIN
+                {rebuild('OLD', 'NEW')}
+            END
+            """
+        )
+
+    def _migrate_v11(self, c) -> None:
+        """Cached date of each atajado's last avance and indexes to sort by it."""
+        c.execute("ALTER TABLE atajados ADD COLUMN last_date TEXT")
+        c.execute(LAST_DATE_SQL.format(where="1"))
+        triggers = {
+            "lst_avances_ins": ("AFTER INSERT ON avances", "number = NEW.atajado_id"),
+            "lst_avances_upd": ("AFTER UPDATE OF atajado_id, date ON avances",
+                                "number IN (OLD.atajado_id, NEW.atajado_id)"),
+            "lst_avances_del": ("AFTER DELETE ON avances", "number = OLD.atajado_id"),
+            "lst_atajados_ins": ("AFTER INSERT ON atajados", "rowid = NEW.rowid"),
+            "lst_atajados_num": ("AFTER UPDATE OF number ON atajados", "rowid = NEW.rowid"),
+        }
+        for name, (event, where) in triggers.items():
+            c.execute(f"CREATE TRIGGER {name} {event} BEGIN {LAST_DATE_SQL.format(where=where)}; END")
+        c.execute("CREATE INDEX idx_atajados_last_date ON atajados(last_date)")
+        c.execute("CREATE INDEX idx_atajados_progress ON atajados(progress)")
+
+    def _migrate_v12(self, c) -> None:
+        """Let bulk writes skip the per-avance progress refresh (``app_state.deferred``)."""
+        triggers = {
+            "prg_avances_ins": ("AFTER INSERT ON avances", "number=NEW.atajado_id"),
+            "prg_avances_upd": ("AFTER UPDATE OF atajado_id, item_id, quantity ON avances",
+                                "number IN (NEW.atajado_id, OLD.atajado_id)"),
+            "prg_avances_del": ("AFTER DELETE ON avances", "number=OLD.atajado_id"),
+        }
+        for name, (event, where) in triggers.items():
+            c.execute(f"DROP TRIGGER IF EXISTS {name}")
+            c.execute(f"CREATE TRIGGER {name} {event} WHEN {NOT_DEFERRED} "
+                      f"BEGIN {self._refresh_body(where)} END")
+
+    def _migrate_v13(self, c) -> None:
+        """Results of cached aggregate queries kept between sessions."""
+        c.execute(
+            """
+            CREATE TABLE query_cache (
+                name TEXT NOT NULL,
+                params TEXT NOT NULL,
+                versions TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (name, params)
+            ) WITHOUT ROWID
+            """
+        )
+
+    # Índice i = migración a la versión i+1; solo se agregan al final
+    MIGRATIONS = (_migrate_v1, _migrate_v2, _migrate_v3, _migrate_v4, _migrate_v5,
+                  _migrate_v6, _migrate_v7, _migrate_v8, _migrate_v9, _migrate_v10,
+                  _migrate_v11, _migrate_v12, _migrate_v13)
+
+    def _init_progress_triggers(self, c) -> None:
+        """Keep ``atajados.progress`` and ``atajados.status`` up to date.
+
+        Changes to avances refresh only the atajado they belong to; changes
+        to an item's cost or active flag refresh only the atajados that have
+        avances on that item.
+        """
+        refresh = self._refresh_body
+        by_item = "number IN (SELECT atajado_id FROM avances WHERE item_id={}.id)"
+        triggers = {
+            "prg_avances_ins": ("AFTER INSERT ON avances", refresh("number=NEW.atajado_id")),
+            "prg_avances_upd": (
+                "AFTER UPDATE OF atajado_id, item_id, quantity ON avances",
+                refresh("number IN (NEW.atajado_id, OLD.atajado_id)"),
+            ),
+            "prg_avances_del": ("AFTER DELETE ON avances", refresh("number=OLD.atajado_id")),
+            "prg_items_upd": (
+                "AFTER UPDATE OF total, incidence, active ON items",
+                refresh(by_item.format("NEW")),
+            ),
+            "prg_items_del": ("AFTER DELETE ON items", refresh(by_item.format("OLD"))),
+            "prg_atajados_ins": ("AFTER INSERT ON atajados", refresh("rowid=NEW.rowid")),
+            "prg_atajados_num": (
+                "AFTER UPDATE OF number ON atajados", refresh("rowid=NEW.rowid")
+            ),
+        }
+        for name, (event, body) in triggers.items():
+            c.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+
+    @staticmethod
+    def _refresh_body(where: str) -> str:
+        """Trigger body refreshing progress and status of the atajados in *where*."""
+        return "".join(
+            sql.format(where=where).strip() + ";\n"
+            for sql in (REFRESH_PROGRESS_SQL, REFRESH_STATUS_SQL)
+        )
+
+    def _init_change_tracking(self, c) -> None:
+        """Create the changelog used by delta synchronisation and its triggers.
+
+        Every insert, update or delete of a synchronised row appends an entry
+        keyed by the row's natural key (``avances``: atajado and item,
+        ``atajados``: number). The entry's ``version`` orders local changes and
+        ``changed_at`` decides conflicts between copies. Triggers are muted
+        while a sync package is being applied (``app_state.applying``).
+        """
+        c.execute(
+            "CREATE TABLE IF NOT EXISTS app_state (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        c.execute(
+            """
+            CREATE TABLE IF NOT EXISTS changelog (
+                version INTEGER PRIMARY KEY AUTOINCREMENT,
+                tbl TEXT NOT NULL,
+                key1,
+                key2,
+                op TEXT NOT NULL,
+                changed_at TEXT NOT NULL,
+                origin TEXT
+            )
+            """
+        )
+        c.execute(
+            "CREATE INDEX IF NOT EXISTS idx_changelog_key ON changelog(tbl, key1, key2)"
+        )
+        c.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sync_peers (
+                peer TEXT PRIMARY KEY,
+                last_sent INTEGER DEFAULT 0,
+                last_received INTEGER DEFAULT 0
+            )
+            """
+        )
+
+        now = "strftime('%Y-%m-%dT%H:%M:%fZ','now')"
+        muted = "(SELECT value FROM app_state WHERE key='applying') IS NULL"
+        keys = {"avances": ("atajado_id", "item_id"), "atajados": ("number", None)}
+        for tbl, (k1, k2) in keys.items():
+            new_k2 = f"NEW.{k2}" if k2 else "NULL"
+            old_k2 = f"OLD.{k2}" if k2 else "NULL"
+            key_changed = f"OLD.{k1} IS NOT NEW.{k1}" + (
+                f" OR OLD.{k2} IS NOT NEW.{k2}" if k2 else ""
+            )
+            log = "INSERT INTO changelog(tbl, key1, key2, op, changed_at)"
             c.execute(
-                """
-                CREATE TABLE IF NOT EXISTS avances (
-                    id INTEGER PRIMARY KEY,
-                    atajado_id INTEGER,
-                    item_id INTEGER,
-                    date TEXT,
-                    quantity REAL,
-                    start_date TEXT,
-                    end_date TEXT
-                )
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trk_{tbl}_ins AFTER INSERT ON {tbl}
+                WHEN {muted} BEGIN
+                    {log} VALUES('{tbl}', NEW.{k1}, {new_k2}, 'U', {now});
+                END
                 """
             )
-
-            # Tabla de cronograma (hitos)
             c.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trk_{tbl}_upd
+                AFTER UPDATE OF {", ".join(SYNC_COLUMNS[tbl])} ON {tbl}
+                WHEN {muted} BEGIN
+                    {log} SELECT '{tbl}', OLD.{k1}, {old_k2}, 'D', {now}
+                        WHERE {key_changed};
+                    {log} VALUES('{tbl}', NEW.{k1}, {new_k2}, 'U', {now});
+                END
                 """
-                CREATE TABLE IF NOT EXISTS cronograma (
-                    id INTEGER PRIMARY KEY,
-                    hito TEXT NOT NULL,
-                    date TEXT NOT NULL,
-                    obs TEXT
-                )
+            )
+            c.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trk_{tbl}_del AFTER DELETE ON {tbl}
+                WHEN {muted} BEGIN
+                    {log} VALUES('{tbl}', OLD.{k1}, {old_k2}, 'D', {now});
+                END
                 """
             )
 
-            self.conn.commit()
+    def _init_node_id(self, c) -> None:
+        """Regenerate this copy's identifier if the file moved to another host."""
+        host = socket.gethostname()
+        row = c.execute("SELECT value FROM app_state WHERE key='node_host'").fetchone()
+        if row is None or row[0] != host:
+            c.execute(
+                "INSERT OR REPLACE INTO app_state VALUES('node_id', ?)",
+                (f"{host}-{uuid.uuid4().hex[:12]}",),
+            )
+            c.execute("INSERT OR REPLACE INTO app_state VALUES('node_host', ?)", (host,))
 
+    @traced("db.fetchall", "db", args=lambda self, sql, *a: {"sql": sql[:200]})
     def fetchall(self, sql: str, params: tuple = ()):
         """Return all rows for a query."""
         with closing(self.conn.cursor()) as cur:
             cur.execute(sql, params)
             return cur.fetchall()
 
+    @traced("db.execute", "db", args=lambda self, sql, *a: {"sql": sql[:200]})
     def execute(self, sql: str, params: tuple = ()) -> None:
-        """Execute an SQL statement and commit changes."""
+        """Execute an SQL statement and commit changes.
+
+        Inside :meth:`transaction` the commit is left to the transaction;
+        otherwise a locked database is retried with backoff.
+        """
         with closing(self.conn.cursor()) as cur:
-            cur.execute(sql, params)
-            self.conn.commit()
+            if self._tx_depth:
+                cur.execute(sql, params)
+                return
+
+            def run():
+                try:
+                    cur.execute(sql, params)
+                    self.conn.commit()
+                except sqlite3.OperationalError:
+                    if self.conn.in_transaction:
+                        self.conn.rollback()
+                    raise
+            retry_locked(run)
+
+    @traced("db.executemany", "db", args=lambda self, sql, *a: {"sql": sql[:200]})
+    def executemany(self, sql: str, seq_of_params) -> None:
+        """Execute an SQL statement for every parameter set and commit once."""
+        with self.transaction() as cur:
+            cur.executemany(sql, seq_of_params)
+
+    @contextmanager
+    def transaction(self):
+        """Yield a cursor whose statements are committed together.
+
+        If the block raises, every statement executed inside it is rolled
+        back. Nested calls join the outermost transaction. The outermost one
+        takes the write lock up front (``BEGIN IMMEDIATE``), retrying while
+        another instance holds it, so reads inside the block cannot go stale
+        before the writes.
+        """
+        with closing(self.conn.cursor()) as cur, span("db.transaction", "db"):
+            if not self._tx_depth and not self.conn.in_transaction:
+                retry_locked(cur.execute, "BEGIN IMMEDIATE")
+            self._tx_depth += 1
+            try:
+                yield cur
+            except BaseException:
+                if self._tx_depth == 1:
+                    self.conn.rollback()
+                raise
+            else:
+                if self._tx_depth == 1:
+                    retry_locked(self.conn.commit)
+            finally:
+                self._tx_depth -= 1
+
+    def save_as(self, path: str) -> None:
+        """Copy the whole database to *path* using the online backup API."""
+        with closing(sqlite3.connect(path)) as dst:
+            self.conn.backup(dst)
+
+    def data_stamp(self) -> tuple:
+        """Fingerprint that changes after any write, local or external."""
+        return (self.conn.total_changes, self.fetchall("PRAGMA data_version")[0][0])
+
+    def table_versions(self) -> dict:
+        """Return the change counter of every watched table."""
+        return dict(self.fetchall("SELECT tbl, version FROM table_versions"))
+
+    # ------------------------------------------------------ caché de consultas
+    def cached(self, name: str, tables: tuple, compute, params: tuple = (),
+               persist: bool = True):
+        """Return ``compute()``, reusing it while *tables* do not change.
+
+        The result is keyed by *name* and *params* and stamped with the
+        change counters of *tables* (all of them in :data:`WATCHED_TABLES`).
+        Inside a transaction the cache is bypassed: its writes may still be
+        rolled back. With *persist* the value, a plain literal, is also saved
+        by :meth:`save_cache`.
+        """
+        unknown = set(tables) - set(WATCHED_TABLES)
+        if unknown:
+            raise ValueError(f"Tablas sin contador de cambios: {sorted(unknown)}")
+        if self.conn.in_transaction:
+            return compute()
+        try:
+            counters = self.table_versions()
+        except sqlite3.OperationalError:  # base sólo lectura con esquema anterior
+            return compute()
+        key = (name, tuple(params))
+        versions = tuple((t, counters[t]) for t in tables)
+        hit, value = self.cache.get(key, versions)
+        if not hit:
+            value = compute()
+            self.cache.put(key, versions, value, persist)
+        return value
+
+    def _load_cache(self) -> None:
+        """Load the query results saved by the previous session."""
+        try:
+            saved = self.fetchall("SELECT value FROM app_state WHERE key='query_cache_format'")
+            if saved and saved[0][0] == FORMAT_VERSION:
+                self.cache.load(self.fetchall(
+                    "SELECT name, params, versions, value FROM query_cache"))
+        except sqlite3.OperationalError:  # sin tabla (base sólo lectura sin migrar)
+            pass
+
+    @traced(cat="db")
+    def save_cache(self) -> None:
+        """Replace the saved query results with the still-valid cached ones.
+
+        Results computed before the last write of their tables can never be
+        served again and are dropped. A locked database is not waited for:
+        the cache is only an optimisation.
+        """
+        if not self.cache.dirty or self.conn.in_transaction:
+            return
+        valid = self.cache.dump(self.table_versions())
+        try:
+            with closing(self.conn.cursor()) as cur:
+                cur.execute("BEGIN IMMEDIATE")
+                cur.execute("DELETE FROM query_cache")
+                cur.executemany("INSERT INTO query_cache VALUES(?, ?, ?, ?)", valid)
+                cur.execute("INSERT OR REPLACE INTO app_state VALUES('query_cache_format', ?)",
+                            (FORMAT_VERSION,))
+                self.conn.commit()
+        except sqlite3.OperationalError:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            return
+        self.cache.dirty = False
+
+    def node_id(self) -> str:
+        """Return the identifier of this copy of the database."""
+        return self.fetchall("SELECT value FROM app_state WHERE key='node_id'")[0][0]
+
+    def update_status(self, number) -> float:
+        """Recompute an atajado's cached progress and status.
+
+        Triggers normally keep them current; this forces a refresh and
+        returns the progress as a percentage.
+        """
+        with self.transaction() as cur:
+            for sql in (REFRESH_PROGRESS_SQL, REFRESH_STATUS_SQL):
+                cur.execute(sql.format(where="number=?"), (number,))
+        row = self.fetchall("SELECT progress FROM atajados WHERE number=?", (number,))
+        return row[0][0] if row else 0.0
+
+    def record_progress(self, number, item_id, pct, date, start_date=None, end_date=None,
+                        version=ANY_VERSION) -> bool:
+        """Insert or update the avance of one (atajado, item) pair.
 
+        With *version* (the ``row_version`` read earlier, or None if there was
+        no avance) nothing is written when another user changed the avance in
+        the meantime, and False is returned. A loaded progress matrix is
+        updated in place instead of being reloaded.
+        """
+        matrix = self._matrix
+        in_sync = matrix is not None and not matrix.is_stale(self)
+        with self.transaction():
+            rec = self.fetchall(
+                "SELECT id, row_version FROM avances WHERE atajado_id=? AND item_id=?",
+                (number, item_id),
+            )
+            if version is not ANY_VERSION and (rec[0][1] if rec else None) != version:
+                return False
+            if rec:
+                self.execute(
+                    "UPDATE avances SET quantity=?, date=?, start_date=?, end_date=?, "
+                    "row_version=row_version+1 WHERE id=?",
+                    (pct, date, start_date, end_date, rec[0][0]),
+                )
+            else:
+                self.execute(
+                    "INSERT INTO avances(atajado_id,item_id,date,quantity,start_date,end_date) VALUES(?,?,?,?,?,?)",
+                    (number, item_id, date, pct, start_date, end_date),
+                )
+        if in_sync and matrix.set_progress(number, item_id, pct):
+            matrix.stamp = matrix.db_stamp(self)
+        return True
+
+    @traced(cat="db", args=lambda self, entries, *a, **k: {"cells": len(entries)})
+    def record_progress_bulk(self, entries: list, date: str) -> list:
+        """Write many avances in one transaction; return the conflicting ones.
+
+        *entries* are ``(number, item_id, pct, version)`` with the same
+        meaning of *version* as in :meth:`record_progress`. Start and end
+        dates of existing avances are kept. The per-row progress triggers
+        are deferred and every atajado touched is refreshed once at the end.
+        Returns ``[(number, item_id)]`` of the entries skipped because another
+        user changed them.
+        """
+        conflicts, updates, inserts = [], [], []
+        with self.transaction() as cur:
+            cur.execute("INSERT OR REPLACE INTO app_state VALUES('deferred', '1')")
+            numbers = sorted({e[0] for e in entries})
+            stored = {}
+            for num in numbers:
+                for iid, rid, ver in cur.execute(
+                        "SELECT item_id, id, row_version FROM avances WHERE atajado_id=?", (num,)):
+                    stored[num, iid] = (rid, ver)
+            # Una celda repetida queda con su último valor
+            latest = {(num, iid): (pct, version) for num, iid, pct, version in entries}
+            for (num, iid), (pct, version) in latest.items():
+                rid, ver = stored.get((num, iid), (None, None))
+                if version is not ANY_VERSION and ver != version:
+                    conflicts.append((num, iid))
+                elif rid is not None:
+                    updates.append((pct, date, rid))
+                else:
+                    inserts.append((num, iid, date, pct))
+            cur.executemany(
+                "UPDATE avances SET quantity=?, date=?, row_version=row_version+1 WHERE id=?",
+                updates)
+            cur.executemany(
+                "INSERT INTO avances(atajado_id, item_id, date, quantity) VALUES(?,?,?,?)",
+                inserts)
+            cur.execute("DELETE FROM app_state WHERE key='deferred'")
+            for sql in (REFRESH_PROGRESS_SQL, REFRESH_STATUS_SQL):
+                cur.executemany(sql.format(where="number=?"), [(n,) for n in numbers])
+        return conflicts
+
+    def item_dependencies(self) -> dict:
+        """Return ``{item_id: [predecessor ids]}`` for items with predecessors."""
+        deps = {}
+        for item_id, pred_id in self.fetchall(
+                "SELECT item_id, pred_id FROM item_dependencies ORDER BY item_id, pred_id"):
+            deps.setdefault(item_id, []).append(pred_id)
+        return deps
+
+    def set_item_dependencies(self, item_id, pred_ids) -> None:
+        """Replace the predecessors of one item."""
+        with self.transaction() as cur:
+            cur.execute("DELETE FROM item_dependencies WHERE item_id=?", (item_id,))
+            cur.executemany("INSERT OR IGNORE INTO item_dependencies VALUES(?, ?)",
+                            [(item_id, p) for p in pred_ids if p != item_id])
+
+    def progress_matrix(self):
+        """Return the in-memory progress matrix (requires NumPy).
+
+        It is built on first use and rebuilt only after writes that did not go
+        through :meth:`record_progress`, including writes by other processes.
+        """
+        from progress_matrix import ProgressMatrix
+        if self._matrix is None or self._matrix.is_stale(self):
+            self._matrix = ProgressMatrix.load(self)
+        return self._matrix
+
+    def recompute_statuses(self) -> int:
+        """Recompute cached progress and status of every atajado.
+
+        Returns the number of atajados updated.
+        """
+        with self.transaction() as cur:
+            for sql in (REFRESH_PROGRESS_SQL, REFRESH_STATUS_SQL):
+                cur.execute(sql.format(where="1"))
+            return cur.rowcount
+
+    def search_atajados(self, text: str, limit: int = SEARCH_LIMIT) -> list:
+        """Return up to *limit* ``(id, number, beneficiario, comunidad)`` matches.
+
+        Digits match atajado numbers by prefix (``12`` finds 12, 120-129,
+        1200-1299...); any other text matches the start of the beneficiario
+        or the comunidad, ignoring case. Both forms are index range scans.
+        """
+        where, params = self._search_where(text)
+        order = "beneficiario COLLATE NOCASE, number" if where.startswith("beneficiario") else "number"
+        return self.fetchall(
+            f"SELECT id, number, beneficiario, comunidad FROM atajados "
+            f"WHERE {where} ORDER BY {order} LIMIT ?",
+            params + (limit,),
+        )
+
+    @staticmethod
+    def _search_where(text: str) -> tuple:
+        """WHERE clause and parameters of :meth:`search_atajados` for *text*."""
+        text = text.strip()
+        if text.isdecimal() and text.isascii():  # "²" o "①" pasan isdigit() pero no int()
+            p = int(text)
+            ranges = [(p * 10**k, (p + 1) * 10**k)
+                      for k in range(max(NUMBER_DIGITS - len(text), 0) + 1)]
+            where = " OR ".join("(number >= ? AND number < ?)" for _ in ranges)
+            return where, tuple(v for r in ranges for v in r)
+        if text:
+            pattern = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            return ("beneficiario LIKE ? ESCAPE '\\' OR comunidad LIKE ? ESCAPE '\\'",
+                    (pattern, pattern))
+        return "1", ()
+
+    @cached_query("atajados")
+    def status_counts(self) -> dict:
+        """Return how many atajados are in each status, in one query."""
+        total, ejec, en_ejec = self.fetchall(
+            """
+            SELECT COUNT(*), COALESCE(SUM(status='Ejecutado'), 0),
+                   COALESCE(SUM(status='En ejecución'), 0)
+            FROM atajados
+            """
+        )[0]
+        return {"total": total, "ejecutados": ejec, "en_ejecucion": en_ejec,
+                "pendientes": total - ejec - en_ejec}
+
+    def summary_rows(self) -> list:
+        """Return ``(number, beneficiario, last date, progress %)`` per atajado.
+
+        Progress and last date are cached columns kept current by the
+        triggers. Rows are ordered by the date of the last avance, newest
+        first.
+        """
+        return self.summary_page(limit=-1)
+
+    def summary_count(self, text: str = "") -> int:
+        """Number of atajados matching *text* (see :meth:`search_atajados`)."""
+        where, params = self._search_where(text)
+        return self.fetchall(f"SELECT COUNT(*) FROM atajados WHERE {where}", params)[0][0]
+
+    def summary_page(self, text: str = "", sort: int = 2, descending: bool = True,
+                     offset: int = 0, limit: int = SUMMARY_PAGE) -> list:
+        """One page of :meth:`summary_rows`, filtered and sorted in SQL.
+
+        *sort* is a column of the summary (number, beneficiario, last date or
+        progress); every one has an index, so a page costs about the same
+        wherever it is. ``limit=-1`` returns every row.
+        """
+        where, params = self._search_where(text)
+        direction = "DESC" if descending else "ASC"
+        return self.fetchall(
+            f"""
+            SELECT number, beneficiario, COALESCE(last_date, ''), COALESCE(progress, 0)
+            FROM atajados WHERE {where}
+            ORDER BY {SUMMARY_SORT[sort]} {direction}, rowid {direction}
+            LIMIT ? OFFSET ?
+            """,
+            params + (limit, offset),
+        )
+
+    @cached_query("items", "atajados", "avances")
+    def rollup_comunidades(self) -> list:
+        """Return one row per community from the rollup.
+
+        Rows are ``(comunidad, atajados, budget, executed, progress %,
+        ejecutados, en_ejecucion, pendientes)``. Each atajado carries an equal
+        share of every active item's cost, as in the Seguimiento tab.
+        """
+        rows = self.fetchall(
+            """
+            WITH com AS (
+                SELECT comunidad, COUNT(*) AS n, SUM(status='Ejecutado') AS ej,
+                       SUM(status='En ejecución') AS ee
+                FROM atajado_comunidad GROUP BY comunidad),
+            exe AS (
+                SELECT r.comunidad, SUM(i.total*i.incidence*r.pct_sum) / 100.0 AS e
+                FROM rollup_comunidad_item r JOIN items i ON i.id = r.item_id
+                WHERE i.active = 1 GROUP BY r.comunidad)
+            SELECT com.comunidad, com.n, COALESCE(com.ej, 0), COALESCE(com.ee, 0),
+                   COALESCE(exe.e, 0),
+                   (SELECT COALESCE(SUM(total*incidence), 0) FROM items WHERE active = 1)
+            FROM com LEFT JOIN exe USING (comunidad)
+            ORDER BY com.comunidad
+            """
+        )
+        total = sum(r[1] for r in rows) or 1
+        result = []
+        for com, n, ej, ee, executed, cost in rows:
+            budget = cost * n / total
+            executed /= total
+            result.append((com, n, budget, executed, executed / budget * 100 if budget else 0.0,
+                           ej, ee, n - ej - ee))
+        return result
+
+    @cached_query("items", "atajados", "avances")
+    def item_spans(self, comunidad: str = None) -> list:
+        """``(item_id, name, first date, last date)`` of the items with avances.
+
+        With *comunidad*, only the avances of that community's atajados count.
+        """
+        where, params = "", ()
+        if comunidad is not None:
+            where = ("WHERE a.atajado_id IN "
+                     "(SELECT number FROM atajados WHERE COALESCE(comunidad, '')=?)")
+            params = (comunidad,)
+        return self.fetchall(
+            f"""
+            SELECT i.id, i.name, MIN(a.date), MAX(a.date)
+            FROM items i JOIN avances a ON a.item_id = i.id
+            {where}
+            GROUP BY i.id, i.name
+            ORDER BY i.id
+            """,
+            params,
+        )
+
+    def rollup_items(self, comunidad: str) -> list:
+        """Drill-down of one community: one row per active item.
+
+        Rows are ``(item_id, name, budget, executed, average %, ejecutados,
+        en_ejecucion, pendientes)`` counting atajados by that item's avance.
+        """
+        total = self.fetchall("SELECT COUNT(*) FROM atajado_comunidad")[0][0] or 1
+        n = self.fetchall(
+            "SELECT COUNT(*) FROM atajado_comunidad WHERE comunidad=?", (comunidad,))[0][0]
+        rows = self.fetchall(
+            """
+            SELECT i.id, i.name, COALESCE(i.total*i.incidence, 0),
+                   COALESCE(r.pct_sum, 0), COALESCE(r.done, 0), COALESCE(r.started, 0)
+            FROM items i
+            LEFT JOIN rollup_comunidad_item r ON r.item_id = i.id AND r.comunidad = ?
+            WHERE i.active = 1
+            ORDER BY i.id
+            """,
+            (comunidad,),
+        )
+        return [(iid, name, cost * n / total, cost * pct_sum / 100.0 / total,
+                 pct_sum / n if n else 0.0, done, started, n - done - started)
+                for iid, name, cost, pct_sum, done, started in rows]
+
+    def rebuild_rollup(self) -> None:
+        """Recompute the whole community × item rollup from the avances."""
+        with self.transaction() as cur:
+            cur.execute("DELETE FROM rollup_comunidad_item")
+            cur.execute(ROLLUP_FILL_SQL.format(where="1"))
+
+    @cached_query("items", "avances")
     def get_project_progress(self) -> float:
         """Return total project progress weighted by item cost."""
-        rows = self.fetchall(
-            "SELECT id, total, incidence, active, progress FROM items"
-        )
-        if not rows:
-            return 0.0
-
-        total_cost = 0.0
-        executed = 0.0
-        for iid, qty, pu, active, prog in rows:
-            cost = qty * pu
-            total_cost += cost
-            if active:
-                pct = self.fetchall(
-                    "SELECT AVG(quantity) FROM avances WHERE item_id=?", (iid,)
-                )[0][0]
-                pct = pct or 0.0
-            else:
-                pct = prog or 0.0
-            executed += (pct / 100.0) * cost
+        total_cost, executed = self.fetchall(PROJECT_COST_SQL.format(schema=""))[0]
         return (executed / total_cost * 100.0) if total_cost else 0.0
@@ -0,0 +1,330 @@
+"""Startup and memory profile of the application, saved for comparison.
+
+Reports where startup time and memory go:
+
+* **imports**: ``python -X importtime -c "import app"`` in a fresh process
+  (best of ``--runs``), per module and summed per top-level package, so
+  the cost of pandas, matplotlib, pyqtgraph or PyQt6 is visible at once;
+* **memory**: ``tracemalloc`` snapshots after importing the application,
+  after building :class:`app.MainWindow` and after showing each tab, with
+  the top allocating files and packages of each step and the process RSS
+  (Qt's own C++ allocations show only in the RSS; step times are taken
+  under ``tracemalloc`` and are slower than in normal use);
+* **widgets**: how many widgets each tab owns.
+
+The report is written as JSON (by default ``logs/diagnostics-<fecha>.json``);
+``--compare`` checks it against an earlier report and exits with status 1
+when a build got slower or heavier beyond ``--tolerance``::
+
+    python diagnostics.py                               # 2000 atajados × 60 ítems
+    python diagnostics.py --db obra.db --out antes.json # copia de un trabajo real
+    python diagnostics.py --compare antes.json
+
+Like :mod:`ui_bench`, it runs offscreen inside a temporary directory.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import sysconfig
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LOG_DIR = os.path.join(HERE, "logs")
+TOP = 15
+IMPORT_RUNS = 3
+TOLERANCE = 0.2
+# Diferencias menores no cuentan como regresión aunque superen la tolerancia
+MIN_DELTA = {"ms": 20.0, "mb": 2.0, "widgets": 20}
+# Pasos que cambian menos memoria que esto no se desglosan (cada desglose tarda segundos)
+BREAKDOWN_MIN = 256 * 1024
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+_STDLIB = {os.path.normcase(os.path.realpath(sysconfig.get_paths()[k])) for k in ("stdlib", "platstdlib")}
+
+
+# --------------------------------------------------------------- importaciones
+def parse_importtime(text: str) -> dict:
+    """``{module: (self µs, cumulative µs, depth)}`` from ``-X importtime`` output."""
+    modules = {}
+    for line in text.splitlines():
+        m = _IMPORT_LINE.match(line)
+        if m:
+            modules[m.group(4)] = (int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2)
+    return modules
+
+
+def import_times(module: str = "app", runs: int = IMPORT_RUNS, top: int = TOP) -> dict:
+    """Import *module* in fresh interpreters and summarise the best run per module."""
+    best = {}
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              cwd=HERE, capture_output=True, text=True)
+        if proc.returncode:
+            raise RuntimeError(f"No se pudo importar {module}:\n{proc.stderr[-2000:]}")
+        for name, (own, cum, depth) in parse_importtime(proc.stderr).items():
+            old = best.get(name)
+            best[name] = (min(own, old[0]), min(cum, old[1]), depth) if old else (own, cum, depth)
+    packages = {}
+    for name, (own, _, _) in best.items():
+        pkg = name.split(".")[0]
+        packages[pkg] = packages.get(pkg, 0) + own
+    ranked = sorted(best.items(), key=lambda kv: kv[1][1], reverse=True)
+    return {
+        "total_ms": round(best.get(module, (0, 0))[1] / 1000, 1),
+        "modules": len(best),
+        "packages_ms": {pkg: round(us / 1000, 1) for pkg, us in
+                        sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top * 2]},
+        "slowest": [{"module": name, "self_ms": round(own / 1000, 1),
+                     "cumulative_ms": round(cum / 1000, 1), "depth": depth}
+                    for name, (own, cum, depth) in ranked[:top]],
+    }
+
+
+# ---------------------------------------------------------------------- memoria
+def package_of(filename: str) -> str:
+    """Top-level package (or ``proyecto`` / ``stdlib``) that owns *filename*.
+
+    Code objects of imported modules are allocated by ``importlib`` itself.
+    """
+    if filename.startswith("<frozen importlib"):
+        return "importlib"
+    if filename.startswith("<"):
+        return "stdlib"
+    path = os.path.normcase(os.path.realpath(filename))
+    parts = path.replace("\\", "/").split("/")
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts:
+            rest = parts[parts.index(marker) + 1:]
+            return re.split(r"[.\-]", rest[0])[0]
+    if path.startswith(os.path.normcase(HERE) + os.sep):
+        return "proyecto"
+    if any(path.startswith(root + os.sep) for root in _STDLIB):
+        return "stdlib"
+    return "otros"
+
+
+def current_rss_mb():
+    """Resident memory now, in MB.
+
+    Read from ``/proc`` on Linux and from the process counters on Windows;
+    elsewhere the peak RSS is the best available figure (None if unknown).
+    """
+    from ui_bench import peak_rss_mb, process_memory
+    try:
+        with open("/proc/self/statm") as fh:
+            return round(int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    memory = process_memory()
+    if memory:
+        return round(memory[0] / 2**20, 1)
+    return peak_rss_mb()
+
+
+class MemoryProfile:
+    """Consecutive ``tracemalloc`` snapshots; each step reports what it added."""
+
+    def __init__(self, top: int = TOP):
+        self.top = top
+        self.steps = []
+        self._last = {}  # archivo -> (bytes, bloques) del último desglose
+        self._traced = 0
+
+    @staticmethod
+    def by_file() -> dict:
+        """``{filename: (bytes, blocks)}`` of the live allocations.
+
+        One ``statistics`` pass per step: ``filter_traces`` and
+        ``compare_to`` would walk the hundreds of thousands of traces again.
+        """
+        stats = tracemalloc.take_snapshot().statistics("filename")
+        return {s.traceback[0].filename: (s.size, s.count) for s in stats
+                if s.traceback[0].filename != tracemalloc.__file__}
+
+    def step(self, name: str, seconds: float = None, **extra) -> dict:
+        traced = tracemalloc.get_traced_memory()[0]
+        added, self._traced = traced - self._traced, traced
+        step = {"step": name, "traced_mb": round(traced / 2**20, 2),
+                "added_mb": round(added / 2**20, 2), "rss_mb": current_rss_mb()}
+        if seconds is not None:
+            step["ms"] = round(seconds * 1000, 1)
+        step.update(extra)
+        self.steps.append(step)
+        if self.steps[1:] and abs(added) < BREAKDOWN_MIN:
+            return step
+        files = self.by_file()
+        diff = [(f, size - self._last.get(f, (0, 0))[0], count - self._last.get(f, (0, 0))[1])
+                for f, (size, count) in files.items()]
+        diff += [(f, -size, -count) for f, (size, count) in self._last.items() if f not in files]
+        self._last = files
+        by_package = {}
+        for filename, size, _ in diff:
+            pkg = package_of(filename)
+            by_package[pkg] = by_package.get(pkg, 0) + size
+        diff.sort(key=lambda d: d[1], reverse=True)
+        step["packages_mb"] = {pkg: round(size / 2**20, 2) for pkg, size in
+                               sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)
+                               if abs(size) >= 2**14}
+        step["top"] = [{"file": os.path.relpath(f, HERE) if f.startswith(HERE) else f,
+                        "kb": round(size / 1024, 1), "blocks": count}
+                       for f, size, count in diff[:self.top]]
+        return step
+
+
+def widget_count(widget) -> int:
+    """The widget and all its descendant widgets."""
+    from PyQt6.QtWidgets import QWidget
+    return 1 + len(widget.findChildren(QWidget))
+
+
+def profile_window(db_file: str, top: int = TOP) -> dict:
+    """Boot the main window on *db_file*, show every tab and profile each step."""
+    tracemalloc.start()
+    try:
+        profile = MemoryProfile(top)
+        profile.step("inicio")
+        t0 = time.perf_counter()
+        from PyQt6.QtWidgets import QApplication
+        import app as app_module
+        profile.step("importaciones", time.perf_counter() - t0)
+
+        from ui_bench import answer_dialogs
+        qt = QApplication.instance() or QApplication(sys.argv[:1])
+        answer_dialogs()
+        t0 = time.perf_counter()
+        w = app_module.MainWindow(db_file)
+        w.show()
+        qt.processEvents()
+        profile.step("ventana", time.perf_counter() - t0, widgets=widget_count(w))
+
+        tabs = {}
+        for i in range(w.tabs.count()):
+            name = w.tabs.tabText(i)
+            t0 = time.perf_counter()
+            w.tabs.setCurrentIndex(i)
+            qt.processEvents()
+            widgets = widget_count(w.tabs.widget(i))
+            tabs[name] = widgets
+            profile.step(f"pestaña {name}", time.perf_counter() - t0, widgets=widgets)
+        total = len(qt.allWidgets())
+        w.close()
+        qt.processEvents()
+        return {"steps": profile.steps, "widgets": {"total": total, "tabs": tabs}}
+    finally:
+        tracemalloc.stop()
+
+
+# ---------------------------------------------------------------------- informe
+def run(db_file: str = None, atajados: int = 2000, items: int = 60,
+        runs: int = IMPORT_RUNS, top: int = TOP) -> dict:
+    """Full report: import times, then memory and widgets of a window."""
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "imports": import_times("app", runs, top),
+    }
+    cwd = os.getcwd()
+    tmp = tempfile.TemporaryDirectory()
+    os.chdir(tmp.name)
+    try:
+        target = os.path.join(tmp.name, "diagnostico.db")
+        if db_file:
+            shutil.copyfile(os.path.join(cwd, db_file), target)
+            report["data"] = {"db": os.path.basename(db_file)}
+        else:
+            from ui_bench import generate_database
+            generate_database(target, atajados, items)
+            report["data"] = {"atajados": atajados, "items": items}
+        report.update(profile_window(target, top))
+    finally:
+        os.chdir(cwd)
+        tmp.cleanup()
+    from ui_bench import peak_rss_mb
+    report["max_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def _regression(label, old, new, unit, tolerance) -> str:
+    if old is None or new is None:
+        return None
+    if new - old > MIN_DELTA[unit] and new > old * (1 + tolerance):
+        return f"{label}: {old} → {new} {unit}"
+    return None
+
+
+def compare(old: dict, new: dict, tolerance: float = TOLERANCE) -> list:
+    """Messages for every import time, memory step or widget count that grew."""
+    checks = [("importación total", old["imports"]["total_ms"], new["imports"]["total_ms"], "ms")]
+    old_pkgs = old["imports"]["packages_ms"]
+    for pkg, ms in new["imports"]["packages_ms"].items():
+        checks.append((f"importación de {pkg}", old_pkgs.get(pkg, 0.0), ms, "ms"))
+    old_steps = {s["step"]: s for s in old.get("steps", [])}
+    for step in new.get("steps", []):
+        before = old_steps.get(step["step"], {})
+        checks.append((f"{step['step']} (tracemalloc)", before.get("added_mb"), step["added_mb"], "mb"))
+        checks.append((f"{step['step']} (tiempo)", before.get("ms"), step.get("ms"), "ms"))
+    old_tabs = old.get("widgets", {}).get("tabs", {})
+    for name, count in new.get("widgets", {}).get("tabs", {}).items():
+        checks.append((f"widgets de {name}", old_tabs.get(name), count, "widgets"))
+    return [msg for msg in (_regression(*c, tolerance) for c in checks) if msg]
+
+
+def print_report(report: dict) -> None:
+    imp = report["imports"]
+    print(f"Importar app: {imp['total_ms']} ms ({imp['modules']} módulos)")
+    for pkg, ms in list(imp["packages_ms"].items())[:10]:
+        print(f"  {pkg:24s} {ms:8.1f} ms")
+    print("Memoria por paso (tracemalloc añadido / RSS):")
+    for step in report["steps"]:
+        pkgs = ", ".join(f"{p} {mb}" for p, mb in list(step.get("packages_mb", {}).items())[:3])
+        widgets = f"  {step['widgets']} widgets" if "widgets" in step else ""
+        print(f"  {step['step']:28s} {step['added_mb']:7.2f} MB  RSS {step['rss_mb'] or 0:7.1f} MB"
+              f"{widgets}  [{pkgs}]")
+    print(f"Widgets en total: {report['widgets']['total']}; RSS máximo: {report['max_rss_mb'] or '—'} MB")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Perfil de importación, memoria y widgets de la aplicación.")
+    parser.add_argument("--db", help="trabajo a medir (se usa una copia); por defecto uno generado")
+    parser.add_argument("--atajados", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=60)
+    parser.add_argument("--runs", type=int, default=IMPORT_RUNS, help="repeticiones de la importación")
+    parser.add_argument("--top", type=int, default=TOP, help="asignadores por paso")
+    parser.add_argument("--out", help="archivo JSON (por defecto, logs/diagnostics-<fecha>.json)")
+    parser.add_argument("--compare", help="informe anterior con el que comparar")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="aumento relativo permitido antes de marcar regresión")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, HERE)
+    report = run(args.db, args.atajados, args.items, args.runs, args.top)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            report["regressions"] = compare(json.load(fh), report, args.tolerance)
+    out = args.out or os.path.join(
+        LOG_DIR, f"diagnostics-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2, ensure_ascii=False)
+
+    print_report(report)
+    for msg in report.get("regressions", []):
+        print("REGRESIÓN:", msg)
+    print(f"Informe guardado en {out}")
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
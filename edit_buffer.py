@@ -0,0 +1,175 @@
+"""Write-behind buffer for inline table edits.
+
+Cell edits are journaled and coalesced per row; :meth:`EditBuffer.flush`
+writes every pending row in a single transaction. The same journal backs
+undo/redo, so undoing an edit that was already flushed simply stages the
+previous value again.
+
+Rows are written only if their ``row_version`` is still the one the view
+loaded (see :meth:`EditBuffer.set_versions`). When another instance saved
+the row in between, columns it did not touch are merged automatically;
+otherwise the row is kept in :attr:`EditBuffer.conflicts` for the user to
+decide with :meth:`EditBuffer.resolve`.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from database import Database
+
+
+@dataclass
+class Edit:
+    """One cell edit kept in the journal."""
+
+    row_id: int
+    column: str
+    old: object
+    new: object
+
+
+@dataclass
+class Conflict:
+    """A row another user saved after it was loaded here."""
+
+    row_id: int
+    mine: dict              # columna -> valor editado aquí
+    theirs: Optional[dict]  # columna -> valor guardado; None si se eliminó la fila
+    version: Optional[int]  # row_version actual
+
+
+class EditBuffer:
+    """Coalesce cell edits of one table and write them in one transaction."""
+
+    def __init__(self, db: Database, table: str, columns, key: str = "id"):
+        self.db = db
+        self.table = table
+        self.columns = frozenset(columns)
+        self.key = key
+        self.pending = {}  # row_id -> {columna: valor}
+        self.base = {}     # row_id -> {columna: valor en la base al editar}
+        self.versions = {}  # row_id -> row_version conocida
+        self.conflicts = []
+        self._undo = []
+        self._redo = []
+
+    @property
+    def dirty(self) -> bool:
+        """Whether there are edits waiting to be written."""
+        return bool(self.pending)
+
+    def record(self, row_id: int, column: str, old, new) -> None:
+        """Journal an edit and stage the new value for the next flush."""
+        if column not in self.columns:
+            raise KeyError(column)
+        if old == new:
+            return
+        self._undo.append(Edit(row_id, column, old, new))
+        self._redo.clear()
+        self.base.setdefault(row_id, {}).setdefault(column, old)
+        self._stage(row_id, column, new)
+
+    def undo(self) -> Optional[Edit]:
+        """Revert the last edit; return it so the caller can update the view."""
+        if not self._undo:
+            return None
+        edit = self._undo.pop()
+        self._redo.append(edit)
+        self.base.setdefault(edit.row_id, {}).setdefault(edit.column, edit.new)
+        self._stage(edit.row_id, edit.column, edit.old)
+        return edit
+
+    def redo(self) -> Optional[Edit]:
+        """Reapply the last undone edit; return it like :meth:`undo`."""
+        if not self._redo:
+            return None
+        edit = self._redo.pop()
+        self._undo.append(edit)
+        self.base.setdefault(edit.row_id, {}).setdefault(edit.column, edit.old)
+        self._stage(edit.row_id, edit.column, edit.new)
+        return edit
+
+    def discard(self, row_id: int) -> None:
+        """Forget pending values and journal entries of a removed row."""
+        self.pending.pop(row_id, None)
+        self.base.pop(row_id, None)
+        self.versions.pop(row_id, None)
+        self._undo = [e for e in self._undo if e.row_id != row_id]
+        self._redo = [e for e in self._redo if e.row_id != row_id]
+
+    def set_versions(self, versions: dict) -> None:
+        """Remember the ``row_version`` of each row as shown in the view."""
+        self.versions = dict(versions)
+
+    def flush(self) -> int:
+        """Write all pending rows in one transaction and return how many.
+
+        Rows that conflict with another user's changes are not written; they
+        are appended to :attr:`conflicts` and left out of the count.
+        """
+        if not self.pending:
+            return 0
+        count = 0
+        with self.db.transaction() as cur:
+            for row_id, values in self.pending.items():
+                conflict = self._write(cur, row_id, values)
+                if conflict is None:
+                    count += 1
+                else:
+                    self.conflicts.append(conflict)
+        self.pending.clear()
+        self.base.clear()
+        return count
+
+    def resolve(self, conflict: Conflict, values: dict) -> bool:
+        """Write the chosen *values* of a conflicting row over the saved ones.
+
+        An empty dict keeps the saved row as it is. Returns False if the row
+        changed again meanwhile (the caller should reload it).
+        """
+        self.versions[conflict.row_id] = conflict.version
+        if not values or conflict.theirs is None:
+            return True
+        with self.db.transaction() as cur:
+            return self._update(cur, conflict.row_id, values, conflict.version)
+
+    def _write(self, cur, row_id, values) -> Optional[Conflict]:
+        version = self.versions.get(row_id)
+        if self._update(cur, row_id, values, version):
+            return None
+        cols = sorted(values)
+        row = cur.execute(
+            f"SELECT {', '.join(cols)}, row_version FROM {self.table} WHERE {self.key}=?",
+            (row_id,),
+        ).fetchone()
+        if row is None:
+            return Conflict(row_id, dict(values), None, None)
+        theirs = dict(zip(cols, row[:-1]))
+        base = self.base.get(row_id, {})
+        # Si el otro usuario no tocó estas columnas (o guardó lo mismo), se
+        # combinan sin preguntar
+        if all(theirs[c] in (base.get(c, theirs[c]), values[c]) for c in cols) and \
+                self._update(cur, row_id, values, row[-1]):
+            return None
+        return Conflict(row_id, dict(values), theirs, row[-1])
+
+    def _update(self, cur, row_id, values, version) -> bool:
+        cols = sorted(values)
+        assignments = ", ".join(f"{c}=?" for c in cols)
+        params = [values[c] for c in cols] + [row_id]
+        where = f"{self.key}=?"
+        if version is not None:
+            where += " AND row_version=?"
+            params.append(version)
+        cur.execute(
+            f"UPDATE {self.table} SET {assignments}, row_version=row_version+1 WHERE {where}",
+            params,
+        )
+        if cur.rowcount != 1:
+            return False
+        if version is not None:
+            self.versions[row_id] = version + 1
+        return True
+
+    def _stage(self, row_id: int, column: str, value) -> None:
+        self.pending.setdefault(row_id, {})[column] = value
@@ -0,0 +1,271 @@
+"""Completion-date forecasts from the dated progress history.
+
+Every (atajado, active item) pair with at least two dated points in
+``avance_history`` gets its own progress rate (% per day) from a least-squares
+line. The fit itself runs in SQLite, not in NumPy: :data:`FIT_SQL` aggregates
+the least-squares sums of every pair in one ``GROUP BY``, so only one row per
+pair reaches Python. NumPy then spreads those rows over the atajados × items
+grid and projects every pair at once, without Python loops. Pairs with a single point, no progress or no record at all use the median
+rate of the fitted pairs from today on. Projections further than
+:data:`HORIZON_DAYS` from today (a pair crawling at 0.01 %/day would finish
+decades away) are not credible and count as no forecast. An atajado
+finishes when its last active item does, a community when its last atajado
+does::
+
+    fc = CompletionForecast.load(db)
+    fc.by_atajado()[12]          # datetime.date o None
+    fc.by_comunidad()["Norte"]
+
+Run ``python forecast.py`` for a benchmark on synthetic data; it exits with
+status 1 when loading exceeds :data:`BUDGET_S`.
+"""
+
+import datetime
+import itertools
+import time
+from contextlib import closing
+
+import numpy as np
+
+from database import Database
+from tracing import traced
+
+EPOCH = datetime.date(1970, 1, 1)
+# Ritmo mínimo (%/día) para considerar que un par avanza
+MIN_RATE = 1e-3
+# Más allá de este plazo desde hoy el pronóstico no es creíble: queda sin fecha
+HORIZON_DAYS = 3 * 365
+
+
+def to_day(date: datetime.date) -> int:
+    """Day number (days since 1970-01-01) as stored in the ``*_day`` columns."""
+    return (date - EPOCH).days
+
+
+def to_date(day) -> datetime.date:
+    """Inverse of :func:`to_day`; None for NaN."""
+    if day is None or np.isnan(day):
+        return None
+    return EPOCH + datetime.timedelta(days=int(np.ceil(day)))
+
+
+# Sumas de mínimos cuadrados por par, con el día centrado en ?; con un único
+# MAX() SQLite toma quantity de la fila del último día
+FIT_SQL = """
+    SELECT atajado_id, item_id,
+           COUNT(*) * TOTAL(x * quantity) - SUM(x) * TOTAL(quantity),
+           COUNT(*) * SUM(x * x) - SUM(x) * SUM(x),
+           MAX(day), COALESCE(quantity, 0)
+    FROM (SELECT atajado_id, item_id, day, day - ? AS x, quantity FROM avance_history)
+    GROUP BY atajado_id, item_id
+"""
+# Presupuesto de `python forecast.py` para 10 000 atajados × 20 ítems × 4 puntos
+BUDGET_S = 1.0
+# Pares leídos por bloque de FIT_SQL
+FIT_BLOCK = 4096
+
+
+def fit_rates(db: Database, origin: int, numbers, item_ids) -> tuple:
+    """Fit ``pct = a + rate * day`` for every pair of *numbers* × *item_ids*.
+
+    SQLite aggregates the least-squares sums of each pair recorded in
+    ``avance_history``; its rows are streamed in blocks of
+    :data:`FIT_BLOCK` straight into the pair grids, so the history never
+    becomes Python tuples nor one large array. Days are centred on *origin*
+    to keep x² small. Returns flat ``(rate, last_day, last_pct)`` grids,
+    atajado-major; rate is NaN for pairs with fewer than two days and
+    last_day is NaN for pairs without history.
+    """
+    numbers = np.asarray(numbers)
+    item_ids = np.asarray(item_ids)
+    n_pairs = len(numbers) * len(item_ids)
+    rate = np.full(n_pairs, np.nan)
+    last_day = np.full(n_pairs, np.nan)
+    last_pct = np.zeros(n_pairs)
+    num_order = np.argsort(numbers, kind="stable")
+    item_order = np.argsort(item_ids, kind="stable")
+    with closing(db.conn.cursor()) as cur:
+        cur.execute(FIT_SQL, (origin,))
+        values = itertools.chain.from_iterable(cur)
+        while True:
+            block = np.fromiter(itertools.islice(values, FIT_BLOCK * 6), np.float64)
+            if not len(block):
+                break
+            atajado, item, num, den, day, pct = block.reshape(-1, 6).T
+            rows = _lookup(numbers, num_order, atajado)
+            cols = _lookup(item_ids, item_order, item)
+            keep = (rows >= 0) & (cols >= 0)  # historia de atajados o ítems no pedidos
+            pair = rows[keep] * len(item_ids) + cols[keep]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rate[pair] = np.where(den > 0, num / den, np.nan)[keep]
+            last_day[pair] = day[keep]
+            last_pct[pair] = pct[keep]
+    return rate, last_day, last_pct
+
+
+def project(rate, last_day, last_pct, today: int) -> tuple:
+    """Finish day of each pair; returns ``(finish, rate_used, fallback)``.
+
+    Finished pairs keep their last day; the others advance from their last
+    point at their own rate, or from today at the median rate of the pairs
+    that do progress. Forecasts never fall before today; those beyond
+    :data:`HORIZON_DAYS` from today are NaN. The three input arrays are
+    overwritten: *rate* becomes ``rate_used`` and *last_day* ``finish``.
+    """
+    fitted = rate > MIN_RATE
+    fallback = float(np.median(rate[fitted])) if fitted.any() else np.nan
+    done = last_pct >= 100
+    done_day = last_day[done]
+    # En el lugar: la grilla atajados × ítems es grande y cada copia la duplica
+    used = rate
+    used[~fitted] = fallback
+    finish = last_day
+    np.fmax(finish, today, out=finish, where=~fitted)
+    with np.errstate(invalid="ignore"):
+        remaining = np.subtract(100.0, last_pct, out=last_pct)
+        remaining /= used
+        finish += remaining
+        np.maximum(finish, today, out=finish)
+        finish[finish > today + HORIZON_DAYS] = np.nan
+    finish[done] = done_day
+    return finish, used, fallback
+
+
+class CompletionForecast:
+    """Forecast finish day per (atajado, active item) pair."""
+
+    def __init__(self, numbers, comunidades, item_ids, finish, rate, today: int):
+        self.numbers = list(numbers)
+        self.comunidades = list(comunidades)
+        self.item_ids = list(item_ids)
+        self.finish = finish  # (atajados, ítems) día estimado; NaN si no hay ritmo
+        self.rate = rate
+        self.today = today
+
+    # ------------------------------------------------------------------ cálculo
+    @classmethod
+    def compute(cls, numbers, comunidades, item_ids, rate, last_day, last_pct,
+                today: int) -> "CompletionForecast":
+        """Build the forecast from the pair grids of :func:`fit_rates`.
+
+        The grids are reused for the result (see :func:`project`).
+        """
+        shape = (len(numbers), len(item_ids))
+        finish, used, _ = project(rate, last_day, last_pct, today)
+        return cls(numbers, comunidades, item_ids,
+                   finish.reshape(shape), used.reshape(shape), today)
+
+    @classmethod
+    def load(cls, db: Database, today: datetime.date = None) -> "CompletionForecast":
+        """Forecast the active items of every atajado in *db*.
+
+        The forecast is kept in the database's query cache (in memory only)
+        until the atajados, items or avances change or the day changes, so
+        the tabs refreshed after a save share one computation.
+        """
+        day = to_day(today or datetime.date.today())
+        return db.cached("forecast", ("atajados", "items", "avances"),
+                         lambda: cls._load(db, day), (day,), persist=False)
+
+    @classmethod
+    @traced("forecast.load", "db")
+    def _load(cls, db: Database, day: int) -> "CompletionForecast":
+        atajados = db.fetchall(
+            "SELECT number, COALESCE(comunidad, '') FROM atajados "
+            "WHERE number IS NOT NULL GROUP BY number ORDER BY MIN(rowid)"
+        )
+        numbers = [r[0] for r in atajados]
+        items = [r[0] for r in db.fetchall("SELECT id FROM items WHERE active=1 ORDER BY id")]
+        return cls.compute(numbers, [r[1] for r in atajados], items,
+                           *fit_rates(db, day, numbers, items), day)
+
+    # ---------------------------------------------------------------- consultas
+    def atajado_days(self) -> np.ndarray:
+        """Finish day of each atajado: the latest of its items (NaN if unknown)."""
+        if not self.item_ids:
+            return np.full(len(self.numbers), np.nan)
+        return self.finish.max(axis=1)
+
+    def by_atajado(self) -> dict:
+        """``{number: date or None}``."""
+        return {n: to_date(d) for n, d in zip(self.numbers, self.atajado_days())}
+
+    def by_comunidad(self) -> dict:
+        """``{comunidad: date or None}``: when its last atajado finishes."""
+        names, codes = np.unique(np.asarray(self.comunidades, dtype=object).astype(str),
+                                 return_inverse=True)
+        days = np.full(len(names), -np.inf)
+        with np.errstate(invalid="ignore"):
+            np.maximum.at(days, codes, self.atajado_days())  # NaN se propaga: sin pronóstico
+        return {com: to_date(d) for com, d in zip(names, days)}
+
+    def by_item(self, comunidad: str = None) -> dict:
+        """``{item_id: date or None}`` over all atajados or one community's."""
+        finish = self.finish
+        if comunidad is not None:
+            finish = finish[np.asarray(self.comunidades, dtype=object) == comunidad]
+        if not len(finish):
+            return {}
+        return {iid: to_date(d) for iid, d in zip(self.item_ids, finish.max(axis=0))}
+
+
+def _lookup(keys: np.ndarray, order: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Index of each value in *keys* (sorted by *order*), or -1 if absent."""
+    if not len(keys):
+        return np.full(len(values), -1)
+    pos = np.searchsorted(keys, values, sorter=order).clip(0, len(keys) - 1)
+    idx = order[pos]
+    return np.where(keys[idx] == values, idx, -1)
+
+
+# -------------------------------------------------------------------- benchmark
+def synthetic_database(db: Database, atajados: int, items: int, points: int,
+                       seed: int = 1) -> None:
+    """Fill *db* with random linear-ish progress histories for :func:`benchmark`."""
+    rng = np.random.default_rng(seed)
+    n = atajados * items * points
+    h_atajado = np.repeat(np.arange(atajados), items * points)
+    h_item = np.tile(np.repeat(np.arange(1, items + 1), points), atajados)
+    start = np.repeat(rng.integers(19000, 19300, atajados * items), points)
+    step = np.tile(np.arange(points), atajados * items) * 15
+    rate = np.repeat(rng.uniform(0.1, 2.0, atajados * items), points)
+    pct = np.clip(step * rate + rng.normal(0, 2, n), 0, 100)
+    with db.transaction() as cur:
+        cur.executemany("INSERT INTO items(id, name, total, incidence, active) VALUES(?,?,1,1,1)",
+                        [(i, "Ítem %d" % i) for i in range(1, items + 1)])
+        cur.executemany("INSERT INTO atajados(number, comunidad) VALUES(?,?)",
+                        [(a, "c%d" % (a % 50)) for a in range(atajados)])
+        cur.executemany("INSERT INTO avance_history VALUES(?,?,?,?)",
+                        zip(h_atajado.tolist(), h_item.tolist(), (start + step).tolist(),
+                            pct.tolist()))
+
+
+def benchmark(atajados: int = 10_000, items: int = 20, points: int = 4) -> float:
+    """Seconds needed to load the forecast of *atajados* × *items* pairs."""
+    db = Database(":memory:")
+    try:
+        synthetic_database(db, atajados, items, points)
+        t0 = time.perf_counter()
+        fc = CompletionForecast.load(db, today=EPOCH + datetime.timedelta(days=19400))
+        fc.by_comunidad()
+        return time.perf_counter() - t0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark del pronóstico de fin de obra.")
+    parser.add_argument("--atajados", type=int, default=10_000)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--points", type=int, default=4)
+    a = parser.parse_args()
+    secs = benchmark(a.atajados, a.items, a.points)
+    # El presupuesto escala con las filas de historia
+    budget = BUDGET_S * a.atajados * a.items * a.points / 800_000
+    print(f"{a.atajados} atajados × {a.items} ítems × {a.points} puntos: {secs * 1000:.0f} ms "
+          f"(≤ {budget * 1000:.0f} ms)")
+    if secs > budget:
+        print("EXCEDIDO")
+        raise SystemExit(1)
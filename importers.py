@@ -0,0 +1,57 @@
+"""Import items and atajados from Excel/CSV files.
+
+Shared by the Qt tabs and the command line; pandas is imported lazily so
+that importing this module stays cheap.
+"""
+
+from database import Database
+from tracing import traced
+
+
+def read_table(path: str):
+    """Read an Excel or CSV file into a DataFrame."""
+    import pandas as pd
+    if path.lower().endswith(("xls", "xlsx")):
+        return pd.read_excel(path)
+    return pd.read_csv(path)
+
+
+@traced(cat="io", args=lambda db, path, *a, **k: {"path": path})
+def import_items(db: Database, path: str) -> int:
+    """Insert the items listed in *path* and return how many were read.
+
+    Expected columns: 'DESCRIPCIÓN', 'UNIDAD', 'CANT.', 'P.U.'.
+    """
+    df = read_table(path)
+    rows = [
+        (row.get("DESCRIPCIÓN", ""), row.get("UNIDAD", ""),
+         float(row.get("CANT.", 0)), float(row.get("P.U.", 0)))
+        for _, row in df.iterrows()
+    ]
+    db.executemany(
+        "INSERT INTO items(name, unit, total, incidence, active) VALUES(?,?,?,?,0)", rows
+    )
+    return len(rows)
+
+
+@traced(cat="io", args=lambda db, path, *a, **k: {"path": path})
+def import_atajados(db: Database, path: str) -> int:
+    """Insert the atajados listed in *path* and return how many were read.
+
+    Expected columns: 'COMUNIDAD', 'ATAJADO', 'NOMBRE', 'CI', 'ESTE', 'NORTE'.
+    """
+    df = read_table(path)
+    rows = []
+    for _, row in df.iterrows():
+        com = str(row.get("COMUNIDAD", "")).strip()
+        num = str(row.get("ATAJADO", "")).replace("Atajado #", "").strip()
+        ben = str(row.get("NOMBRE", "")).strip()
+        ci = str(row.get("CI", "")).strip()
+        e = float(row.get("ESTE", 0))
+        n = float(row.get("NORTE", 0))
+        rows.append((com, int(num), ben, ci, e, n))
+    db.executemany(
+        "INSERT INTO atajados(comunidad, number, beneficiario, ci, coord_e, coord_n) VALUES(?,?,?,?,?,?)",
+        rows,
+    )
+    return len(rows)
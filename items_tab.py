@@ -1,39 +1,32 @@
 # items_tab.py
-import pandas as pd
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget, QPushButton,
     QDialog, QFormLayout, QLineEdit, QTableWidgetItem, QFileDialog,
-    QMessageBox, QAbstractItemView, QHeaderView, QComboBox, QGroupBox
+    QMessageBox, QAbstractItemView, QHeaderView, QComboBox, QGroupBox,
+    QApplication
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtGui import QKeySequence, QPalette, QShortcut
 from database import Database
+from tracing import traced
+import importers
+from edit_buffer import EditBuffer
+from conflict_dialog import resolve_buffer_conflicts
 
-# ---------- QSS local ----------
-LIGHT_QSS_ITEM = """
-QWidget      { background:#ffffff; color:#202020; font-family:Segoe UI; font-size:12pt; }
-QGroupBox    { border:1px solid #ccc; border-radius:10px; padding:10px; margin-top:6px; }
-QPushButton  { background:#1976D2; color:#fff; border-radius:6px; padding:6px 14px; }
-QPushButton:hover { background:#1259a4; }
-QLineEdit    { background:#fafafa; border:1px solid #aaa; border-radius:6px; padding:5px; }
-QTableWidget { background:#f9f9f9; alternate-background-color:#e8f0fe; color:#202020; border:1px solid #ccc; }
-QHeaderView::section { background:#d0e8ff; color:#202020; font-weight:bold; padding:4px; border:1px solid #ccc; }
-"""
-
-DARK_QSS_ITEM = """
-QWidget      { background:#1e1e1e; color:#e0e0e0; font-family:Segoe UI; font-size:12pt; }
-QGroupBox    { background:#252525; border:1px solid #444; border-radius:10px; padding:10px; margin-top:6px; }
-QPushButton  { background:#0d6efd; color:#fff; border-radius:6px; padding:6px 14px; }
-QPushButton:hover { background:#1a75ff; }
-QLineEdit    { background:#2a2a2a; border:1px solid #555; border-radius:6px; padding:5px; color:#e0e0e0; }
-QTableWidget { background:#272727; alternate-background-color:#1f1f1f; color:#e0e0e0; border:1px solid #444; }
-QHeaderView::section { background:#353535; color:#e0e0e0; font-weight:bold; padding:4px; border:1px solid #444; }
-"""
+# Retardo (ms) antes de escribir las ediciones acumuladas
+FLUSH_DELAY_MS = 400
+
+# Columnas editables de la tabla -> campos de 'items'
+ITEM_FIELDS = {1: "active", 2: "name", 3: "unit", 4: "total", 5: "incidence"}
+ITEM_LABELS = {"active": "Activo", "name": "Nombre", "unit": "Unidad",
+               "total": "Cant.", "incidence": "P.U."}
 
 class ItemsTab(QWidget):
     def __init__(self, db: Database):
         super().__init__()
         self.db = db
         self._loading = False
+        self.buffer = EditBuffer(db, "items", ITEM_FIELDS.values())
 
         # ---------- Layout raíz ----------
         self.layout = QVBoxLayout(self)
@@ -45,6 +38,7 @@ class ItemsTab(QWidget):
         group_layout = QVBoxLayout()
 
         self.note = QLabel("<i>Marca los ítems que quieras incluir en Seguimiento</i>")
+        self.note.setForegroundRole(QPalette.ColorRole.PlaceholderText)  # texto atenuado del tema
         group_layout.addWidget(self.note)
 
         toolbar = QHBoxLayout()
@@ -76,33 +70,41 @@ class ItemsTab(QWidget):
         self.table.cellChanged.connect(self.on_cell_changed)
         self.search.textChanged.connect(self.filter_rows)
 
-        # ---------- Tema inicial ----------
-        self.set_theme(False)   # claro por defecto
-        self.refresh()
+        # ---------- Escritura diferida + deshacer/rehacer ----------
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FLUSH_DELAY_MS)
+        self._flush_timer.timeout.connect(self.flush_edits)
+        app = QApplication.instance()
+        if app is not None:
+            app.focusChanged.connect(self._on_focus_changed)
+        ctx = Qt.ShortcutContext.WidgetWithChildrenShortcut
+        QShortcut(QKeySequence.StandardKey.Undo, self.table, self.undo_edit, context=ctx)
+        QShortcut(QKeySequence.StandardKey.Redo, self.table, self.redo_edit, context=ctx)
 
-    # =====================================================
-    #              CAMBIO DE TEMA
-    # =====================================================
-    def set_theme(self, dark: bool):
-        """Aplica estilo claro u oscuro a la pestaña."""
-        self.setStyleSheet(DARK_QSS_ITEM if dark else LIGHT_QSS_ITEM)
-        self.note.setStyleSheet("color:#B0B0B0;" if dark else "color:#777777;")
+        self.refresh()
 
     # ---------- Resto de métodos (lógica sin cambios) ----------
+    @traced(cat="ui")
     def refresh(self):
+        self.flush_edits(reload=False)
         self._loading = True
-        rows = self.db.fetchall("SELECT id, name, unit, total, incidence, active, progress FROM items")
+        rows = self.db.fetchall(
+            "SELECT id, name, unit, total, incidence, active, progress, row_version FROM items")
+        self.buffer.set_versions({r[0]: r[-1] for r in rows})
         self.table.setRowCount(len(rows))
         self.table.setColumnCount(8)
         self.table.setHorizontalHeaderLabels(["ID","Activo","Nombre","Unidad","Cant.","P.U.","Total","Avance (%)"])
-        for r,(iid,name,unit,qty,pu,active,progress) in enumerate(rows):
+        for r,(iid,name,unit,qty,pu,active,progress,_) in enumerate(rows):
             total = qty*pu
             self.table.setItem(r,0,QTableWidgetItem(str(iid)))
             chk = QTableWidgetItem(); chk.setFlags(chk.flags()|Qt.ItemFlag.ItemIsUserCheckable)
             chk.setCheckState(Qt.CheckState.Checked if active else Qt.CheckState.Unchecked)
+            chk.setData(Qt.ItemDataRole.UserRole, 1 if active else 0)
             self.table.setItem(r,1,chk)
             for c,val in enumerate([name,unit,qty,pu,total],start=2):
                 item = QTableWidgetItem(str(val))
+                item.setData(Qt.ItemDataRole.UserRole, val)
                 item.setFlags(item.flags()|Qt.ItemFlag.ItemIsEditable if c in (2,3,4,5) else item.flags()^Qt.ItemFlag.ItemIsEditable)
                 self.table.setItem(r,c,item)
             if active:
@@ -117,35 +119,88 @@ class ItemsTab(QWidget):
         self._loading=False
 
     def on_cell_changed(self,row,col):
-        if self._loading: return
+        if self._loading or col not in ITEM_FIELDS: return
         iid=int(self.table.item(row,0).text())
+        cell=self.table.item(row,col); campo=ITEM_FIELDS[col]
+        old=cell.data(Qt.ItemDataRole.UserRole)
         if col==1:
-            st=self.table.item(row,1).checkState()
-            self.db.execute("UPDATE items SET active=? WHERE id=?", (1 if st==Qt.CheckState.Checked else 0,iid))
-            return
-        mapa={2:"name",3:"unit",4:"total",5:"incidence"}
-        if col in mapa:
-            campo=mapa[col]; valtxt=self.table.item(row,col).text()
+            new=1 if cell.checkState()==Qt.CheckState.Checked else 0
+        else:
             try:
-                val=float(valtxt) if campo in ("total","incidence") else valtxt
-                self.db.execute(f"UPDATE items SET {campo}=? WHERE id=?", (val,iid))
-                qty=float(self.db.fetchall("SELECT total FROM items WHERE id=?", (iid,))[0][0])
-                pu=float(self.db.fetchall("SELECT incidence FROM items WHERE id=?", (iid,))[0][0])
-                self._loading=True
-                self.table.item(row,6).setText(str(qty*pu))
-                self._loading=False
-            except: QMessageBox.warning(self,"Error","Valor inválido")
+                new=float(cell.text()) if campo in ("total","incidence") else cell.text()
+            except ValueError:
+                QMessageBox.warning(self,"Error","Valor inválido")
+                self._set_cell(row,col,old); return
+        self._loading=True
+        cell.setData(Qt.ItemDataRole.UserRole,new)
+        self._loading=False
+        self.buffer.record(iid,campo,old,new)
+        self._update_total(row)
+        self._flush_timer.start()
+
+    # =====================================================
+    #        ESCRITURA DIFERIDA Y DESHACER/REHACER
+    # =====================================================
+    def flush_edits(self, reload=True):
+        """Escribe en una sola transacción las ediciones pendientes.
+
+        Si otro usuario guardó las mismas filas, pregunta qué valores quedan
+        y (con *reload*) recarga la tabla.
+        """
+        self._flush_timer.stop()
+        self.buffer.flush()
+        if self.buffer.conflicts:
+            resolve_buffer_conflicts(self, self.buffer, ITEM_LABELS, lambda iid: f"El ítem {iid}")
+            if reload:
+                self.refresh()
+
+    def undo_edit(self):
+        self._apply_journal(self.buffer.undo(), undo=True)
+
+    def redo_edit(self):
+        self._apply_journal(self.buffer.redo(), undo=False)
+
+    def _apply_journal(self, edit, undo):
+        if edit is None: return
+        col={v:k for k,v in ITEM_FIELDS.items()}[edit.column]
+        for r in range(self.table.rowCount()):
+            if self.table.item(r,0).text()==str(edit.row_id):
+                self._set_cell(r,col,edit.old if undo else edit.new)
+                self._update_total(r)
+                break
+        self._flush_timer.start()
+
+    def _set_cell(self,row,col,val):
+        self._loading=True
+        cell=self.table.item(row,col)
+        if col==1:
+            cell.setCheckState(Qt.CheckState.Checked if val else Qt.CheckState.Unchecked)
+        else:
+            cell.setText(str(val))
+        cell.setData(Qt.ItemDataRole.UserRole,val)
+        self._loading=False
+
+    def _update_total(self,row):
+        """Recalcula el total de la fila con los valores locales (sin consultar la BD)."""
+        qty=self.table.item(row,4).data(Qt.ItemDataRole.UserRole)
+        pu=self.table.item(row,5).data(Qt.ItemDataRole.UserRole)
+        self._loading=True
+        self.table.item(row,6).setText(str(qty*pu))
+        self._loading=False
+
+    def _on_focus_changed(self,old,new):
+        if self.buffer.dirty and (new is None or not (new is self.table or self.table.isAncestorOf(new))):
+            self.flush_edits()
+
+    def hideEvent(self,event):
+        self.flush_edits()
+        super().hideEvent(event)
 
     def import_items(self):
         p,_ = QFileDialog.getOpenFileName(self,"Importar Ítems","","Excel (*.xlsx);;CSV (*.csv)")
         if not p: return
         try:
-            df = pd.read_excel(p) if p.lower().endswith(("xls","xlsx")) else pd.read_csv(p)
-            for _,row in df.iterrows():
-                self.db.execute(
-                    "INSERT INTO items(name, unit, total, incidence, active) VALUES(?,?,?,?,0)",
-                    (row.get("DESCRIPCIÓN",""), row.get("UNIDAD",""), float(row.get("CANT.",0)), float(row.get("P.U.",0)))
-                )
+            importers.import_items(self.db, p)
             self.refresh(); QMessageBox.information(self,"Importado","Ítems importados correctamente.")
         except Exception as e:
             QMessageBox.critical(self,"Error",f"No se pudo importar:\n{e}")
@@ -168,6 +223,7 @@ class ItemsTab(QWidget):
         if not sel: QMessageBox.information(self,"Eliminar","Selecciona una fila."); return
         row=sel[0].row(); iid=int(self.table.item(row,0).text())
         if QMessageBox.question(self,"Confirmar",f"¿Eliminar ítem {iid}?",QMessageBox.Yes|QMessageBox.No)==QMessageBox.Yes:
+            self.flush_edits(); self.buffer.discard(iid)
             self.db.execute("DELETE FROM items WHERE id=?", (iid,)); self.refresh()
 
     def filter_rows(self,text):
@@ -0,0 +1,274 @@
+"""One archive file per atajado instead of thousands of loose photos.
+
+Copying ``images/`` to a field laptop or a USB drive is dominated by
+per-file overhead, so :func:`pack_atajado` moves the photos of
+``images/<número>/`` into ``images/<número>.pack``. New photos keep arriving
+as loose files and are merged into the pack the next time it is packed.
+Layout of a pack (integers little-endian)::
+
+    MAGIC                                       8 bytes
+    photo contents, one after another
+    names, UTF-8, one after another
+    index: count × (offset u64, size u64, crc32 u32, name offset u64, name length u32)
+    trailer: (index offset u64, count u64, MAGIC)
+
+Index records have a fixed size and are sorted by name, so
+:meth:`PhotoPack.read` finds a photo with a binary search over the
+memory-mapped index without parsing it. :func:`photos` lists the packed
+and loose photos of an atajado together; a loose file wins over a packed
+one with the same name (e.g. after restoring a backup)::
+
+    pack_all()                        # empaqueta todas las carpetas
+    for photo, data in read_photos(photos(12)):
+        ...
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from backup import IMAGE_DIR
+from tracing import traced
+
+MAGIC = b"ATJPACK1"
+PACK_SUFFIX = ".pack"
+RECORD = struct.Struct("<QQIQI")
+TRAILER = struct.Struct("<QQ8s")
+CHUNK = 1 << 20
+
+
+@dataclass(frozen=True)
+class Photo:
+    """A photo of an atajado: a loose file, or a member of a pack at *path*."""
+
+    name: str
+    path: str
+    packed: bool = False
+
+
+class PhotoPack:
+    """Read-only view of a pack; the file is memory-mapped while open."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self._mm)
+        if size < len(MAGIC) + TRAILER.size or self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} no es un paquete de fotos")
+        self._index, self.count, magic = TRAILER.unpack_from(self._mm, size - TRAILER.size)
+        if magic != MAGIC or self._index + self.count * RECORD.size != size - TRAILER.size:
+            self.close()
+            raise ValueError(f"Índice dañado en {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, name: str) -> bool:
+        return self._find(name) is not None
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def _record(self, i: int) -> tuple:
+        return RECORD.unpack_from(self._mm, self._index + i * RECORD.size)
+
+    def _name(self, record: tuple) -> str:
+        _, _, _, name_off, name_len = record
+        return self._mm[name_off:name_off + name_len].decode("utf-8")
+
+    def _find(self, name: str):
+        """Index record of *name* (binary search over the mapped index), or None."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self._record(mid)
+            found = self._name(record)
+            if found == name:
+                return record
+            if found < name:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def names(self) -> list:
+        """Photo names, sorted."""
+        return [self._name(self._record(i)) for i in range(self.count)]
+
+    def read(self, name: str) -> bytes:
+        """Contents of photo *name*; ``KeyError`` if it is not in the pack."""
+        record = self._find(name)
+        if record is None:
+            raise KeyError(name)
+        offset, size = record[:2]
+        return self._mm[offset:offset + size]
+
+    def chunks(self, name: str):
+        """Contents of photo *name* in blocks, without holding it all in memory."""
+        offset, size = self._find(name)[:2]
+        for start in range(offset, offset + size, CHUNK):
+            yield self._mm[start:min(start + CHUNK, offset + size)]
+
+    def verify(self) -> list:
+        """Names of the photos whose contents do not match their checksum."""
+        bad = []
+        for i in range(self.count):
+            record = self._record(i)
+            offset, size, crc = record[:3]
+            if zlib.crc32(self._mm[offset:offset + size]) != crc:
+                bad.append(self._name(record))
+        return bad
+
+
+def write_pack(path, entries) -> int:
+    """Write a pack from ``(name, chunks)`` pairs; return the photos written.
+
+    *chunks* is an iterable of ``bytes``. The file is synced and its
+    checksums verified before returning; a bad pack is deleted.
+    """
+    path = str(path)
+    records, names = [], []
+    with open(path, "wb") as fh:
+        fh.write(MAGIC)
+        for name, chunks in sorted(entries, key=lambda e: e[0]):
+            offset, crc = fh.tell(), 0
+            for chunk in chunks:
+                fh.write(chunk)
+                crc = zlib.crc32(chunk, crc)
+            records.append([offset, fh.tell() - offset, crc])
+            names.append(name.encode("utf-8"))
+        for record, name in zip(records, names):
+            record += [fh.tell(), len(name)]
+            fh.write(name)
+        index = fh.tell()
+        for record in records:
+            fh.write(RECORD.pack(*record))
+        fh.write(TRAILER.pack(index, len(records), MAGIC))
+        fh.flush()
+        os.fsync(fh.fileno())
+    with PhotoPack(path) as check:
+        bad = check.verify()
+    if bad:
+        os.remove(path)
+        raise OSError(f"Paquete de fotos mal escrito: {', '.join(bad[:5])}")
+    return len(records)
+
+
+def _file_chunks(path):
+    with open(path, "rb") as fh:
+        yield from iter(lambda: fh.read(CHUNK), b"")
+
+
+def pack_path(number, image_dir=IMAGE_DIR) -> Path:
+    return Path(image_dir) / f"{number}{PACK_SUFFIX}"
+
+
+def _loose(folder: Path) -> list:
+    if not folder.is_dir():
+        return []
+    return sorted(p for p in folder.iterdir() if p.is_file() and not p.name.startswith("."))
+
+
+@traced("photos.pack", "io", args=lambda number, *a, **k: {"atajado": number})
+def pack_atajado(number, image_dir=IMAGE_DIR) -> int:
+    """Move the loose photos of atajado *number* into its pack.
+
+    Photos already packed are kept; a loose file replaces a packed one with
+    the same name. The loose files are deleted only after the new pack is in
+    place. Returns how many loose photos were packed.
+    """
+    folder = Path(image_dir) / str(number)
+    loose = _loose(folder)
+    if not loose:
+        return 0
+    target = pack_path(number, image_dir)
+    tmp = Path(str(target) + ".tmp")
+    old = PhotoPack(target) if target.is_file() else None
+    try:
+        entries = {}
+        if old is not None:
+            entries = {name: old.chunks(name) for name in old.names()}
+        entries.update({p.name: _file_chunks(p) for p in loose})
+        write_pack(tmp, entries.items())
+    finally:
+        if old is not None:
+            old.close()  # Windows no reemplaza un archivo mapeado
+    os.replace(tmp, target)
+    for p in loose:
+        p.unlink()
+    try:
+        folder.rmdir()
+    except OSError:  # quedan otros archivos en la carpeta
+        pass
+    return len(loose)
+
+
+def pack_all(image_dir=IMAGE_DIR) -> dict:
+    """Pack every atajado folder under *image_dir*; ``{número: fotos empaquetadas}``."""
+    root = Path(image_dir)
+    if not root.is_dir():
+        return {}
+    packed = {}
+    for folder in sorted(p for p in root.iterdir() if p.is_dir()):
+        count = pack_atajado(folder.name, image_dir)
+        if count:
+            packed[folder.name] = count
+    return packed
+
+
+def photos(number, image_dir=IMAGE_DIR) -> list:
+    """Packed and loose photos of atajado *number*, sorted by name."""
+    found = {}
+    target = pack_path(number, image_dir)
+    if target.is_file():
+        with PhotoPack(target) as pack:
+            found = {name: Photo(name, str(target), True) for name in pack.names()}
+    for p in _loose(Path(image_dir) / str(number)):
+        found[p.name] = Photo(p.name, str(p))
+    return [found[name] for name in sorted(found)]
+
+
+def loose_photos(number, image_dir=IMAGE_DIR) -> list:
+    """Loose photos of atajado *number* only (e.g. when its pack is damaged)."""
+    return [Photo(p.name, str(p)) for p in _loose(Path(image_dir) / str(number))]
+
+
+def read_photo(photo) -> bytes:
+    """Contents of a :class:`Photo` (or of a plain file path)."""
+    if not isinstance(photo, Photo):
+        photo = Photo(os.path.basename(photo), str(photo))
+    if not photo.packed:
+        with open(photo.path, "rb") as fh:
+            return fh.read()
+    with PhotoPack(photo.path) as pack:
+        return pack.read(photo.name)
+
+
+def read_photos(items):
+    """Yield ``(photo, contents)``, opening each pack only once."""
+    packs = {}
+    try:
+        for photo in items:
+            if not photo.packed:
+                yield photo, read_photo(photo)
+                continue
+            pack = packs.get(photo.path)
+            if pack is None:
+                pack = packs[photo.path] = PhotoPack(photo.path)
+            yield photo, pack.read(photo.name)
+    finally:
+        for pack in packs.values():
+            pack.close()
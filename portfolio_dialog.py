@@ -0,0 +1,42 @@
+# portfolio_dialog.py
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt6.QtGui import QFont
+from workspace import portfolio
+
+class PortfolioDialog(QDialog):
+    """Resumen combinado de todos los trabajos del espacio de trabajo."""
+    def __init__(self, paths, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Cartera de trabajos")
+        self.resize(900, 400)
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget()
+        self.table.setAlternatingRowColors(True)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+        self.load(paths)
+
+    def load(self, paths):
+        data = portfolio(paths)
+        rows = data["projects"] + data["skipped"] + [dict(data["total"], name="TOTAL")]
+        headers = ["Trabajo", "Atajados", "Ejecutados", "En ejecución", "Pendientes", "Avance (%)"]
+        self.table.setColumnCount(len(headers))
+        self.table.setHorizontalHeaderLabels(headers)
+        self.table.setRowCount(len(rows))
+        for r, p in enumerate(rows):
+            if "error" in p:
+                # Trabajo que no se pudo leer: se muestra, pero no suma al total
+                vals = [p["name"], "—", "—", "—", "—", "No se pudo leer"]
+            else:
+                vals = [p["name"], p["atajados"], p["ejecutados"], p["en_ejecucion"],
+                        p["pendientes"], f"{p['progress']:.2f}%"]
+            for c, val in enumerate(vals):
+                item = QTableWidgetItem(str(val))
+                if p is rows[-1]:
+                    font = QFont(); font.setBold(True); item.setFont(font)
+                if "path" in p:
+                    item.setToolTip(f"{p['path']}\n{p['error']}" if "error" in p else p["path"])
+                self.table.setItem(r, c, item)
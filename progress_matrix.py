@@ -0,0 +1,180 @@
+"""In-memory atajados × items progress matrix for what-if analysis.
+
+The matrix holds the percentage recorded for every (atajado, item) pair
+plus the cost weight of each item, and keeps column sums and per-atajado
+executed fractions cached. Project, item, atajado and community totals are
+then plain vector operations, and scenario overlays (:meth:`what_if`) only
+touch the rows they change, never the database.
+
+Figures follow the same rules as the SQL code: items active per atajado take
+the average of their recorded avances, global items their own progress,
+and an atajado's progress is weighted by the cost of its recorded items.
+"""
+
+import numpy as np
+
+from database import Database
+
+
+class ProgressMatrix:
+    """Percentages (atajados × items) with cost weights and cached sums."""
+
+    def __init__(self, numbers, comunidades, item_ids, cost, active, global_pct):
+        self.numbers = list(numbers)
+        self.item_ids = list(item_ids)
+        self.row_of = {n: r for r, n in enumerate(self.numbers)}
+        self.col_of = {iid: c for c, iid in enumerate(self.item_ids)}
+        names, codes = np.unique(np.asarray(comunidades, dtype=object).astype(str),
+                                 return_inverse=True)
+        self.comunidades = list(names)
+        self.codes = codes.astype(np.intp)
+        self.cost = np.asarray(cost, dtype=np.float64)
+        self.active = np.asarray(active, dtype=bool)
+        self.global_pct = np.asarray(global_pct, dtype=np.float64)
+        shape = (len(self.numbers), len(self.item_ids))
+        self.pct = np.zeros(shape, dtype=np.float64)
+        self.present = np.zeros(shape, dtype=bool)
+        self.stamp = None
+        self._weights = self.cost * self.active
+        self._active_cost = float(self._weights.sum())
+        self._recompute()
+
+    # ------------------------------------------------------------------ carga
+    @classmethod
+    def load(cls, db: Database) -> "ProgressMatrix":
+        """Build the matrix from the current database contents."""
+        atajados = db.fetchall(
+            "SELECT number, COALESCE(comunidad, '') FROM atajados ORDER BY rowid"
+        )
+        items = db.fetchall(
+            """
+            SELECT id, COALESCE(total, 0) * COALESCE(incidence, 0),
+                   COALESCE(active, 0), COALESCE(progress, 0)
+            FROM items ORDER BY id
+            """
+        )
+        avances = db.fetchall("SELECT atajado_id, item_id, quantity FROM avances")
+
+        # Números repetidos comparten avances; los avances huérfanos también cuentan
+        numbers, comunidades, seen = [], [], set()
+        for num, com in atajados:
+            if num not in seen:
+                seen.add(num); numbers.append(num); comunidades.append(com)
+        for num, _, _ in avances:
+            if num not in seen:
+                seen.add(num); numbers.append(num); comunidades.append("")
+
+        matrix = cls(numbers, comunidades,
+                     [r[0] for r in items], [r[1] for r in items],
+                     [bool(r[2]) for r in items], [r[3] for r in items])
+        rows, cols, vals = [], [], []
+        for num, iid, qty in avances:
+            col = matrix.col_of.get(iid)
+            if col is not None:
+                rows.append(matrix.row_of[num]); cols.append(col); vals.append(qty or 0.0)
+        if rows:
+            matrix.pct[rows, cols] = vals
+            matrix.present[rows, cols] = True
+        matrix._recompute()
+        matrix.stamp = cls.db_stamp(db)
+        return matrix
+
+    @staticmethod
+    def db_stamp(db: Database) -> tuple:
+        """Fingerprint that changes after any write, local or external."""
+        return db.data_stamp()
+
+    def is_stale(self, db: Database) -> bool:
+        return self.stamp != self.db_stamp(db)
+
+    def _recompute(self) -> None:
+        filled = self.pct * self.present
+        self._colsum = filled.sum(axis=0)
+        self._colcnt = self.present.sum(axis=0)
+        self._row_exec = filled @ self._weights
+
+    # --------------------------------------------------------------- escritura
+    def set_progress(self, number, item_id, pct: float) -> bool:
+        """Apply one recorded avance; return False if the shape must be reloaded."""
+        r, c = self.row_of.get(number), self.col_of.get(item_id)
+        if r is None or c is None:
+            self.stamp = None
+            return False
+        old = self.pct[r, c] if self.present[r, c] else 0.0
+        self._colsum[c] += pct - old
+        self._colcnt[c] += 0 if self.present[r, c] else 1
+        self._row_exec[r] += (pct - old) * self._weights[c]
+        self.pct[r, c] = pct
+        self.present[r, c] = True
+        return True
+
+    # ---------------------------------------------------------------- consultas
+    def item_progress(self, colsum=None, colcnt=None) -> np.ndarray:
+        """Progress (%) of every item, as used for the project total."""
+        colsum = self._colsum if colsum is None else colsum
+        colcnt = self._colcnt if colcnt is None else colcnt
+        avg = np.divide(colsum, colcnt, out=np.zeros_like(colsum), where=colcnt > 0)
+        return np.where(self.active, avg, self.global_pct)
+
+    def project_progress(self, colsum=None, colcnt=None) -> float:
+        """Cost-weighted project progress (%), like ``get_project_progress``."""
+        total = self.cost.sum()
+        if not total:
+            return 0.0
+        return float(self.cost @ self.item_progress(colsum, colcnt) / total)
+
+    def atajado_progress(self) -> np.ndarray:
+        """Progress (%) of every atajado weighted by its recorded items."""
+        den = self.present @ self._weights
+        return np.divide(self._row_exec, den, out=np.zeros_like(den), where=den > 0)
+
+    def comunidad_progress(self, row_exec=None) -> np.ndarray:
+        """Executed share (%) of each community's prorated budget."""
+        row_exec = self._row_exec if row_exec is None else row_exec
+        n = np.bincount(self.codes, minlength=len(self.comunidades))
+        executed = np.bincount(self.codes, weights=row_exec, minlength=len(self.comunidades))
+        den = n * self._active_cost
+        return np.divide(executed, den, out=np.zeros_like(executed), where=den > 0)
+
+    def totals(self) -> dict:
+        """Progress per dimension keyed by atajado number, item id and community."""
+        return {
+            "project": self.project_progress(),
+            "atajados": dict(zip(self.numbers, self.atajado_progress().tolist())),
+            "items": dict(zip(self.item_ids, self.item_progress().tolist())),
+            "comunidades": dict(zip(self.comunidades, self.comunidad_progress().tolist())),
+        }
+
+    def what_if(self, comunidades=None, atajados=None) -> dict:
+        """Project and community progress if atajados reached a minimum level.
+
+        *comunidades* maps a community to a minimum percentage for every
+        active item of its atajados; *atajados* does the same per atajado
+        number. Only the affected rows are evaluated; the matrix is not
+        modified.
+        """
+        level = np.zeros(len(self.numbers))
+        for name, value in (comunidades or {}).items():
+            if name in self.comunidades:
+                mask = self.codes == self.comunidades.index(name)
+                level[mask] = np.maximum(level[mask], value)
+        for num, value in (atajados or {}).items():
+            r = self.row_of.get(num)
+            if r is not None:
+                level[r] = max(level[r], value)
+
+        rows = np.flatnonzero(level > 0)
+        colsum, colcnt, row_exec = self._colsum, self._colcnt, self._row_exec
+        if rows.size:
+            act = self.active
+            old = self.pct[np.ix_(rows, act)] * self.present[np.ix_(rows, act)]
+            new = np.maximum(old, level[rows, None])
+            colsum = colsum.copy(); colcnt = colcnt.copy(); row_exec = row_exec.copy()
+            colsum[act] += (new - old).sum(axis=0)
+            colcnt[act] += (~self.present[np.ix_(rows, act)]).sum(axis=0)
+            row_exec[rows] += (new - old) @ self._weights[act]
+        return {
+            "project": self.project_progress(colsum, colcnt),
+            "comunidades": dict(zip(self.comunidades,
+                                    self.comunidad_progress(row_exec).tolist())),
+        }
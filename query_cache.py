@@ -0,0 +1,158 @@
+"""Memoized aggregate queries, invalidated per table.
+
+Every cached result remembers the change counters (``table_versions``) of
+the tables it was computed from; it is served again only while those
+counters have not moved, so a write to ``cronograma`` leaves the status
+counts cached but drops the Gantt spans. Results are kept in a size-capped
+LRU (:class:`QueryCache`) and, when they are plain Python literals, saved
+in the ``query_cache`` table when the database is closed, so an unchanged
+database reopens with its dashboard already computed.
+
+Aggregates are declared on :class:`database.Database` methods::
+
+    @cached_query("items", "avances")
+    def get_project_progress(self) -> float:
+        ...
+
+or cached ad hoc with :meth:`database.Database.cached`. Cached values are
+shared between callers and must be treated as read-only.
+"""
+
+import ast
+import sys
+from collections import OrderedDict
+from functools import wraps
+
+MAX_ENTRIES = 256
+MAX_BYTES = 8 * 1024 * 1024
+# Subir al cambiar la definición de una consulta en caché: descarta lo guardado
+FORMAT_VERSION = "1"
+
+
+def encode(value) -> str:
+    """Text form of a literal value (numbers, strings, tuples, lists, dicts)."""
+    text = repr(value)
+    try:
+        same = decode(text) == value
+    except (ValueError, SyntaxError):
+        same = False
+    if not same:
+        raise ValueError(f"{type(value).__name__} no es un literal de Python")
+    return text
+
+
+def decode(text: str):
+    """Inverse of :func:`encode`; never evaluates code."""
+    return ast.literal_eval(text)
+
+
+def estimate_size(value) -> int:
+    """Approximate memory held by *value*, in bytes."""
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + estimate_size(vars(value))
+    return sys.getsizeof(value)
+
+
+class QueryCache:
+    """LRU of ``(name, params) -> (versions, value)`` capped by count and bytes.
+
+    *versions* are the ``(table, counter)`` pairs the value was computed at.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # clave -> (versiones, valor, bytes, persistir)
+        self.nbytes = 0
+        self.hits = self.misses = 0
+        self.dirty = False  # hay resultados que aún no se guardaron en la base
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key, versions: tuple):
+        """``(True, value)`` if *key* was computed at *versions*, else ``(False, None)``."""
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != versions:
+            self.misses += 1
+            return False, None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def put(self, key, versions: tuple, value, persist: bool = True) -> None:
+        """Store *value*; the least recently used entries make room for it."""
+        self.discard(key)
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (versions, value, size, persist)
+        self.nbytes += size
+        self.dirty = self.dirty or persist
+        while len(self.entries) > self.max_entries or self.nbytes > self.max_bytes:
+            _, (_, _, old, _) = self.entries.popitem(last=False)
+            self.nbytes -= old
+
+    def discard(self, key) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[2]
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.nbytes = 0
+
+    # ---------------------------------------------------------- persistencia
+    def dump(self, counters: dict = None) -> list:
+        """``(name, params, versions, value)`` texts of the persistable entries.
+
+        With *counters* (``{table: version}``), entries computed before the
+        last change of one of their tables are left out.
+        """
+        rows = []
+        for (name, params), (versions, value, _, persist) in self.entries.items():
+            if counters is not None and any(counters.get(t) != v for t, v in versions):
+                continue
+            if persist:
+                try:
+                    rows.append((name, encode(params), encode(versions), encode(value)))
+                except ValueError:
+                    continue
+        return rows
+
+    def load(self, rows) -> int:
+        """Add entries saved by :meth:`dump`; unreadable rows are skipped."""
+        loaded = 0
+        for name, params, versions, value in rows:
+            try:
+                key = (name, decode(params))
+                self.put(key, decode(versions), decode(value))
+            except (ValueError, SyntaxError, TypeError):
+                continue
+            loaded += 1
+        self.dirty = False
+        return loaded
+
+
+def cached_query(*tables: str, persist: bool = True):
+    """Decorate a :class:`database.Database` method whose result depends on *tables*.
+
+    The call arguments are part of the key, so they must be hashable
+    literals.
+    """
+    def decorate(method):
+        name = method.__name__
+
+        @wraps(method)
+        def wrapper(self, *args):
+            return self.cached(name, tables, lambda: method(self, *args), args, persist)
+        return wrapper
+    return decorate
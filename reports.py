@@ -0,0 +1,48 @@
+"""Report exports (Excel, PDF, Word) shared by the GUI and the command line.
+
+Heavy third-party libraries are imported inside each exporter.
+"""
+
+from database import Database
+from tracing import traced
+
+
+@traced(cat="io", args=lambda db, path, *a, **k: {"path": path})
+def export_excel(db: Database, path: str) -> None:
+    """Write the items and atajados tables to an Excel workbook."""
+    import pandas as pd
+    df_items = pd.read_sql("SELECT * FROM items", db.conn)
+    df_ataj = pd.read_sql("SELECT * FROM atajados", db.conn)
+    with pd.ExcelWriter(path) as w:
+        df_items.to_excel(w, sheet_name="Ítems", index=False)
+        df_ataj.to_excel(w, sheet_name="Atajados", index=False)
+
+
+@traced(cat="io", args=lambda db, path, *a, **k: {"path": path})
+def export_pdf(db: Database, path: str) -> None:
+    """Write a simple items/atajados listing to a PDF file."""
+    from fpdf import FPDF
+    pdf = FPDF(); pdf.add_page(); pdf.set_font("Arial", size=12)
+    pdf.cell(0, 10, "Reporte Ítems", ln=1)
+    for n, t in db.fetchall("SELECT name,total FROM items"):
+        pdf.cell(0, 8, f"{n}: {t}", ln=1)
+    pdf.add_page(); pdf.cell(0, 10, "Reporte Atajados", ln=1)
+    for num, com, pct in db.fetchall("SELECT number,comunidad,progress FROM atajados"):
+        pdf.cell(0, 8, f"{num} - {com} ({pct or 0:.0f}%)", ln=1)
+    pdf.output(path)
+
+
+@traced(cat="io", args=lambda db, path, *a, **k: {"path": path})
+def export_word(db: Database, path: str) -> None:
+    """Write a simple items/atajados listing to a Word document."""
+    from docx import Document
+    doc = Document(); doc.add_heading("Reporte Ítems", level=1)
+    for n, t in db.fetchall("SELECT name,total FROM items"):
+        doc.add_paragraph(f"{n}: {t}")
+    doc.add_page_break(); doc.add_heading("Reporte Atajados", level=1)
+    for num, com, pct in db.fetchall("SELECT number,comunidad,progress FROM atajados"):
+        doc.add_paragraph(f"{num} - {com} ({pct or 0:.0f}%)")
+    doc.save(path)
+
+
+EXPORTERS = {"xlsx": export_excel, "pdf": export_pdf, "docx": export_word}
@@ -0,0 +1,72 @@
+# scenario_tab.py
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSlider,
+    QTableWidget, QTableWidgetItem, QHeaderView
+)
+from PyQt6.QtCore import Qt
+from database import Database
+from tracing import traced
+
+class ScenarioTab(QWidget):
+    """Escenarios «qué pasa si»: avance mínimo por comunidad sin tocar la BD."""
+    def __init__(self, db: Database):
+        super().__init__()
+        self.db = db
+        self.matrix = None
+        self.sliders = {}
+
+        layout = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.project_label = QLabel()
+        top.addWidget(self.project_label)
+        top.addStretch()
+        self.reset_btn = QPushButton("↺ Restablecer")
+        self.reset_btn.clicked.connect(self.reset)
+        top.addWidget(self.reset_btn)
+        layout.addLayout(top)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(5)
+        self.table.setHorizontalHeaderLabels(
+            ["Comunidad", "Avance actual (%)", "Avance mínimo", "", "Escenario (%)"]
+        )
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+        self.refresh()
+
+    @traced(cat="ui")
+    def refresh(self):
+        """Recarga la matriz de avance y reconstruye la tabla de comunidades."""
+        self.matrix = self.db.progress_matrix()
+        current = dict(zip(self.matrix.comunidades, self.matrix.comunidad_progress().tolist()))
+        self.sliders = {}
+        self.table.setRowCount(len(current))
+        for r, (name, pct) in enumerate(current.items()):
+            self.table.setItem(r, 0, QTableWidgetItem(name or "(sin comunidad)"))
+            self.table.setItem(r, 1, QTableWidgetItem(f"{pct:.2f}"))
+            slider = QSlider(Qt.Orientation.Horizontal)
+            slider.setRange(0, 100); slider.setSingleStep(5); slider.setPageStep(25)
+            slider.valueChanged.connect(self.update_scenario)
+            self.table.setCellWidget(r, 2, slider)
+            self.table.setItem(r, 3, QTableWidgetItem("0%"))
+            self.table.setItem(r, 4, QTableWidgetItem(f"{pct:.2f}"))
+            self.sliders[name] = (r, slider)
+        self.update_scenario()
+
+    def reset(self):
+        for _, slider in self.sliders.values():
+            slider.blockSignals(True); slider.setValue(0); slider.blockSignals(False)
+        self.update_scenario()
+
+    def update_scenario(self):
+        """Recalcula el escenario en memoria con los valores de los deslizadores."""
+        levels = {name: s.value() for name, (_, s) in self.sliders.items() if s.value()}
+        result = self.matrix.what_if(comunidades=levels)
+        for name, (r, slider) in self.sliders.items():
+            self.table.item(r, 3).setText(f"{slider.value()}%")
+            self.table.item(r, 4).setText(f"{result['comunidades'][name]:.2f}")
+        self.project_label.setText(
+            f"<b>Avance del proyecto:</b> actual {self.matrix.project_progress():.2f}% "
+            f"→ escenario {result['project']:.2f}%"
+        )
@@ -1,47 +1,155 @@
 # summary_tab.py
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem
-from PyQt6.QtCore import Qt
-from database import Database
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QTableView, QLineEdit, QPushButton, QLabel,
+    QAbstractItemView
+)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from database import Database, SUMMARY_PAGE, SUMMARY_SORT
+from forecast import CompletionForecast
+from tracing import traced
+
+HEADERS = ["Atajado", "Beneficiario", "Fecha", "Avance (%)", "Fin estimado"]
+
+
+class SummaryModel(QAbstractTableModel):
+    """Una página del resumen: filtro, orden y LIMIT/OFFSET se resuelven en SQL."""
+
+    def __init__(self, db: Database, page_size: int = SUMMARY_PAGE, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.page_size = page_size
+        self.page = 0
+        self.total = 0
+        self.text = ""
+        self.sort_column, self.descending = 2, True  # último avance, más reciente primero
+        self.rows = []
+        self.ends = {}
+
+    # ---------- Consulta ----------
+    def reload(self, forecast: bool = True):
+        """Vuelve a leer la página actual (y el pronóstico, si *forecast*)."""
+        self.beginResetModel()
+        if forecast:
+            self.ends = CompletionForecast.load(self.db).by_atajado()
+        self.total = self.db.summary_count(self.text)
+        self.page = min(self.page, max(self.pages() - 1, 0))
+        self.rows = self.db.summary_page(self.text, self.sort_column, self.descending,
+                                         self.page * self.page_size, self.page_size)
+        self.endResetModel()
+
+    def pages(self) -> int:
+        return max(1, -(-self.total // self.page_size))
+
+    def set_page(self, page: int):
+        self.page = max(0, min(page, self.pages() - 1))
+        self.reload(forecast=False)
+
+    def set_filter(self, text: str):
+        self.text, self.page = text, 0
+        self.reload(forecast=False)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        # El fin estimado no es una columna de la base: no se ordena
+        if column >= len(SUMMARY_SORT):
+            return
+        self.sort_column = column
+        self.descending = order == Qt.SortOrder.DescendingOrder
+        self.page = 0
+        self.reload(forecast=False)
+
+    # ---------- Modelo ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        num, ben, dt, pct = self.rows[index.row()]
+        col = index.column()
+        if col == 0:
+            return str(num)
+        if col == 1:
+            return ben
+        if col == 2:
+            return dt
+        if col == 3:
+            return f"{pct:.2f}%"
+        end = self.ends.get(num) if pct < 100 else None
+        return end.strftime("%d/%m/%Y") if end else ""
+
 
 class SummaryTab(QWidget):
     """Display progress summary per atajado."""
     def __init__(self, db: Database):
         super().__init__()
-        self.db = db
+        self.model = SummaryModel(db, parent=self)
         layout = QVBoxLayout(self)
-        self.table = QTableWidget()
+
+        top = QHBoxLayout()
+        self.filter = QLineEdit()
+        self.filter.setPlaceholderText("Filtrar por número, beneficiario o comunidad…")
+        self.filter.textChanged.connect(self.model.set_filter)
+        self.filter.textChanged.connect(self.update_pager)
+        top.addWidget(self.filter)
+        self.prev_btn = QPushButton("◀")
+        self.next_btn = QPushButton("▶")
+        self.page_label = QLabel()
+        self.prev_btn.clicked.connect(lambda: self.go_to(self.model.page - 1))
+        self.next_btn.clicked.connect(lambda: self.go_to(self.model.page + 1))
+        for w in (self.prev_btn, self.page_label, self.next_btn):
+            top.addWidget(w)
+        layout.addLayout(top)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setAlternatingRowColors(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.horizontalHeader().setSortIndicator(2, Qt.SortOrder.DescendingOrder)
+        self.table.setSortingEnabled(True)
+        self.table.horizontalHeader().sortIndicatorChanged.connect(self.on_sorted)
         layout.addWidget(self.table)
         self.refresh()
 
+    @property
+    def db(self):
+        return self.model.db
+
+    @db.setter
+    def db(self, db):
+        self.model.db = db
+
+    @traced(cat="ui")
     def refresh(self):
-        at_rows = self.db.fetchall("SELECT number, beneficiario FROM atajados")
-        rows = []
-        for num, ben in at_rows:
-            dt = self.db.fetchall(
-                "SELECT MAX(date) FROM avances WHERE atajado_id=?",
-                (num,)
-            )[0][0]
-            pct_row = self.db.fetchall(
-                """
-                SELECT SUM(i.total*i.incidence*a.quantity/100.0) / SUM(i.total*i.incidence)
-                FROM avances a JOIN items i ON a.item_id=i.id
-                WHERE a.atajado_id=? AND i.active=1
-                """,
-                (num,)
-            )
-            pct = (pct_row[0][0] or 0) * 100
-            rows.append((num, ben, dt if dt else "", pct))
-        rows.sort(key=lambda x: x[2], reverse=True)
-
-        headers = ["Atajado", "Beneficiario", "Fecha", "Avance (%)"]
-        self.table.setColumnCount(len(headers))
-        self.table.setHorizontalHeaderLabels(headers)
-        self.table.setRowCount(len(rows))
-        for r, (num, ben, dt, pct) in enumerate(rows):
-            self.table.setItem(r, 0, QTableWidgetItem(str(num)))
-            self.table.setItem(r, 1, QTableWidgetItem(ben))
-            self.table.setItem(r, 2, QTableWidgetItem(dt))
-            self.table.setItem(r, 3, QTableWidgetItem(f"{pct:.2f}%"))
-        self.table.resizeColumnsToContents()
\ No newline at end of file
+        self.model.reload()
+        self.update_pager()
+        self.table.resizeColumnsToContents()
+
+    def on_sorted(self, column, order):
+        # El modelo ya reordenó (o ignoró la columna): reflejar su estado real
+        m = self.model
+        if column != m.sort_column:
+            header = self.table.horizontalHeader()
+            header.blockSignals(True)
+            header.setSortIndicator(m.sort_column, Qt.SortOrder.DescendingOrder
+                                    if m.descending else Qt.SortOrder.AscendingOrder)
+            header.blockSignals(False)
+        self.update_pager()
+
+    def go_to(self, page):
+        self.model.set_page(page)
+        self.update_pager()
+
+    def update_pager(self):
+        m = self.model
+        self.page_label.setText(f"Página {m.page + 1} de {m.pages()} ({m.total} atajados)")
+        self.prev_btn.setEnabled(m.page > 0)
+        self.next_btn.setEnabled(m.page + 1 < m.pages())
@@ -0,0 +1,82 @@
+import datetime
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+import analytics
+from database import Database
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:
+    pyarrow = None
+
+@unittest.skipIf(pyarrow is None, "PyArrow no está instalado")
+class AnalyticsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(':memory:')
+        self.db.execute("INSERT INTO items(name, total, incidence, active) VALUES('A', 10, 1, 1)")
+        self.db.execute("INSERT INTO items(name, total, incidence, active) VALUES('B', 5, 1, 0)")
+        for num, com in ((1, "Norte"), (2, "Norte"), (3, "Sur")):
+            self.db.execute("INSERT INTO atajados(number, comunidad) VALUES(?,?)", (num, com))
+        self.db.record_progress(1, 1, 100, "2024-01-05")
+        self.db.record_progress(3, 1, 40, "2024-02-01")
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_tables_keep_their_types(self):
+        for fmt in analytics.FORMATS:
+            out = os.path.join(self.tmp.name, fmt)
+            counts = analytics.export_snapshot(self.db, out, fmt, row_group=2)
+            self.assertEqual(counts["atajados"], 3)
+            path = lambda name: os.path.join(out, name + analytics.FORMATS[fmt])
+            items = analytics.read_snapshot(path("items"))
+            self.assertEqual(items.column("active").to_pylist(), [True, False])
+            self.assertEqual(str(items.schema.field("duration").type), "int64")
+            ataj = analytics.read_snapshot(path("atajados"))
+            self.assertEqual(ataj.column("last_date").to_pylist(),
+                             [datetime.date(2024, 1, 5), None, datetime.date(2024, 2, 1)])
+            self.assertEqual(str(ataj.schema.field("progress").type), "double")
+            coms = analytics.read_snapshot(path("comunidades")).to_pylist()
+            self.assertEqual([(c["comunidad"], c["atajados"], c["ejecutados"]) for c in coms],
+                             [("Norte", 2, 1), ("Sur", 1, 0)])
+            per_item = analytics.read_snapshot(path("comunidad_items")).to_pylist()
+            self.assertEqual([(r["comunidad"], r["progress"]) for r in per_item],
+                             [("Norte", 50.0), ("Sur", 40.0)])
+
+    def test_parquet_is_written_by_row_group(self):
+        import pyarrow.parquet as pq
+        with self.db.transaction() as cur:
+            cur.executemany("INSERT INTO atajados(number) VALUES(?)", [(n,) for n in range(10, 15)])
+        analytics.export_snapshot(self.db, self.tmp.name, "parquet", row_group=3)
+        meta = pq.ParquetFile(os.path.join(self.tmp.name, "atajados.parquet")).metadata
+        self.assertEqual((meta.num_rows, meta.num_row_groups), (8, 3))
+
+    def test_export_does_not_lock_out_writers(self):
+        path = os.path.join(self.tmp.name, "obra.db")
+        self.db.save_as(path)
+        db = Database(path)
+        writer = sqlite3.connect(path, timeout=0.2)
+        write = analytics._write
+
+        def write_while_exporting(*args):
+            # Otro usuario guarda a mitad de la exportación
+            writer.execute("UPDATE atajados SET comunidad='Este' WHERE number=2")
+            writer.commit()
+            return write(*args)
+        try:
+            with mock.patch("analytics._write", side_effect=write_while_exporting):
+                counts = analytics.export_snapshot(db, os.path.join(self.tmp.name, "out"))
+            self.assertEqual(counts["atajados"], 3)
+            self.assertEqual(db.fetchall("SELECT comunidad FROM atajados WHERE number=2"),
+                             [("Este",)])
+        finally:
+            writer.close()
+            db.close()
+
+if __name__ == '__main__':
+    unittest.main()
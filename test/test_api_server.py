@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from api_server import ApiServer
+from database import Database
+
+class ApiServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "obra.db")
+        self.db = Database(self.path)
+        self.db.execute(
+            "INSERT INTO items(name, unit, total, incidence, active) VALUES(?,?,?,?,?)",
+            ("Item", "u", 1, 10, 1),
+        )
+        self.db.execute("INSERT INTO atajados(number, beneficiario) VALUES(1, 'Ana')")
+        self.db.record_progress(1, 1, 100, '2024-01-01')
+        self.server = ApiServer(("127.0.0.1", 0), self.path, pool_size=2)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = "http://127.0.0.1:%d" % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.db.close()
+        self.tmp.cleanup()
+
+    def get(self, path, etag=None):
+        req = urllib.request.Request(self.base + path)
+        if etag:
+            req.add_header("If-None-Match", etag)
+        try:
+            with urllib.request.urlopen(req) as resp:
+                return resp.status, resp.headers.get("ETag"), json.loads(resp.read())
+        except urllib.error.HTTPError as err:
+            return err.code, err.headers.get("ETag"), None
+
+    def test_dashboard_and_conditional_requests(self):
+        status, etag, data = self.get("/api/dashboard")
+        self.assertEqual(status, 200)
+        self.assertEqual(data["status"]["ejecutados"], 1)
+        self.assertEqual(self.get("/api/dashboard", etag)[0], 304)
+
+        self.db.execute("INSERT INTO atajados(number, beneficiario) VALUES(2, 'Luis')")
+        status, new_etag, data = self.get("/api/dashboard", etag)
+        self.assertEqual(status, 200)
+        self.assertNotEqual(new_etag, etag)
+        self.assertEqual(data["status"]["total"], 2)
+
+    def test_summary_and_unknown_path(self):
+        status, _, data = self.get("/api/summary")
+        self.assertEqual(data["rows"][0]["beneficiario"], "Ana")
+        self.assertEqual(self.get("/api/nada")[0], 404)
+
+if __name__ == '__main__':
+    unittest.main()
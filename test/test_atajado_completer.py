@@ -0,0 +1,35 @@
+import os
+import unittest
+from database import Database
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+try:
+    from PyQt6.QtWidgets import QApplication
+    from atajado_completer import AtajadoSelector
+except ImportError:  # PyQt6 no instalado
+    AtajadoSelector = None
+
+@unittest.skipIf(AtajadoSelector is None, "requires PyQt6")
+class AtajadoSelectorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = QApplication.instance() or QApplication([])
+        self.db = Database(':memory:')
+        for num, ben in ((7, "Ana – María"), (12, "Luis")):
+            self.db.execute("INSERT INTO atajados(number, beneficiario) VALUES(?,?)", (num, ben))
+        self.selector = AtajadoSelector(self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_first_match_uses_model_numbers(self):
+        self.selector.setText("lu")
+        self.assertEqual(self.selector.first_match(), 12)
+        # El texto mostrado tras elegir no se vuelve a interpretar
+        self.selector.show_atajado(7)
+        self.assertEqual(self.selector.text(), "7 – Ana – María")
+        self.assertEqual(self.selector.first_match(), 7)
+        self.selector.setText("①")
+        self.assertIsNone(self.selector.first_match())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+import photo_pack
+from backup import SnapshotManager
+from database import Database
+
+class BackupTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.tmp.name, "obra.db")
+        self.images = os.path.join(self.tmp.name, "images")
+        os.makedirs(os.path.join(self.images, "1"))
+        with open(os.path.join(self.images, "1", "a.jpg"), "wb") as fh:
+            fh.write(b"foto")
+        self.db = Database(self.db_file)
+        self.db.execute("INSERT INTO atajados(number, beneficiario) VALUES(1, 'Ana')")
+        self.manager = SnapshotManager(self.db_file, os.path.join(self.tmp.name, "snap"),
+                                       self.images, keep=2)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_snapshots_copy_photos_once_and_rotate(self):
+        first = self.manager.create(pages=1)
+        self.assertEqual(first["copied_images"], 1)
+        self.assertEqual(self.manager.create()["copied_images"], 0)
+        self.manager.create()
+        self.assertEqual(len(self.manager.snapshots()), 2)
+
+    def test_restore_database_and_photos(self):
+        done = []
+        self.assertTrue(self.manager.start(done.append))
+        self.manager.wait()
+        snap = done[0]
+        self.db.execute("DELETE FROM atajados")
+        os.remove(os.path.join(self.images, "1", "a.jpg"))
+        self.db.close()
+        info = self.manager.restore(snap["id"])
+        self.assertEqual(info["restored_images"], 1)
+        self.db = Database(self.db_file)
+        self.assertEqual(self.db.fetchall("SELECT beneficiario FROM atajados"), [("Ana",)])
+        self.assertTrue(os.path.isfile(os.path.join(self.images, "1", "a.jpg")))
+
+    def test_same_named_projects_keep_separate_snapshots(self):
+        other_dir = os.path.join(self.tmp.name, "otra")
+        os.makedirs(other_dir)
+        other_file = os.path.join(other_dir, "obra.db")
+        Database(other_file).close()
+        other = SnapshotManager(other_file, os.path.join(self.tmp.name, "snap"),
+                                self.images, keep=1)
+        self.manager.create()
+        self.manager.create()
+        other.create()
+        other.create()
+        self.assertNotEqual(other.root, self.manager.root)
+        self.assertEqual(len(self.manager.snapshots()), 2)
+        self.assertEqual(len(other.snapshots()), 1)
+
+    def test_repacking_stores_only_new_photos(self):
+        with open(os.path.join(self.images, "1", "b.jpg"), "wb") as fh:
+            fh.write(b"b" * 5000)
+        photo_pack.pack_all(self.images)
+        self.assertEqual(self.manager.create()["copied_images"], 2)
+        os.makedirs(os.path.join(self.images, "1"))
+        with open(os.path.join(self.images, "1", "c.jpg"), "wb") as fh:
+            fh.write(b"nueva")
+        photo_pack.pack_all(self.images)
+        snap = self.manager.create()
+        self.assertEqual(snap["copied_images"], 1)
+        self.assertEqual(sorted(snap["packs"]["1.pack"]["members"]), ["a.jpg", "b.jpg", "c.jpg"])
+        self.assertFalse(any(rel.endswith(".pack") for rel in snap["images"]))
+        # Restaurar reconstruye el paquete a partir de sus fotos
+        first = self.manager.snapshots()[1]
+        self.db.close()
+        self.assertEqual(self.manager.restore(first["id"])["restored_images"], 2)
+        self.db = Database(self.db_file)
+        with photo_pack.PhotoPack(os.path.join(self.images, "1.pack")) as pack:
+            self.assertEqual(pack.names(), ["a.jpg", "b.jpg"])
+            self.assertEqual(pack.read("b.jpg"), b"b" * 5000)
+
+if __name__ == '__main__':
+    unittest.main()
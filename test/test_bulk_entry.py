@@ -0,0 +1,55 @@
+import unittest
+from bulk_entry import BulkEntry, parse_percent, parse_sheet
+from database import Database
+
+class BulkEntryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(':memory:')
+        self.db.execute("INSERT INTO items(name, total, incidence, active) VALUES('Excavación', 10, 1, 1)")
+        self.db.execute("INSERT INTO items(name, total, incidence, active) VALUES('Muro', 30, 1, 1)")
+        for num, com in ((1, "Norte"), (2, "Norte"), (3, "Sur")):
+            self.db.execute("INSERT INTO atajados(number, comunidad) VALUES(?,?)", (num, com))
+        self.db.record_progress(1, 1, 100, "2024-01-05")
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_parse_percent(self):
+        self.assertEqual(parse_percent(" 50% "), 50)
+        self.assertEqual(parse_percent("12,5"), 12.5)
+        for bad in ("abc", "101", "-1"):
+            with self.assertRaises(ValueError):
+                parse_percent(bad)
+
+    def test_paste_sheet_and_validate(self):
+        entry = BulkEntry.load(self.db, "Norte")
+        self.assertEqual(entry.numbers, [1, 2])
+        self.assertEqual(entry.value(1, 1), "100")
+        # Planilla con encabezados: columnas por nombre o id, filas por número
+        changed = entry.paste(parse_sheet("Atajado\tmuro\t1\r\n2\t50%\t25\r\n9\t10\t10\r\n1\t75\t100\r\n"))
+        self.assertEqual(sorted(changed), [(1, 1), (1, 2), (2, 1), (2, 2)])
+        entry.paste([["x"]], row=1, col=1)
+        entries, errors = entry.validate()
+        self.assertEqual(errors, [(2, 2, "'x' no es un porcentaje")])
+        entry.set(2, 2, "")
+        entries, errors = entry.validate()
+        self.assertEqual(errors, [])
+        # Sin cambios respecto a lo guardado (1, 1) no se vuelve a escribir
+        self.assertEqual(sorted(entries), [(1, 2, 75.0, None), (2, 1, 25.0, None)])
+
+    def test_bulk_write_refreshes_once_and_checks_versions(self):
+        version = self.db.fetchall("SELECT row_version FROM avances")[0][0]
+        self.db.record_progress(1, 1, 50, "2024-01-06")  # otro usuario guarda primero
+        conflicts = self.db.record_progress_bulk(
+            [(1, 1, 25, version), (1, 2, 100, None), (3, 1, 100, None), (3, 2, 100, None)],
+            "2024-02-01")
+        self.assertEqual(conflicts, [(1, 1)])
+        rows = self.db.fetchall("SELECT number, progress, status FROM atajados ORDER BY number")
+        self.assertEqual(rows, [(1, 87.5, "En ejecución"), (2, 0, None), (3, 100, "Ejecutado")])
+        self.assertEqual(self.db.fetchall("SELECT value FROM app_state WHERE key='deferred'"), [])
+        # Los triggers vuelven a recalcular por fila después de la carga masiva
+        self.db.record_progress(2, 1, 40, "2024-02-02")
+        self.assertEqual(self.db.fetchall("SELECT progress FROM atajados WHERE number=2"), [(40,)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+from database import Database
+
+try:
+    from PyQt6.QtCore import QCoreApplication
+    from change_watcher import ChangeWatcher
+except ImportError:  # PyQt6 no instalado
+    ChangeWatcher = None
+
+@unittest.skipIf(ChangeWatcher is None, "requires PyQt6")
+class ChangeWatcherTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = QCoreApplication.instance() or QCoreApplication([])
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "compartida.db")
+        self.mine, self.other = Database(path), Database(path)
+        self.watcher = ChangeWatcher(self.mine, debounce=0)
+
+    def tearDown(self):
+        self.watcher.stop()
+        self.mine.close(); self.other.close()
+        self.tmp.cleanup()
+
+    def test_reports_tables_changed_by_other_connection(self):
+        self.mine.execute("INSERT INTO items(name) VALUES('propio')")
+        self.assertEqual(self.watcher.poll(), set())  # sin commits ajenos no se consulta nada
+        self.other.execute("INSERT INTO atajados(number) VALUES(1)")
+        self.assertEqual(self.watcher.poll(), {"items", "atajados"})  # incluye el cambio propio
+        self.assertEqual(self.watcher.poll(), set())
+
+        received = []
+        self.watcher.tablesChanged.connect(received.append)
+        self.other.execute("INSERT INTO avances(atajado_id, item_id, quantity) VALUES(1, 1, 50)")
+        self.watcher.poll()
+        self.other.execute("UPDATE items SET total=2")
+        self.watcher.poll()
+        for _ in range(1000):
+            if received:
+                break
+            self.app.processEvents()
+        # avances también cambia atajados (progreso en caché) e ítems
+        self.assertEqual(received, [{"avances", "atajados", "items"}])
+
+if __name__ == '__main__':
+    unittest.main()
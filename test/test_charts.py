@@ -0,0 +1,59 @@
+import datetime
+import os
+import tempfile
+import unittest
+from database import Database
+from charts import chart_jobs, gantt_tasks, plot_gantt, render_job, run_jobs
+
+class ChartsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(':memory:')
+        self.db.execute(
+            "INSERT INTO items(name, unit, total, incidence, active) VALUES(?,?,?,?,?)",
+            ("Excavación", "m3", 1, 10, 1),
+        )
+        for num, com in ((1, "Norte"), (2, "Sur Alto")):
+            self.db.execute("INSERT INTO atajados(number, comunidad) VALUES(?,?)", (num, com))
+        self.db.record_progress(1, 1, 50, '2024-01-01')
+        self.db.record_progress(2, 1, 100, '2024-02-01')
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_gantt_tasks_per_comunidad(self):
+        self.assertEqual(gantt_tasks(self.db)[0]["days"], 31)
+        self.assertEqual(gantt_tasks(self.db, "Norte")[0]["days"], 0)
+
+    def test_far_forecast_does_not_stretch_the_axis(self):
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.dates as mdates
+        from matplotlib.figure import Figure
+        today = datetime.date(2024, 6, 1)
+        tasks = gantt_tasks(self.db)
+        tasks[0]["forecast"] = datetime.date(2065, 1, 1)
+        ax = Figure().add_subplot(111)
+        plot_gantt(ax, tasks, today=today)
+        self.assertLess(mdates.num2date(ax.get_xlim()[1]).year, 2028)
+
+    def test_jobs_render_in_worker_processes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            jobs = chart_jobs(self.db, tmp, formats=("png", "svg"), dpi=50)
+            self.assertEqual([os.path.basename(j["path"]) for j in jobs],
+                             ["estados", "gantt", "gantt_Norte", "gantt_Sur_Alto"])
+            self.assertEqual(render_job(jobs[0]), [jobs[0]["path"] + ".png", jobs[0]["path"] + ".svg"])
+            paths = run_jobs(jobs[1:], max_workers=2)
+            self.assertEqual(len(paths), 6)
+            self.assertTrue(all(os.path.getsize(p) > 0 for p in paths))
+
+    def test_comunidad_jobs_get_unique_names_and_critical_path(self):
+        self.db.execute("INSERT INTO atajados(number, comunidad) VALUES(3, 'Sur/Alto')")
+        self.db.record_progress(3, 1, 25, '2024-03-01')
+        with tempfile.TemporaryDirectory() as tmp:
+            jobs = chart_jobs(self.db, tmp)
+        self.assertEqual([os.path.basename(j["path"]) for j in jobs[2:]],
+                         ["gantt_Norte", "gantt_Sur_Alto", "gantt_Sur_Alto_2"])
+        self.assertTrue(all("float" in t for j in jobs[1:] for t in j["tasks"]))
+
+if __name__ == '__main__':
+    unittest.main()
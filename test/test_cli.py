@@ -0,0 +1,55 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+import cli
+from database import Database
+
+class CliTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "obra.db")
+        db = Database(self.path)
+        db.execute(
+            "INSERT INTO items(name, unit, total, incidence, active) VALUES(?,?,?,?,?)",
+            ("Item", "u", 1, 10, 1),
+        )
+        db.execute("INSERT INTO atajados(number) VALUES(1)")
+        db.execute("INSERT INTO atajados(number) VALUES(2)")
+        db.execute(
+            "INSERT INTO avances(atajado_id,item_id,date,quantity) VALUES(?,?,?,?)",
+            (1, 1, '2024-01-01', 100),
+        )
+        db.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_cli(self, *argv):
+        out, err = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            code = cli.main(["--db", self.path, *argv])
+        return code, json.loads(out.getvalue() or err.getvalue())
+
+    def test_recompute_and_progress(self):
+        code, doc = self.run_cli("recompute")
+        self.assertEqual(code, 0)
+        self.assertEqual(doc["result"]["atajados"], 2)
+        code, doc = self.run_cli("progress")
+        self.assertEqual(doc["result"]["status"], {"Ejecutado": 1, "Pendiente": 1})
+        self.assertAlmostEqual(doc["result"]["project_progress"], 100.0)
+
+    def test_errors_are_reported_as_json(self):
+        code, doc = self.run_cli("sync-import", os.path.join(self.tmp.name, "missing.atsync"))
+        self.assertEqual(code, 1)
+        self.assertFalse(doc["ok"])
+        # Base que no se puede abrir: también error JSON, no una traza
+        self.path = os.path.join(self.tmp.name, "no", "existe", "obra.db")
+        code, doc = self.run_cli("progress")
+        self.assertEqual(code, 1)
+        self.assertFalse(doc["ok"])
+
+if __name__ == '__main__':
+    unittest.main()
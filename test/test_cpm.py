@@ -0,0 +1,52 @@
+import random
+import unittest
+from cpm import CriticalPath, schedule_tasks
+from charts import gantt_tasks
+from database import Database
+
+class CriticalPathTestCase(unittest.TestCase):
+    def test_dates_float_and_critical_path(self):
+        cp = CriticalPath({1: 5, 2: 3, 3: 4, 4: 2}, {3: [1, 2], 4: [2]})
+        self.assertEqual(cp.end, 9)
+        self.assertEqual(cp.critical(), [1, 3])
+        self.assertEqual(cp.dates(2), (0, 3, 2, 5))
+        self.assertEqual(cp.slack(4), 4)
+
+    def test_cycle_is_rejected(self):
+        with self.assertRaises(ValueError):
+            CriticalPath({1: 1, 2: 1}, {1: [2], 2: [1]})
+
+    def test_incremental_update_matches_full_recalculation(self):
+        rng = random.Random(3)
+        nodes = list(range(60))
+        deps = {n: rng.sample(nodes[:n], min(n, rng.randint(0, 3))) for n in nodes}
+        durations = {n: rng.randint(0, 10) for n in nodes}
+        cp = CriticalPath(durations, deps)
+        for _ in range(200):
+            node, days = rng.choice(nodes), rng.randint(0, 10)
+            durations[node] = days
+            cp.set_duration(node, days)
+            full = CriticalPath(durations, deps)
+            self.assertEqual((cp.es, cp.ls, cp.end), (full.es, full.ls, full.end))
+
+    def test_schedule_tasks_uses_planned_durations(self):
+        db = Database(':memory:')
+        db.execute("INSERT INTO atajados(number) VALUES(1)")
+        db.execute("INSERT INTO atajados(number) VALUES(2)")
+        for name in ("A", "B"):
+            db.execute("INSERT INTO items(name, total, incidence, active) VALUES(?,1,1,1)", (name,))
+        db.record_progress(1, 1, 50, "2024-01-01")
+        db.record_progress(2, 1, 50, "2024-01-10")
+        db.record_progress(1, 2, 50, "2024-01-03")
+        db.set_item_dependencies(2, [1])
+        db.execute("UPDATE items SET duration=4 WHERE id=2")
+        tasks = gantt_tasks(db)
+        cp = schedule_tasks(db, tasks)
+        self.assertEqual(cp.end, 13)  # 9 días observados de A + 4 planificados de B
+        self.assertEqual([(t["id"], t["c"], t["p"]) for t in tasks], [(1, 1, ""), (2, 1, "1")])
+        db.execute("DELETE FROM items WHERE id=1")
+        self.assertEqual(db.item_dependencies(), {})
+        db.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,9 @@
+import os
+import sqlite3
+import tempfile
 import unittest
-from database import Database
+from unittest import mock
+from database import Database, retry_locked
 
 class DatabaseTestCase(unittest.TestCase):
     def setUp(self):
@@ -16,5 +20,91 @@ class DatabaseTestCase(unittest.TestCase):
         rows = self.db.fetchall("SELECT name, unit FROM items")
         self.assertEqual(rows[0], ("Item1", "u"))
 
+    def test_search_atajados_by_prefix(self):
+        for num, ben, com in ((1, "Ana", "Norte"), (12, "Luis", "Sur"),
+                              (120, "ana_b", "Sur"), (21, "Pedro", "Norte")):
+            self.db.execute("INSERT INTO atajados(number, beneficiario, comunidad) VALUES(?,?,?)",
+                            (num, ben, com))
+        numbers = lambda text: [r[1] for r in self.db.search_atajados(text)]
+        self.assertEqual(numbers("12"), [12, 120])
+        self.assertEqual(numbers("an"), [1, 120])
+        self.assertEqual(numbers("ana_"), [120])
+        self.assertEqual(numbers("nor"), [1, 21])
+        self.assertEqual(numbers("²"), [])  # isdigit() pero no es un número
+        self.assertEqual(len(self.db.search_atajados("", limit=2)), 2)
+
+    def test_record_progress_checks_version(self):
+        self.db.execute("INSERT INTO items(name, total, incidence, active) VALUES('A', 1, 1, 1)")
+        self.db.execute("INSERT INTO atajados(number) VALUES(1)")
+        self.assertTrue(self.db.record_progress(1, 1, 50, "2024-01-01", version=None))
+        version = self.db.fetchall("SELECT row_version FROM avances")[0][0]
+        # Otro usuario guarda primero: la versión leída ya no es la actual
+        self.assertTrue(self.db.record_progress(1, 1, 75, "2024-01-02", version=version))
+        self.assertFalse(self.db.record_progress(1, 1, 100, "2024-01-03", version=version))
+        self.assertFalse(self.db.record_progress(1, 1, 100, "2024-01-03", version=None))
+        self.assertEqual(self.db.fetchall("SELECT quantity FROM avances"), [(75,)])
+        # Cambios sin versión (sincronización, importaciones) también la suben
+        self.db.execute("UPDATE avances SET quantity=25")
+        self.assertEqual(self.db.fetchall("SELECT row_version FROM avances")[0][0], version + 2)
+
+    def test_summary_page_sorts_and_filters_in_sql(self):
+        self.db.execute("INSERT INTO items(name, total, incidence, active) VALUES('A', 1, 1, 1)")
+        for num, ben in ((1, "Ana"), (2, "luis"), (3, "Pedro"), (12, "Beto")):
+            self.db.execute("INSERT INTO atajados(number, beneficiario) VALUES(?,?)", (num, ben))
+        self.db.record_progress(1, 1, 50, "2024-01-05")
+        self.db.record_progress(3, 1, 20, "2024-02-01")
+        self.db.record_progress(1, 1, 80, "2024-03-01")
+        numbers = lambda **kw: [r[0] for r in self.db.summary_page(**kw)]
+        # Por defecto: último avance más reciente primero, sin avances al final
+        self.assertEqual(numbers(), [1, 3, 12, 2])
+        self.assertEqual(numbers(sort=1, descending=False), [1, 12, 2, 3])
+        self.assertEqual(numbers(sort=3, descending=True, limit=2), [1, 3])
+        self.assertEqual(numbers(sort=0, descending=False, offset=1, limit=2), [2, 3])
+        self.assertEqual(numbers(text="1", sort=0, descending=False), [1, 12])
+        self.assertEqual(self.db.summary_count("1"), 2)
+        # La fecha en caché sigue a los avances borrados
+        self.db.execute("DELETE FROM avances WHERE atajado_id=1")
+        self.assertEqual(self.db.summary_page(text="1", sort=0, descending=False, limit=1),
+                         [(1, "Ana", "", 0)])
+
+    def test_retry_policy(self):
+        locked = sqlite3.OperationalError("database is locked")
+        outcomes = [locked, locked, "ok"]
+
+        def flaky():
+            result = outcomes.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        with mock.patch("database.time.sleep") as sleep, \
+                mock.patch("database.random.random", return_value=0.5):
+            self.assertEqual(retry_locked(flaky, retries=3, base=0.1), "ok")
+            self.assertEqual([c.args[0] for c in sleep.call_args_list], [0.1, 0.2])
+            # Se rinde tras agotar los intentos y no reintenta otros errores
+            sleep.reset_mock()
+            with self.assertRaises(sqlite3.OperationalError):
+                retry_locked(mock.Mock(side_effect=locked), retries=2, base=0.1)
+            self.assertEqual(sleep.call_count, 2)
+            sleep.reset_mock()
+            with self.assertRaises(sqlite3.OperationalError):
+                retry_locked(mock.Mock(side_effect=sqlite3.OperationalError("no such table: x")))
+            sleep.assert_not_called()
+
+    def test_locked_writes_are_retried(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "p.db")
+            db = Database(path)
+            other = sqlite3.connect(path, isolation_level=None)
+            other.execute("BEGIN IMMEDIATE")
+            db.conn.execute("PRAGMA busy_timeout = 0")
+            # La otra conexión suelta el archivo durante la primera espera
+            with mock.patch("database.time.sleep",
+                            side_effect=lambda s: other.in_transaction and other.execute("COMMIT")) as sleep:
+                db.execute("INSERT INTO items(name) VALUES('x')")
+            self.assertEqual(sleep.call_count, 1)
+            self.assertEqual(db.fetchall("SELECT COUNT(*) FROM items")[0][0], 1)
+            other.close()
+            db.close()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
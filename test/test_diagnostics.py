@@ -0,0 +1,55 @@
+import os
+import unittest
+from unittest import mock
+import diagnostics
+import ui_bench
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:      5000 |      45000 |   matplotlib.pyplot
+import time:      2000 |      40000 |     matplotlib
+import time:       800 |      60000 | app
+"""
+
+class DiagnosticsTestCase(unittest.TestCase):
+    def test_parse_importtime(self):
+        modules = diagnostics.parse_importtime(IMPORTTIME)
+        self.assertEqual(modules["app"], (800, 60000, 0))
+        self.assertEqual(modules["matplotlib"], (2000, 40000, 2))
+        self.assertEqual(len(modules), 4)
+
+    def test_package_of(self):
+        site = os.path.join("venv", "lib", "site-packages")
+        self.assertEqual(diagnostics.package_of(os.path.join(site, "matplotlib", "text.py")),
+                         "matplotlib")
+        self.assertEqual(diagnostics.package_of(os.path.join(site, "six.py")), "six")
+        self.assertEqual(diagnostics.package_of(os.path.join(diagnostics.HERE, "app.py")),
+                         "proyecto")
+        self.assertEqual(diagnostics.package_of("<frozen importlib._bootstrap_external>"),
+                         "importlib")
+
+    def test_compare_flags_only_real_regressions(self):
+        old = {"imports": {"total_ms": 900.0, "packages_ms": {"matplotlib": 370.0}},
+               "steps": [{"step": "ventana", "added_mb": 6.0, "ms": 2000.0}],
+               "widgets": {"tabs": {"Ítems": 66}}}
+        new = {"imports": {"total_ms": 1400.0,
+                           "packages_ms": {"matplotlib": 380.0, "pandas": 300.0}},
+               "steps": [{"step": "ventana", "added_mb": 7.0, "ms": 2100.0}],
+               "widgets": {"tabs": {"Ítems": 400}}}
+        self.assertEqual(diagnostics.compare(old, new), [
+            "importación total: 900.0 → 1400.0 ms",
+            "importación de pandas: 0.0 → 300.0 ms",
+            "widgets de Ítems: 66 → 400 widgets",
+        ])
+
+    def test_current_rss_without_proc(self):
+        self.assertGreater(diagnostics.current_rss_mb(), 0)
+        # Como en Windows: sin /proc ni resource se usan los contadores del proceso
+        with mock.patch("builtins.open", side_effect=OSError), \
+                mock.patch.object(ui_bench, "resource", None), \
+                mock.patch.object(ui_bench, "process_memory", return_value=(5 * 2**20, 9 * 2**20)):
+            self.assertEqual(diagnostics.current_rss_mb(), 5.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from database import Database
+from edit_buffer import EditBuffer
+
+class EditBufferTestCase(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(':memory:')
+        for name in ("A", "B"):
+            self.db.execute(
+                "INSERT INTO items(name, unit, total, incidence, active) VALUES(?,?,?,?,?)",
+                (name, "u", 1.0, 2.0, 0),
+            )
+        self.buffer = EditBuffer(self.db, "items", ("name", "total", "incidence"))
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_edits_are_coalesced_until_flush(self):
+        self.buffer.record(1, "total", 1.0, 3.0)
+        self.buffer.record(1, "total", 3.0, 4.0)
+        self.buffer.record(1, "incidence", 2.0, 5.0)
+        self.buffer.record(2, "name", "B", "B2")
+        self.assertEqual(self.db.fetchall("SELECT total FROM items WHERE id=1")[0][0], 1.0)
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertFalse(self.buffer.dirty)
+        rows = self.db.fetchall("SELECT name, total, incidence FROM items ORDER BY id")
+        self.assertEqual(rows, [("A", 4.0, 5.0), ("B2", 1.0, 2.0)])
+
+    def test_undo_redo_after_flush(self):
+        self.buffer.record(1, "name", "A", "A1")
+        self.buffer.flush()
+        edit = self.buffer.undo()
+        self.assertEqual((edit.row_id, edit.column, edit.old), (1, "name", "A"))
+        self.buffer.flush()
+        self.assertEqual(self.db.fetchall("SELECT name FROM items WHERE id=1")[0][0], "A")
+        self.buffer.redo()
+        self.buffer.flush()
+        self.assertEqual(self.db.fetchall("SELECT name FROM items WHERE id=1")[0][0], "A1")
+        self.assertIsNone(self.buffer.redo())
+
+    def _other_user(self, sql):
+        self.db.execute(sql)
+
+    def test_conflicting_edit_is_reported(self):
+        self.buffer.set_versions(dict(self.db.fetchall("SELECT id, row_version FROM items")))
+        self.buffer.record(1, "total", 1.0, 3.0)
+        self._other_user("UPDATE items SET total=7 WHERE id=1")
+        self.assertEqual(self.buffer.flush(), 0)
+        [conflict] = self.buffer.conflicts
+        self.assertEqual((conflict.mine, conflict.theirs), ({"total": 3.0}, {"total": 7.0}))
+        self.assertEqual(self.db.fetchall("SELECT total FROM items WHERE id=1")[0][0], 7.0)
+        # El usuario conserva su valor
+        self.assertTrue(self.buffer.resolve(conflict, {"total": 3.0}))
+        self.assertEqual(self.db.fetchall("SELECT total FROM items WHERE id=1")[0][0], 3.0)
+
+    def test_disjoint_edits_are_merged(self):
+        self.buffer.set_versions(dict(self.db.fetchall("SELECT id, row_version FROM items")))
+        self.buffer.record(1, "total", 1.0, 3.0)
+        self._other_user("UPDATE items SET name='A2' WHERE id=1")
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(self.buffer.conflicts, [])
+        self.assertEqual(self.db.fetchall("SELECT name, total FROM items WHERE id=1"), [("A2", 3.0)])
+        # La versión conocida sigue a la escrita: la siguiente edición no choca
+        self.buffer.record(1, "total", 3.0, 4.0)
+        self.assertEqual(self.buffer.flush(), 1)
+
+    def test_unknown_column_rejected(self):
+        with self.assertRaises(KeyError):
+            self.buffer.record(1, "id", 1, 2)
+
+if __name__ == '__main__':
+    unittest.main()
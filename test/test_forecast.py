@@ -0,0 +1,73 @@
+import datetime
+import os
+import unittest
+from database import Database
+from forecast import BUDGET_S, CompletionForecast, benchmark, synthetic_database, to_day
+
+class ForecastTestCase(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(':memory:')
+        for name in ("A", "B"):
+            self.db.execute("INSERT INTO items(name, total, incidence, active) VALUES(?,1,1,1)", (name,))
+        for num, com in ((1, "Norte"), (2, "Norte"), (3, "Sur")):
+            self.db.execute("INSERT INTO atajados(number, comunidad) VALUES(?,?)", (num, com))
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_history_is_recorded_by_triggers(self):
+        self.db.record_progress(1, 1, 25, "2024-01-01", "2023-12-22")
+        self.db.record_progress(1, 1, 50, "2024-01-11")
+        self.db.record_progress(1, 1, 60, "2024-01-11")
+        rows = self.db.fetchall("SELECT day, quantity FROM avance_history ORDER BY day")
+        self.assertEqual(rows, [(to_day(datetime.date(2024, 1, 1)), 25),
+                                (to_day(datetime.date(2024, 1, 11)), 60)])
+        self.db.execute("DELETE FROM atajados WHERE number=1")
+        self.assertEqual(self.db.fetchall("SELECT COUNT(*) FROM avance_history")[0][0], 0)
+
+    def test_linear_progress_is_extrapolated(self):
+        # Ítem A del atajado 1: 2.5 %/día; el ítem B ya terminó
+        self.db.record_progress(1, 1, 0, "2024-01-01")
+        self.db.record_progress(1, 1, 25, "2024-01-11")
+        self.db.record_progress(1, 2, 100, "2024-01-05")
+        fc = CompletionForecast.load(self.db, today=datetime.date(2024, 1, 11))
+        self.assertEqual(fc.by_atajado()[1], datetime.date(2024, 2, 10))
+        # Los pares sin historia avanzan desde hoy al ritmo mediano (40 días)
+        self.assertEqual(fc.by_atajado()[3], datetime.date(2024, 2, 20))
+        self.assertEqual(fc.by_item()[2], datetime.date(2024, 2, 20))
+        self.assertEqual(fc.by_comunidad()["Norte"], datetime.date(2024, 2, 20))
+
+    def test_no_rate_means_no_forecast(self):
+        self.db.record_progress(1, 1, 30, "2024-01-01")
+        fc = CompletionForecast.load(self.db, today=datetime.date(2024, 1, 11))
+        self.assertIsNone(fc.by_atajado()[1])
+        self.assertIsNone(fc.by_comunidad()["Sur"])
+
+    def test_far_projection_means_no_forecast(self):
+        # 1 % en cinco meses daría fin de obra en 2065
+        self.db.record_progress(1, 1, 0, "2024-01-01")
+        self.db.record_progress(1, 1, 1, "2024-06-01")
+        self.db.record_progress(1, 2, 100, "2024-06-01")
+        fc = CompletionForecast.load(self.db, today=datetime.date(2024, 6, 1))
+        self.assertEqual(fc.by_atajado(), {1: None, 2: None, 3: None})
+        self.assertEqual(fc.by_item(), {1: None, 2: None})
+
+    def test_synthetic_database_loads(self):
+        db = Database(':memory:')
+        try:
+            synthetic_database(db, 100, 5, 4)
+            self.assertEqual(db.fetchall("SELECT COUNT(*) FROM avance_history"), [(2000,)])
+            fc = CompletionForecast.load(db, today=datetime.date(2023, 2, 12))
+            self.assertEqual(fc.finish.shape, (100, 5))
+            self.assertEqual(len(fc.by_comunidad()), 50)
+        finally:
+            db.close()
+
+    @unittest.skipUnless(os.environ.get("ATAJADOS_BENCH") == "1",
+                         "medición de tiempo: ATAJADOS_BENCH=1 para ejecutarla")
+    def test_ten_thousand_atajados_load_under_a_second(self):
+        # Camino real: leer 800 000 filas de avance_history y pronosticar
+        self.assertLess(benchmark(10_000, 20, 4), BUDGET_S)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing
+from database import Database
+
+# Esquema anterior al versionado (user_version 0, sin columnas en caché)
+LEGACY_SCHEMA = """
+CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, unit TEXT, total REAL,
+                    incidence REAL, active INTEGER DEFAULT 0);
+CREATE TABLE atajados (id INTEGER PRIMARY KEY, number INTEGER, comunidad TEXT,
+                       beneficiario TEXT, ci TEXT, coord_e REAL, coord_n REAL,
+                       start_date TEXT, end_date TEXT, status TEXT,
+                       observations TEXT, photo TEXT);
+CREATE TABLE avances (id INTEGER PRIMARY KEY, atajado_id INTEGER, item_id INTEGER,
+                      date TEXT, quantity REAL, start_date TEXT, end_date TEXT);
+CREATE TABLE cronograma (id INTEGER PRIMARY KEY, hito TEXT NOT NULL,
+                         date TEXT NOT NULL, obs TEXT);
+INSERT INTO items VALUES (1, 'Item', 'u', 1, 10, 1);
+INSERT INTO atajados(number, beneficiario) VALUES (1, 'Ana'), (2, 'Luis');
+INSERT INTO avances(atajado_id, item_id, date, quantity) VALUES (1, 1, '2024-01-02', 100);
+"""
+
+class MigrationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "legacy.db")
+        with closing(sqlite3.connect(self.path)) as conn:
+            conn.executescript(LEGACY_SCHEMA)
+        self.db = Database(self.path)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_legacy_database_is_upgraded(self):
+        self.assertEqual(self.db.schema_version(), len(Database.MIGRATIONS))
+        self.assertEqual(self.db.fetchall("SELECT number, status FROM atajados ORDER BY number"),
+                         [(1, "Ejecutado"), (2, None)])
+        self.assertEqual(self.db.fetchall("SELECT day FROM avances"), [(19724,)])
+        indexes = {r[0] for r in self.db.fetchall("SELECT name FROM sqlite_master WHERE type='index'")}
+        self.assertLessEqual({"idx_avances_atajado_item", "idx_avances_item",
+                              "idx_avances_day", "idx_atajados_number"}, indexes)
+        plan = self.db.fetchall(
+            "EXPLAIN QUERY PLAN SELECT * FROM avances WHERE day BETWEEN 19700 AND 19800")
+        self.assertIn("idx_avances_day", plan[0][-1])
+        # reabrir no vuelve a migrar
+        self.assertEqual(self.db.migrate(), [])
+
+    def test_day_columns_follow_text_dates(self):
+        self.db.execute("UPDATE avances SET date='2024-01-03', start_date='2024-01-01'")
+        self.assertEqual(self.db.fetchall("SELECT day, start_day, end_day FROM avances"),
+                         [(19725, 19723, None)])
+
+    def test_avances_follow_their_atajado(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.execute("INSERT INTO avances(atajado_id, item_id, quantity) VALUES(9, 1, 10)")
+        self.db.execute("UPDATE atajados SET number=5 WHERE number=1")
+        self.assertEqual(self.db.fetchall("SELECT atajado_id FROM avances"), [(5,)])
+        self.db.execute("DELETE FROM atajados WHERE number=5")
+        self.assertEqual(self.db.fetchall("SELECT COUNT(*) FROM avances"), [(0,)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+import photo_pack
+
+class PhotoPackTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.images = os.path.join(self.tmp.name, "images")
+        for name, data in (("b.jpg", b"bbbb"), ("a.jpg", b"a" * 3000), ("ñ.png", b"png")):
+            self.write(7, name, data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, number, name, data):
+        folder = os.path.join(self.images, str(number))
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, name), "wb") as fh:
+            fh.write(data)
+
+    def test_pack_then_add_loose_photos(self):
+        self.assertEqual(photo_pack.pack_all(self.images), {"7": 3})
+        self.assertEqual(os.listdir(self.images), ["7.pack"])
+        with photo_pack.PhotoPack(os.path.join(self.images, "7.pack")) as pack:
+            self.assertEqual(pack.names(), ["a.jpg", "b.jpg", "ñ.png"])
+            self.assertEqual(pack.read("a.jpg"), b"a" * 3000)
+            self.assertNotIn("c.jpg", pack)
+            self.assertEqual(pack.verify(), [])
+        # Foto nueva suelta y otra que reemplaza a una empaquetada
+        self.write(7, "c.jpg", b"cc")
+        self.write(7, "b.jpg", b"nueva")
+        listed = photo_pack.photos(7, self.images)
+        self.assertEqual([(p.name, p.packed) for p in listed],
+                         [("a.jpg", True), ("b.jpg", False), ("c.jpg", False), ("ñ.png", True)])
+        self.assertEqual(dict((p.name, d) for p, d in photo_pack.read_photos(listed))["b.jpg"],
+                         b"nueva")
+        self.assertEqual(photo_pack.pack_atajado(7, self.images), 2)
+        listed = photo_pack.photos(7, self.images)
+        self.assertTrue(all(p.packed for p in listed))
+        self.assertEqual(photo_pack.read_photo(listed[1]), b"nueva")
+
+    def test_rejects_damaged_pack(self):
+        photo_pack.pack_atajado(7, self.images)
+        path = os.path.join(self.images, "7.pack")
+        with open(path, "r+b") as fh:
+            fh.truncate(os.path.getsize(path) - 4)
+        with self.assertRaises(ValueError):
+            photo_pack.PhotoPack(path)
+        self.write(7, "d.jpg", b"dd")
+        self.assertEqual([p.name for p in photo_pack.loose_photos(7, self.images)], ["d.jpg"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -27,5 +27,27 @@ class ProgressTestCase(unittest.TestCase):
         pct = self.db.get_project_progress()
         self.assertAlmostEqual(pct, 75.0)
 
+    def test_cached_status_follows_triggers(self):
+        self.db.execute(
+            "INSERT INTO items(name, unit, total, incidence, active) VALUES(?,?,?,?,?)",
+            ("A", "u", 1, 10, 1),
+        )
+        self.db.execute(
+            "INSERT INTO items(name, unit, total, incidence, active) VALUES(?,?,?,?,?)",
+            ("B", "u", 1, 30, 1),
+        )
+        self.db.execute("INSERT INTO atajados(number) VALUES(1)")
+        state = lambda: self.db.fetchall("SELECT progress, status FROM atajados")[0]
+        self.assertEqual(state(), (0, None))
+        self.db.record_progress(1, 1, 100, '2024-01-01')
+        self.db.record_progress(1, 2, 50, '2024-01-02')
+        self.assertAlmostEqual(state()[0], 62.5)
+        self.assertEqual(state()[1], 'En ejecución')
+        # desactivar el ítem incompleto deja el atajado ejecutado
+        self.db.execute("UPDATE items SET active=0 WHERE id=2")
+        self.assertEqual(state(), (100, 'Ejecutado'))
+        self.db.execute("DELETE FROM avances")
+        self.assertEqual(state(), (0, None))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
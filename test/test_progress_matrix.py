@@ -0,0 +1,54 @@
+import unittest
+from database import Database
+
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    numpy = None
+
+@unittest.skipIf(numpy is None, "NumPy no está instalado")
+class ProgressMatrixTestCase(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(':memory:')
+        self.db.execute(
+            "INSERT INTO items(name, unit, total, incidence, active, progress) VALUES(?,?,?,?,?,?)",
+            ("Global", "u", 1, 10, 0, 100),
+        )
+        self.db.execute(
+            "INSERT INTO items(name, unit, total, incidence, active, progress) VALUES(?,?,?,?,?,?)",
+            ("PorAtajado", "u", 1, 10, 1, 0),
+        )
+        for num, com in ((1, "Norte"), (2, "Norte"), (3, "Sur")):
+            self.db.execute("INSERT INTO atajados(number, comunidad) VALUES(?,?)", (num, com))
+        self.db.record_progress(1, 2, 50, '2024-01-01')
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_matches_sql_progress(self):
+        matrix = self.db.progress_matrix()
+        self.assertAlmostEqual(matrix.project_progress(), self.db.get_project_progress())
+        totals = matrix.totals()
+        self.assertAlmostEqual(totals["atajados"][1], 50.0)
+        self.assertAlmostEqual(totals["comunidades"]["Norte"], 25.0)
+
+    def test_writes_keep_matrix_in_sync(self):
+        matrix = self.db.progress_matrix()
+        self.db.record_progress(2, 2, 100, '2024-01-02')
+        self.assertIs(self.db.progress_matrix(), matrix)
+        self.assertAlmostEqual(matrix.project_progress(), self.db.get_project_progress())
+        self.db.execute("UPDATE items SET incidence=20 WHERE id=2")
+        self.assertIsNot(self.db.progress_matrix(), matrix)
+
+    def test_what_if_does_not_touch_database(self):
+        matrix = self.db.progress_matrix()
+        before = matrix.project_progress()
+        result = matrix.what_if(comunidades={"Sur": 100})
+        # ítem por atajado: promedio de 50 y 100 -> 75; global 100 -> proyecto 87.5
+        self.assertAlmostEqual(result["project"], 87.5)
+        self.assertAlmostEqual(result["comunidades"]["Sur"], 100.0)
+        self.assertAlmostEqual(matrix.project_progress(), before)
+        self.assertEqual(self.db.fetchall("SELECT COUNT(*) FROM avances"), [(1,)])
+
+if __name__ == '__main__':
+    unittest.main()
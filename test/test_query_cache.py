@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from database import Database
+from query_cache import QueryCache
+
+class QueryCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache.db")
+        self.db = Database(self.path)
+        self.db.execute("INSERT INTO items(name, total, incidence, active) VALUES('A',10,1,1)")
+        for num in (1, 2):
+            self.db.execute("INSERT INTO atajados(number, comunidad) VALUES(?, 'Norte')", (num,))
+        self.db.record_progress(1, 1, 50, "2024-01-01")
+
+    def tearDown(self):
+        if self.db.conn:
+            self.db.close()
+        self.tmp.cleanup()
+
+    def test_invalidated_only_by_its_tables(self):
+        self.assertEqual(self.db.get_project_progress(), 50.0)
+        self.db.get_project_progress()
+        self.assertEqual((self.db.cache.hits, self.db.cache.misses), (1, 1))
+        self.db.execute("INSERT INTO cronograma(hito, date) VALUES('Inicio', '2024-01-01')")
+        self.db.get_project_progress()
+        self.assertEqual(self.db.cache.hits, 2)
+        self.db.record_progress(2, 1, 100, "2024-01-02")
+        self.assertEqual(self.db.get_project_progress(), 75.0)
+        self.assertEqual(self.db.cache.misses, 2)
+
+    def test_bypassed_inside_transactions(self):
+        with self.db.transaction() as cur:
+            cur.execute("UPDATE atajados SET status='Ejecutado' WHERE number=2")
+            self.assertEqual(self.db.status_counts()["ejecutados"], 1)
+        self.assertEqual(len(self.db.cache), 0)
+
+    def test_reopened_database_reuses_saved_results(self):
+        counts = self.db.status_counts()
+        progress = self.db.get_project_progress()
+        self.db.cached("no_literal", ("items",), object)  # no se guarda
+        self.db.close()
+        self.db = Database(self.path)
+        self.assertEqual(self.db.status_counts(), counts)
+        self.assertEqual(self.db.get_project_progress(), progress)
+        self.assertEqual((self.db.cache.hits, self.db.cache.misses), (2, 0))
+        # Al cerrar se descartan los resultados de tablas modificadas
+        self.db.execute("UPDATE atajados SET status='Ejecutado' WHERE number=2")
+        self.db.cached("other", ("items",), lambda: 1)
+        self.db.close()
+        self.db = Database(self.path)
+        self.assertEqual([r[0] for r in self.db.fetchall("SELECT name FROM query_cache")],
+                         ["get_project_progress", "other"])
+
+    def test_lru_eviction_and_size_cap(self):
+        cache = QueryCache(max_entries=2, max_bytes=10_000)
+        cache.put(("a", ()), (), 1)
+        cache.put(("b", ()), (), 2)
+        cache.get(("a", ()), ())
+        cache.put(("c", ()), (), 3)
+        self.assertEqual(list(cache.entries), [("a", ()), ("c", ())])
+        cache.put(("big", ()), (), "x" * 20_000)
+        self.assertNotIn(("big", ()), cache.entries)
+        self.assertLessEqual(cache.nbytes, 10_000)
+
+if __name__ == '__main__':
+    unittest.main()
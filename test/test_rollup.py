@@ -0,0 +1,59 @@
+import random
+import unittest
+from database import Database
+
+class RollupTestCase(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(':memory:')
+        for name in ("A", "B", "C"):
+            self.db.execute("INSERT INTO items(name, total, incidence, active) VALUES(?,10,1,1)", (name,))
+        for num in range(1, 7):
+            self.db.execute("INSERT INTO atajados(number, comunidad) VALUES(?,?)",
+                            (num, "Norte" if num <= 3 else "Sur"))
+
+    def tearDown(self):
+        self.db.close()
+
+    def snapshot(self):
+        return self.db.fetchall(
+            "SELECT comunidad, item_id, avances, pct_sum, done, started "
+            "FROM rollup_comunidad_item WHERE avances != 0 ORDER BY 1, 2")
+
+    def test_triggers_match_full_rebuild(self):
+        rng = random.Random(5)
+        for _ in range(150):
+            op = rng.random()
+            num = rng.randint(1, 8)
+            if op < 0.6:
+                if self.db.fetchall("SELECT 1 FROM atajados WHERE number=?", (num,)):
+                    self.db.record_progress(num, rng.randint(1, 3), rng.choice((0, 25, 50, 100)),
+                                            "2024-01-01")
+            elif op < 0.75:
+                self.db.execute("UPDATE atajados SET comunidad=? WHERE number=?",
+                                (rng.choice(("Norte", "Sur", "Este", None)), num))
+            elif op < 0.85:
+                self.db.execute("UPDATE atajados SET number=? WHERE number=?", (rng.randint(1, 8), num))
+            elif op < 0.93:
+                self.db.execute("DELETE FROM atajados WHERE number=?", (num,))
+            else:
+                self.db.execute("INSERT INTO atajados(number, comunidad) VALUES(?,?)",
+                                (num, rng.choice(("Norte", "Sur"))))
+            incremental = self.snapshot()
+            self.db.rebuild_rollup()
+            self.assertEqual(incremental, self.snapshot())
+
+    def test_community_and_item_figures(self):
+        self.db.record_progress(1, 1, 100, "2024-01-01")
+        self.db.record_progress(2, 1, 50, "2024-01-01")
+        self.db.record_progress(4, 2, 50, "2024-01-01")
+        rows = {r[0]: r for r in self.db.rollup_comunidades()}
+        # 30 de costo activo repartido entre 6 atajados: 5 por atajado
+        self.assertEqual(rows["Norte"][1:4], (3, 15.0, 2.5))
+        self.assertAlmostEqual(rows["Norte"][4], 100 * 2.5 / 15)
+        self.assertEqual(rows["Sur"][5:], (0, 1, 2))
+        items = self.db.rollup_items("Norte")
+        self.assertEqual(items[0], (1, "A", 5.0, 2.5, 50.0, 1, 1, 1))
+        self.assertEqual(items[1][5:], (0, 0, 3))
+
+if __name__ == '__main__':
+    unittest.main()
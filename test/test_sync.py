@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+from database import Database
+from sync import export_delta, import_delta
+
+class SyncTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.office = Database(':memory:')
+        self.tablet = Database(':memory:')
+        for db in (self.office, self.tablet):
+            db.execute("INSERT OR REPLACE INTO app_state VALUES('node_id', ?)", (str(id(db)),))
+            db.execute(
+                "INSERT INTO items(name, unit, total, incidence, active) VALUES(?,?,?,?,?)",
+                ("Item", "u", 1, 10, 1),
+            )
+            db.execute("INSERT INTO atajados(number, beneficiario) VALUES(1, 'Ana')")
+            # ambas copias parten del mismo archivo maestro
+            db.execute("DELETE FROM changelog")
+
+    def tearDown(self):
+        self.office.close()
+        self.tablet.close()
+        self.tmp.cleanup()
+
+    def package(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_delta_contains_only_new_changes(self):
+        export_delta(self.tablet, self.package("first.atsync"))
+        self.tablet.execute(
+            "INSERT INTO avances(atajado_id,item_id,date,quantity) VALUES(?,?,?,?)",
+            (1, 1, '2024-01-01', 100),
+        )
+        info = export_delta(self.tablet, self.package("second.atsync"))
+        self.assertEqual((info["upserts"], info["deletes"]), (1, 0))
+
+        result = import_delta(self.office, self.package("second.atsync"))
+        self.assertEqual(result["applied"], 1)
+        self.assertEqual(
+            self.office.fetchall("SELECT quantity FROM avances WHERE atajado_id=1 AND item_id=1"),
+            [(100,)],
+        )
+        self.assertEqual(
+            self.office.fetchall("SELECT status FROM atajados WHERE number=1"), [("Ejecutado",)]
+        )
+        # aplicar el mismo paquete de nuevo no cambia nada
+        self.assertEqual(import_delta(self.office, self.package("second.atsync"))["applied"], 0)
+
+    def test_last_writer_wins(self):
+        self.office.execute(
+            "INSERT INTO avances(atajado_id,item_id,date,quantity) VALUES(?,?,?,?)",
+            (1, 1, '2024-01-01', 25),
+        )
+        self.tablet.execute(
+            "INSERT INTO avances(atajado_id,item_id,date,quantity) VALUES(?,?,?,?)",
+            (1, 1, '2024-01-02', 75),
+        )
+        # la oficina escribe después: su cambio es el más reciente
+        self.office.execute(
+            "UPDATE changelog SET changed_at='2999-01-01T00:00:00.000Z' WHERE tbl='avances'"
+        )
+        export_delta(self.tablet, self.package("tablet.atsync"))
+        result = import_delta(self.office, self.package("tablet.atsync"))
+        self.assertEqual(result["skipped"], 1)
+        self.assertEqual(self.office.fetchall("SELECT quantity FROM avances"), [(25,)])
+
+        export_delta(self.office, self.package("office.atsync"))
+        import_delta(self.tablet, self.package("office.atsync"))
+        self.assertEqual(self.tablet.fetchall("SELECT quantity FROM avances"), [(25,)])
+
+    def test_deletes_are_propagated(self):
+        self.office.execute("DELETE FROM atajados WHERE number=1")
+        self.assertEqual(
+            self.office.fetchall("SELECT op FROM changelog WHERE tbl='atajados'"), [("D",)]
+        )
+        export_delta(self.office, self.package("del.atsync"))
+        import_delta(self.tablet, self.package("del.atsync"))
+        self.assertEqual(self.tablet.fetchall("SELECT COUNT(*) FROM atajados"), [(0,)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+try:
+    from PyQt6.QtCore import QCoreApplication, QObject
+    from PyQt6.QtGui import QPalette
+    import theme
+except ImportError:  # PyQt6 no instalado
+    theme = None
+
+if theme is not None:
+    class FakeApp(QObject):
+        """Records what ThemeManager asks the application to change."""
+        def __init__(self):
+            super().__init__()
+            self.palettes, self.calls = {}, []
+        def setStyle(self, name): self.calls.append(("style", name))
+        def setFont(self, font): self.calls.append(("font", font.family()))
+        def setStyleSheet(self, qss): self.calls.append(("qss", qss))
+        def setPalette(self, pal, class_name=None):
+            self.palettes[class_name] = pal.color(QPalette.ColorRole.Button).name()
+
+@unittest.skipIf(theme is None, "requires PyQt6")
+class ThemeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.qt = QCoreApplication.instance() or QCoreApplication([])
+        self.app = FakeApp()
+        self.manager = theme.ThemeManager(self.app)
+        self.seen = []
+        self.manager.changed.connect(self.seen.append)
+
+    def test_switches_palettes_without_stylesheets(self):
+        self.assertEqual(self.app.palettes, {None: "#d0e8ff", "QPushButton": "#1976d2"})
+        self.manager.apply(True)
+        self.manager.apply(True)  # ya activo: no se vuelve a aplicar
+        self.assertEqual(self.seen, [True])
+        self.assertEqual(self.app.palettes, {None: "#353535", "QPushButton": "#0d6efd"})
+        self.manager.toggle()
+        self.assertEqual(self.seen, [True, False])
+        self.assertNotIn("qss", [c[0] for c in self.app.calls])
+
+    def test_style_axes(self):
+        from matplotlib.figure import Figure
+        fig = Figure()
+        ax = fig.add_subplot(111)
+        ax.set_title("Gantt")
+        theme.style_axes(fig, dark=True)
+        self.assertEqual(fig.get_facecolor()[:3], (30 / 255,) * 3)
+        self.assertEqual(ax.title.get_color(), theme.colors(True)["chart_fg"])
+
+if __name__ == '__main__':
+    unittest.main()
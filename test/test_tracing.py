@@ -0,0 +1,45 @@
+import atexit
+import importlib
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import tracing
+
+class TracingTestCase(unittest.TestCase):
+    def tearDown(self):
+        importlib.reload(tracing)
+
+    def test_disabled_is_a_no_op(self):
+        with mock.patch.dict(os.environ, {tracing.TRACE_ENV: ""}):
+            importlib.reload(tracing)
+        func = lambda: 1
+        self.assertIs(tracing.traced()(func), func)
+        with tracing.span("nada"):
+            pass
+        self.assertEqual(tracing._events, [])
+
+    def test_spans_are_written_as_chrome_trace(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            with mock.patch.dict(os.environ, {tracing.TRACE_ENV: path}):
+                importlib.reload(tracing)
+            atexit.unregister(tracing.flush)
+
+            @tracing.traced("suma", "calc", args=lambda a, b: {"a": a})
+            def suma(a, b):
+                with tracing.span("interno"):
+                    return a + b
+
+            self.assertEqual(suma(2, 3), 5)
+            self.assertEqual(tracing.flush(), path)
+            with open(path, encoding="utf-8") as fh:
+                events = json.load(fh)["traceEvents"]
+        spans = {e["name"]: e for e in events if e["ph"] == "X"}
+        self.assertEqual(spans["suma"]["args"], {"a": 2})
+        self.assertLessEqual(spans["suma"]["ts"], spans["interno"]["ts"])
+        self.assertTrue(any(e["ph"] == "M" for e in events))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from database import Database
+import ui_bench
+from ui_bench import check_budget, generate_database
+
+class UiBenchTestCase(unittest.TestCase):
+    def test_generated_database(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            generate_database(path, atajados=20, items=5, fill=1.0)
+            db = Database(path)
+            try:
+                self.assertEqual(db.fetchall("SELECT COUNT(*) FROM avances"), [(100,)])
+                self.assertEqual(db.status_counts()["pendientes"], 0)
+            finally:
+                db.close()
+
+    def test_check_budget(self):
+        flows = {"a": {"ms": 120.0, "peak_mb": 1.0}, "b": {"ms": 5.0, "peak_mb": 9.0}}
+        budget = {"a": {"ms": 100.0, "peak_mb": 2.0}, "b": {"ms": 10.0}, "c": {"ms": 1.0}}
+        self.assertEqual(check_budget(flows, budget), ["a: ms 120.0 > 100.0"])
+
+    def test_peak_rss_without_resource_module(self):
+        self.assertGreater(ui_bench.peak_rss_mb() or 1, 0)
+        # Como en Windows: sin el módulo resource se usan los contadores del proceso
+        with mock.patch.object(ui_bench, "resource", None), \
+                mock.patch.object(ui_bench, "process_memory", return_value=(2**20, 3 * 2**20)):
+            self.assertEqual(ui_bench.peak_rss_mb(), 3.0)
+        with mock.patch.object(ui_bench, "resource", None), \
+                mock.patch.object(ui_bench, "process_memory", return_value=None):
+            self.assertIsNone(ui_bench.peak_rss_mb())
+
+if __name__ == '__main__':
+    unittest.main()
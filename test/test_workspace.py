@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from database import Database
+from workspace import Workspace, portfolio
+
+class WorkspaceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = [os.path.join(self.tmp.name, f"obra {n}.db") for n in (1, 2)]
+        for path, pct in zip(self.paths, (100, 50)):
+            db = Database(path)
+            db.execute(
+                "INSERT INTO items(name, unit, total, incidence, active) VALUES(?,?,?,?,?)",
+                ("Item", "u", 1, 10, 1),
+            )
+            db.execute("INSERT INTO atajados(number) VALUES(1)")
+            db.execute("INSERT INTO atajados(number) VALUES(2)")
+            db.execute(
+                "INSERT INTO avances(atajado_id,item_id,date,quantity) VALUES(?,?,?,?)",
+                (1, 1, '2024-01-01', pct),
+            )
+            db.close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_portfolio_combines_projects(self):
+        result = portfolio(self.paths + [os.path.join(self.tmp.name, "missing.db")])
+        self.assertEqual([p["name"] for p in result["projects"]], ["obra 1", "obra 2"])
+        self.assertAlmostEqual(result["projects"][1]["progress"], 50.0)
+        self.assertEqual(result["total"]["atajados"], 4)
+        self.assertEqual(result["total"]["ejecutados"], 1)
+        self.assertEqual(result["total"]["en_ejecucion"], 1)
+        self.assertEqual(result["total"]["pendientes"], 2)
+        self.assertAlmostEqual(result["total"]["progress"], 75.0)
+
+    def test_portfolio_skips_unreadable_projects(self):
+        bad = os.path.join(self.tmp.name, "notas.db")
+        with open(bad, "wb") as fh:
+            fh.write(b"esto no es una base de datos" * 100)
+        other = os.path.join(self.tmp.name, "otra.db")
+        sqlite3.connect(other).close()
+        result = portfolio([bad, self.paths[0], other, self.paths[1]])
+        self.assertEqual([p["name"] for p in result["projects"]], ["obra 1", "obra 2"])
+        self.assertEqual([p["name"] for p in result["skipped"]], ["notas", "otra"])
+        self.assertIn("not a database", result["skipped"][0]["error"])
+        self.assertEqual(result["total"]["atajados"], 4)
+
+    def test_workspace_remembers_current_project(self):
+        ws_file = os.path.join(self.tmp.name, "workspace.json")
+        ws = Workspace(ws_file)
+        ws.open(self.paths[0])
+        ws.open(self.paths[1])
+        reloaded = Workspace(ws_file)
+        self.assertEqual(reloaded.projects, [os.path.abspath(p) for p in self.paths])
+        self.assertEqual(reloaded.current_or_default(), os.path.abspath(self.paths[1]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Light and dark themes switched through ``QPalette``.
+
+A stylesheet change makes Qt re-polish every widget, including the
+thousands of per-cell editors of the big tables, and widgets matched by any
+stylesheet rule keep the colours resolved when they were polished. Colours
+are therefore carried only by palettes on the Fusion style, which repaints
+on a palette change without re-polishing. :class:`ThemeManager` builds the
+application palette and the class palettes (accent buttons, table headers)
+of both themes once, swaps them on :meth:`ThemeManager.apply` and emits
+:attr:`ThemeManager.changed` so charts can restyle themselves::
+
+    theme = ThemeManager(app)
+    theme.changed.connect(dashboard.set_theme)
+    theme.apply(dark=True)
+
+Charts read their colours from :data:`THEMES` through :func:`colors`;
+:func:`style_axes` applies them to a matplotlib figure.
+"""
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QPalette
+
+FONT = ("Segoe UI", 12)
+
+THEMES = {
+    "light": {
+        "window": "#ffffff", "text": "#202020", "base": "#f9f9f9", "alternate": "#e8f0fe",
+        "header": "#d0e8ff", "border": "#cccccc", "accent": "#1976D2", "accent_text": "#ffffff",
+        "muted": "#777777", "chart_bg": "#ffffff", "chart_fg": "#202020", "chart_bars": "skyblue",
+    },
+    "dark": {
+        "window": "#1e1e1e", "text": "#e0e0e0", "base": "#272727", "alternate": "#1f1f1f",
+        "header": "#353535", "border": "#444444", "accent": "#0d6efd", "accent_text": "#ffffff",
+        "muted": "#b0b0b0", "chart_bg": "#1e1e1e", "chart_fg": "#dddddd", "chart_bars": "#5dade2",
+    },
+}
+
+
+def colors(dark: bool) -> dict:
+    """Colour table of the dark or light theme."""
+    return THEMES["dark" if dark else "light"]
+
+
+def build_palettes(c: dict) -> tuple:
+    """``(application palette, {class name: palette})`` of one colour table."""
+    R = QPalette.ColorRole
+
+    def palette(roles):
+        pal = QPalette()
+        for role, name in roles.items():
+            pal.setColor(role, QColor(c[name]))
+        return pal
+
+    base = {
+        R.Window: "window", R.WindowText: "text", R.Base: "base", R.AlternateBase: "alternate",
+        R.Text: "text", R.Button: "header", R.ButtonText: "text", R.ToolTipBase: "base",
+        R.ToolTipText: "text", R.PlaceholderText: "muted", R.Highlight: "accent",
+        R.HighlightedText: "accent_text", R.Mid: "border", R.Link: "accent",
+    }
+    # Botones con el color de acento; encabezados de tabla con el de cabecera
+    buttons = {**base, R.Button: "accent", R.ButtonText: "accent_text"}
+    return palette(base), {"QPushButton": palette(buttons)}
+
+
+class ThemeManager(QObject):
+    """Owns the application look; ``changed(dark)`` fires after every switch."""
+
+    changed = pyqtSignal(bool)
+
+    def __init__(self, app, dark: bool = False):
+        super().__init__(app)
+        self.app = app
+        app.setStyle("Fusion")
+        app.setFont(QFont(*FONT))
+        self.palettes = {name: build_palettes(c) for name, c in THEMES.items()}
+        self.dark = None
+        self.apply(dark)
+
+    def apply(self, dark: bool) -> None:
+        """Switch to the dark or light palettes (no-op if already active)."""
+        dark = bool(dark)
+        if dark == self.dark:
+            return
+        self.dark = dark
+        palette, by_class = self.palettes["dark" if dark else "light"]
+        self.app.setPalette(palette)
+        for class_name, pal in by_class.items():
+            self.app.setPalette(pal, class_name)
+        self.changed.emit(dark)
+
+    def toggle(self) -> None:
+        self.apply(not self.dark)
+
+
+def style_axes(figure, dark: bool) -> None:
+    """Recolour a matplotlib *figure* (background, axes, ticks, labels)."""
+    c = colors(dark)
+    figure.set_facecolor(c["chart_bg"])
+    for ax in figure.axes:
+        ax.set_facecolor(c["chart_bg"])
+        for spine in ax.spines.values():
+            spine.set_color(c["chart_fg"])
+        ax.tick_params(colors=c["chart_fg"], which="both")
+        for text in (ax.title, ax.xaxis.label, ax.yaxis.label):
+            text.set_color(c["chart_fg"])
+        for line in ax.get_xgridlines():
+            line.set_color(c["chart_fg"])
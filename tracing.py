@@ -0,0 +1,115 @@
+"""Lightweight tracing spans exported in Chrome trace format.
+
+Tracing is enabled with the ``ATAJADOS_TRACE`` environment variable: a file
+name, or ``1`` for ``logs/trace-<fecha>.json``. The file is written at exit
+(or by :func:`flush`) and opens in ``chrome://tracing`` or
+https://ui.perfetto.dev::
+
+    ATAJADOS_TRACE=lento.json python app.py
+
+When the variable is not set, :func:`traced` returns the decorated function
+unchanged and :func:`span` returns a shared no-op context manager, so
+instrumented code pays nothing beyond that check.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+TRACE_ENV = "ATAJADOS_TRACE"
+TRACE_DIR = "logs"
+# Límite de eventos en memoria; los siguientes se descartan
+MAX_EVENTS = 500_000
+
+_target = os.environ.get(TRACE_ENV, "").strip()
+ENABLED = bool(_target) and _target != "0"
+TRACE_FILE = (os.path.join(TRACE_DIR, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+              if _target in ("1", "true", "yes") else _target)
+
+_events = []
+_lock = threading.Lock()
+_threads = {}
+_dropped = 0
+_NULL = nullcontext()
+_PID = os.getpid()
+
+
+def _now_us() -> float:
+    return time.perf_counter_ns() / 1000.0
+
+
+def _record(name: str, cat: str, start: float, end: float, args) -> None:
+    global _dropped
+    thread = threading.current_thread()
+    event = {"name": name, "cat": cat, "ph": "X", "ts": start, "dur": end - start,
+             "pid": _PID, "tid": thread.ident}
+    if args:
+        event["args"] = args
+    with _lock:
+        _threads.setdefault(thread.ident, thread.name)
+        if len(_events) < MAX_EVENTS:
+            _events.append(event)
+        else:
+            _dropped += 1
+
+
+@contextmanager
+def _span(name, cat, args):
+    start = _now_us()
+    try:
+        yield
+    finally:
+        _record(name, cat, start, _now_us(), args)
+
+
+def span(name: str, cat: str = "app", **args):
+    """Context manager timing the enclosed block as one span."""
+    if not ENABLED:
+        return _NULL
+    return _span(name, cat, args)
+
+
+def traced(name: str = None, cat: str = "app", args=None):
+    """Decorator recording each call as a span.
+
+    *args*, if given, is called with the function's arguments and returns
+    a dict shown in the trace viewer (e.g. the SQL of a query).
+    """
+    def decorate(func):
+        if not ENABLED:
+            return func
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*a, **k):
+            start = _now_us()
+            try:
+                return func(*a, **k)
+            finally:
+                _record(label, cat, start, _now_us(), args(*a, **k) if args else None)
+        return wrapper
+    return decorate
+
+
+def flush(path: str = None) -> str:
+    """Write all recorded spans to *path* (default: ``TRACE_FILE``)."""
+    path = path or TRACE_FILE
+    with _lock:
+        events = list(_events)
+        threads = dict(_threads)
+    meta = [{"name": "thread_name", "ph": "M", "pid": _PID, "tid": tid, "args": {"name": tname}}
+            for tid, tname in threads.items()]
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"traceEvents": meta + events, "displayTimeUnit": "ms",
+                   "otherData": {"dropped": _dropped}}, fh)
+    return path
+
+
+if ENABLED:
+    atexit.register(flush)
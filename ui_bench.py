@@ -0,0 +1,273 @@
+"""Offscreen performance harness for the main window.
+
+Generates a large project database, boots :class:`app.MainWindow` with the
+``offscreen`` Qt platform and drives the common user flows. Each flow
+records its wall time and the peak of Python allocations during the flow
+(``tracemalloc``); the process's peak RSS is reported as well. Results are
+compared against the budgets in ``ui_budget.json`` and the exit status is 1
+when any flow exceeds them::
+
+    python ui_bench.py                      # 2000 atajados × 60 ítems
+    python ui_bench.py --atajados 200 --json resultados.json
+    python ui_bench.py --update-budget      # guarda presupuestos = medición × 1,4
+
+The run happens inside a temporary directory so ``workspace.json`` and the
+``images/`` folder of the real installation are not touched. Message boxes
+are answered automatically.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+try:
+    import resource
+except ImportError:  # Windows: no hay getrusage
+    resource = None
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BUDGET_FILE = os.path.join(HERE, "ui_budget.json")
+# Margen aplicado a la medición al guardar presupuestos nuevos
+BUDGET_FACTOR = 1.4
+# Holgura fija para que los flujos de pocos milisegundos no fallen por ruido
+BUDGET_SLACK_MS = 50.0
+
+
+def process_memory():
+    """``(current, peak)`` resident memory of this process in bytes on Windows.
+
+    Returns None on other platforms or when the counters are not available.
+    """
+    if sys.platform != "win32":
+        return None
+    import ctypes
+    from ctypes import wintypes
+
+    class Counters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = Counters()
+    counters.cb = ctypes.sizeof(counters)
+    kernel32 = ctypes.WinDLL("kernel32")
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    ok = kernel32.K32GetProcessMemoryInfo(
+        wintypes.HANDLE(kernel32.GetCurrentProcess()), ctypes.byref(counters), counters.cb)
+    if not ok:
+        return None
+    return counters.WorkingSetSize, counters.PeakWorkingSetSize
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None if it cannot be read."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (2**20 if sys.platform == "darwin" else 1024), 1)
+    memory = process_memory()
+    return round(memory[1] / 2**20, 1) if memory else None
+
+
+def generate_database(path: str, atajados: int = 2000, items: int = 60,
+                      fill: float = 0.5, seed: int = 1) -> None:
+    """Create a project with *atajados* × *items* and ~*fill* of the avances."""
+    from database import Database
+    rng = random.Random(seed)
+    db = Database(path)
+    start = date(2024, 1, 1)
+    with db.transaction() as cur:
+        cur.executemany(
+            "INSERT INTO items(name, unit, total, incidence, active, progress) VALUES(?,?,?,?,?,?)",
+            [(f"Ítem {i:03d}", "u", rng.randint(1, 500), round(rng.uniform(5, 900), 2),
+              int(i % 5 != 0), rng.choice((0, 50, 100))) for i in range(1, items + 1)],
+        )
+        cur.executemany(
+            "INSERT INTO atajados(number, comunidad, beneficiario, ci) VALUES(?,?,?,?)",
+            [(n, f"Comunidad {n % 40:02d}", f"Beneficiario {rng.randint(1, 10**6):07d}",
+              str(rng.randint(10**6, 10**7))) for n in range(1, atajados + 1)],
+        )
+        avances = []
+        for n in range(1, atajados + 1):
+            for i in range(1, items + 1):
+                if rng.random() < fill:
+                    day = start + timedelta(days=rng.randint(0, 365))
+                    avances.append((n, i, day.isoformat(), rng.choice((25, 50, 75, 100)),
+                                    day.isoformat(), (day + timedelta(days=7)).isoformat()))
+        cur.executemany(
+            "INSERT INTO avances(atajado_id, item_id, date, quantity, start_date, end_date) "
+            "VALUES(?,?,?,?,?,?)",
+            avances,
+        )
+    db.close()
+
+
+class Bench:
+    """Runs flows and keeps their measurements."""
+
+    def __init__(self, app):
+        self.app = app
+        self.results = {}
+
+    def measure(self, name: str, flow) -> None:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        flow()
+        self.app.processEvents()
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1] - base
+        self.results[name] = {"ms": round(elapsed * 1000, 1),
+                              "peak_mb": round(max(peak, 0) / 2**20, 2)}
+
+
+def answer_dialogs() -> None:
+    """Answer the modal message boxes automatically (Ok / Yes)."""
+    from PyQt6.QtWidgets import QMessageBox
+    for name in ("information", "warning", "critical"):
+        setattr(QMessageBox, name, staticmethod(lambda *a, **k: QMessageBox.StandardButton.Ok))
+    QMessageBox.question = staticmethod(lambda *a, **k: QMessageBox.StandardButton.Yes)
+
+
+def run_flows(atajados: int, items: int, seed: int = 1) -> dict:
+    """Generate the data, boot the window and measure every flow."""
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    answer_dialogs()
+
+    cwd = os.getcwd()
+    tmp = tempfile.TemporaryDirectory()
+    os.chdir(tmp.name)
+    tracemalloc.start()
+    try:
+        db_file = os.path.join(tmp.name, "bench.db")
+        t0 = time.perf_counter()
+        generate_database(db_file, atajados, items, seed=seed)
+        setup_s = time.perf_counter() - t0
+
+        from app import MainWindow
+        bench = Bench(app)
+        holder = {}
+        bench.measure("startup", lambda: holder.setdefault("w", MainWindow(db_file)))
+        w = holder["w"]
+        w.show()
+        app.processEvents()
+
+        rng = random.Random(seed)
+        numbers = rng.sample(range(1, atajados + 1), min(20, atajados))
+        bench.measure("refresh_all", w.refresh_all)
+        bench.measure("items_refresh", w.items_tab.refresh)
+
+        def switch_atajados():
+            for n in numbers:
+                w.avance_tab.load_items(n)
+        bench.measure("switch_atajado_x20", switch_atajados)
+
+        def save_progress():
+            table = w.avance_tab.table
+            for r in range(table.rowCount()):
+                table.cellWidget(r, 9).setCurrentIndex(rng.randint(0, 4))
+            w.avance_tab.save_progress()
+        bench.measure("save_progress", save_progress)
+
+        def filter_items():
+            for text in ("Ítem 0", "Ítem 01", "Ítem 012", "zz", ""):
+                w.items_tab.search.setText(text)
+        bench.measure("filter_items", filter_items)
+
+        def gantt_scale():
+            for scale in ("100", "60", "20", "80"):
+                w.cronograma_tab.cmb_scale.setCurrentText(scale)
+        bench.measure("gantt_scale", gantt_scale)
+        bench.measure("draw_gantt", w.cronograma_tab.draw_gantt)
+
+        # Cambio de tema con la tabla de Seguimiento (editores por celda) a la vista
+        w.tabs.setCurrentWidget(w.avance_tab)
+        app.processEvents()
+
+        def toggle_theme():
+            for checked in (True, False, True, False):
+                w.theme_toggle.setChecked(checked)
+                app.processEvents()
+        bench.measure("toggle_theme_x4", toggle_theme)
+
+        w.close()
+        return {
+            "atajados": atajados,
+            "items": items,
+            "setup_s": round(setup_s, 2),
+            "max_rss_mb": peak_rss_mb(),
+            "flows": bench.results,
+        }
+    finally:
+        tracemalloc.stop()
+        os.chdir(cwd)
+        tmp.cleanup()
+
+
+def check_budget(flows: dict, budget: dict) -> list:
+    """Return a message for every flow over its time or memory budget."""
+    failures = []
+    for name, limits in budget.items():
+        got = flows.get(name)
+        if got is None:
+            continue
+        for key in ("ms", "peak_mb"):
+            if key in limits and got[key] > limits[key]:
+                failures.append(f"{name}: {key} {got[key]} > {limits[key]}")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mide la latencia de la interfaz sin pantalla.")
+    parser.add_argument("--atajados", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--budget", default=BUDGET_FILE, help="archivo de presupuestos")
+    parser.add_argument("--update-budget", action="store_true",
+                        help=f"guardar presupuestos = medición × {BUDGET_FACTOR}")
+    parser.add_argument("--json", help="guardar también el resultado en este archivo")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, HERE)
+    result = run_flows(args.atajados, args.items, args.seed)
+    budget = {}
+    if os.path.exists(args.budget):
+        with open(args.budget, encoding="utf-8") as fh:
+            budget = json.load(fh).get("flows", {})
+    if args.update_budget:
+        budget = {name: {"ms": round(r["ms"] * BUDGET_FACTOR + BUDGET_SLACK_MS, -1),
+                         "peak_mb": round(r["peak_mb"] * BUDGET_FACTOR + 1, 1)}
+                  for name, r in result["flows"].items()}
+        with open(args.budget, "w", encoding="utf-8") as fh:
+            json.dump({"atajados": args.atajados, "items": args.items, "flows": budget},
+                      fh, indent=2)
+            fh.write("\n")
+    result["failures"] = check_budget(result["flows"], budget)
+
+    for name, r in result["flows"].items():
+        limit = budget.get(name, {})
+        print(f"{name:20s} {r['ms']:9.1f} ms (≤ {limit.get('ms', '—')})  "
+              f"{r['peak_mb']:7.2f} MB (≤ {limit.get('peak_mb', '—')})")
+    print(f"RSS máximo: {result['max_rss_mb'] or '—'} MB; datos generados en {result['setup_s']} s")
+    for msg in result["failures"]:
+        print("EXCEDIDO:", msg)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2, ensure_ascii=False)
+    return 1 if result["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Multi-project workspace.
+
+Each project (*trabajo*) lives in its own SQLite file. The workspace only
+remembers which files belong to it and which one was open last, so the
+application can switch between them without restarting. Portfolio figures
+are computed by attaching several project files to one connection and
+running a single query over all of them.
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+from database import DB_FILE, PROJECT_COST_SQL
+
+WORKSPACE_FILE = "workspace.json"
+# Límite por defecto de bases adjuntas en SQLite (SQLITE_MAX_ATTACHED)
+MAX_ATTACHED = 10
+
+
+class Workspace:
+    """List of project databases persisted in a small JSON file."""
+
+    def __init__(self, path: str = WORKSPACE_FILE):
+        self.path = path
+        self.projects = []
+        self.current = None
+        self.load()
+
+    def load(self) -> None:
+        """Read the workspace file; a missing or corrupt file means empty."""
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        self.projects = [p for p in data.get("projects", []) if isinstance(p, str)]
+        self.current = data.get("current")
+
+    def save(self) -> None:
+        """Write the workspace file."""
+        with open(self.path, "w", encoding="utf-8") as fh:
+            json.dump({"projects": self.projects, "current": self.current}, fh, indent=2)
+
+    def open(self, db_file: str) -> str:
+        """Register *db_file* as a project, make it current and return its path."""
+        path = os.path.abspath(db_file)
+        if path not in self.projects:
+            self.projects.append(path)
+        self.current = path
+        self.save()
+        return path
+
+    def remove(self, db_file: str) -> None:
+        """Drop a project from the workspace (the file is left untouched)."""
+        path = os.path.abspath(db_file)
+        if path in self.projects:
+            self.projects.remove(path)
+        if self.current == path:
+            self.current = self.projects[0] if self.projects else None
+        self.save()
+
+    def current_or_default(self) -> str:
+        """Return the project to open at startup."""
+        if self.current and os.path.exists(self.current):
+            return self.current
+        return DB_FILE
+
+
+def project_name(path: str) -> str:
+    """Human readable name of a project file."""
+    return Path(path).stem
+
+
+def _project_sql(idx: int) -> str:
+    schema = "p%d." % idx
+    return f"""
+        SELECT {idx}, s.total, s.ejecutados, s.en_ejecucion, c.cost, c.executed
+        FROM (SELECT COUNT(*) AS total,
+                     COALESCE(SUM(status='Ejecutado'), 0) AS ejecutados,
+                     COALESCE(SUM(status='En ejecución'), 0) AS en_ejecucion
+              FROM {schema}atajados) s,
+             ({PROJECT_COST_SQL.format(schema=schema)}) c
+        """
+
+
+def portfolio(paths) -> dict:
+    """Return status counts and progress for several projects at once.
+
+    Projects are attached read-only in groups of :data:`MAX_ATTACHED` and
+    each group is answered by a single ``UNION ALL`` query. Missing files
+    are ignored; files that cannot be read as a project (not a database,
+    damaged, without the project tables) are listed under ``"skipped"``
+    with the error instead of failing the whole portfolio.
+    """
+    paths = [os.path.abspath(p) for p in paths if os.path.exists(p)]
+    projects, skipped = [], []
+    with closing(sqlite3.connect("file::memory:", uri=True)) as conn:
+        for start in range(0, len(paths), MAX_ATTACHED):
+            chunk, parts = [], []
+            for path in paths[start:start + MAX_ATTACHED]:
+                idx = len(chunk)
+                sql = _project_sql(idx)
+                attached = False
+                try:
+                    conn.execute(
+                        "ATTACH DATABASE ? AS p%d" % idx,
+                        (Path(path).as_uri() + "?mode=ro",),
+                    )
+                    attached = True
+                    # Preparar la consulta lee el esquema: falla aquí si el archivo no sirve
+                    conn.execute(f"SELECT * FROM ({sql}) LIMIT 0").fetchall()
+                except sqlite3.Error as exc:
+                    if attached:
+                        conn.execute("DETACH DATABASE p%d" % idx)
+                    skipped.append({"path": path, "name": project_name(path), "error": str(exc)})
+                    continue
+                chunk.append(path)
+                parts.append(sql)
+            if not parts:
+                continue
+            try:
+                rows = conn.execute(" UNION ALL ".join(parts)).fetchall()
+            finally:
+                for idx in range(len(chunk)):
+                    conn.execute("DETACH DATABASE p%d" % idx)
+            for idx, total, ejec, en_ejec, cost, executed in rows:
+                projects.append({
+                    "path": chunk[idx],
+                    "name": project_name(chunk[idx]),
+                    "atajados": total,
+                    "ejecutados": ejec,
+                    "en_ejecucion": en_ejec,
+                    "pendientes": total - ejec - en_ejec,
+                    "cost": cost,
+                    "executed": executed,
+                    "progress": (executed / cost * 100.0) if cost else 0.0,
+                })
+
+    total = {
+        key: sum(p[key] for p in projects)
+        for key in ("atajados", "ejecutados", "en_ejecucion", "pendientes", "cost", "executed")
+    }
+    total["progress"] = (total["executed"] / total["cost"] * 100.0) if total["cost"] else 0.0
+    return {"projects": projects, "total": total, "skipped": skipped}